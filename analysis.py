@@ -1,16 +1,29 @@
-import yfinance as yf
+import itertools
+from typing import Iterable, Iterator
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from utils import remove_first_last_year
+from utils import remove_first_last_year, get_combined_ticker
+from data_source import PriceCache
+from parallel import imap_tasks, run_tasks
+from returns_panel import ReturnsPanel
+from returns_store import ReturnsStore
+from profiling import timed
+from simulation import simulate_windows
 
-def get_annual_return(daily_returns: pd.DataFrame) -> tuple[pd.DataFrame, float]:
+@timed("metrics.annual_return")
+def get_annual_return(daily_returns: pd.DataFrame | ReturnsPanel) -> float | np.ndarray:
     """
-    일 별 수익률을 받아, 연 평균 수익률 반환
+    일 별 수익률을 받아, 연 평균 수익률 반환 (ReturnsPanel이 주어지면 종목 별 연 평균 수익률을 배열로 반환)
     
     Args:
-        daily_return (pd.DataFrame): 일 별 수익률
+        daily_return (pd.DataFrame | ReturnsPanel): 일 별 수익률
     """
+    if isinstance(daily_returns, ReturnsPanel):
+        panel = daily_returns.trim_first_last_year()
+        num_years = panel.years[-1] - panel.years[0] + 1
+        
+        return np.prod(1 + panel.values, axis=0) ** (1 / num_years) - 1
+    
     assert daily_returns.shape[1] == 1, "DataFrame에는 하나의 컬럼(수익률)만 존재해야 합니다."
     
     daily_returns = remove_first_last_year(daily_returns)
@@ -28,52 +41,83 @@ def get_annual_return(daily_returns: pd.DataFrame) -> tuple[pd.DataFrame, float]
 
     return annualized_return
 
-def get_annual_volatility(daily_returns: pd.DataFrame, downward_only: bool = True) -> tuple[pd.DataFrame, float]:
+@timed("metrics.annual_volatility")
+def get_annual_volatility(daily_returns: pd.DataFrame | ReturnsPanel, downward_only: bool = True) -> float | np.ndarray:
     """
-    일 별 수익률을 받아, 연간 변동성 반환
+    일 별 수익률을 받아, 연간 변동성 반환 (여러 컬럼 혹은 ReturnsPanel이 주어지면 컬럼 별 연간 변동성을 배열로 반환)
     
     Args:
-        daily_return (pd.DataFrame): 일 별 수익률
+        daily_return (pd.DataFrame | ReturnsPanel): 일 별 수익률 (days x series)
         downward_only (bool): 하락 구간만 계산할지 여부
     """
-    assert daily_returns.shape[1] == 1, "DataFrame에는 하나의 컬럼(수익률)만 존재해야 합니다."
+    if isinstance(daily_returns, ReturnsPanel):
+        panel = daily_returns.trim_first_last_year()
+        
+        return _mean_yearly_volatility(panel.values, panel.years, downward_only)
     
     daily_returns = remove_first_last_year(daily_returns)
     
-    returns = daily_returns.iloc[:, 0]
-    index_dates = daily_returns.index
-
-    volatility_data = {}
-
-    for year in sorted(index_dates.year.unique()):
-        yearly_returns = returns[index_dates.year == year]
-
-        # downward_only일 경우, 하락 구간(음수 수익률)만 선택
-        selected_returns = yearly_returns[yearly_returns < 0] if downward_only else yearly_returns
-        
-        # σ_annual = σ_daily × √252 => 252는 연간 거래일 수 
-        volatility = selected_returns.std() * np.sqrt(252) if not selected_returns.empty else np.nan
-        volatility_data[year] = volatility
+    returns = daily_returns.to_numpy(dtype=float).reshape(len(daily_returns), -1)
+    volatilities = _mean_yearly_volatility(returns, daily_returns.index.year.to_numpy(), downward_only)
+    
+    return float(volatilities[0]) if volatilities.shape[0] == 1 else volatilities
 
-    result_df = pd.DataFrame(volatility_data.items(), columns=['Year', 'Volatility']).dropna()
+def _yearly_volatility(returns: np.ndarray, years: np.ndarray, downward_only: bool, valid: np.ndarray = None) -> np.ndarray:
+    """
+    연도 순으로 정렬된 수익률 행렬 (days x series)에서 연도 별 변동성 (years x series)을 한 번에 계산.
+    연도 경계마다 x, x²의 합을 np.add.reduceat으로 구한 뒤 표본 표준편차로 변환.
+    valid (days x series)가 주어지면 True인 수익률만 사용 (종목마다 기간이 다른 경우)
+    """
+    year_starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+    
+    # downward_only일 경우, 하락 구간(음수 수익률)만 선택
+    selected = returns < 0 if downward_only else np.ones(returns.shape, dtype=bool)
+    if valid is not None:
+        selected &= valid
+    selected_returns = np.where(selected, returns, 0.0)
+    
+    counts = np.add.reduceat(selected.astype(np.int64), year_starts, axis=0)
+    sums = np.add.reduceat(selected_returns, year_starts, axis=0)
+    squared_sums = np.add.reduceat(selected_returns ** 2, year_starts, axis=0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variances = (squared_sums - sums ** 2 / counts) / (counts - 1)
+    
+    # 선택된 수익률이 2개 미만인 연도는 표준편차를 계산할 수 없으므로 제외 (NaN)
+    variances = np.where(counts > 1, np.maximum(variances, 0.0), np.nan)
+    
+    # σ_annual = σ_daily × √252 => 252는 연간 거래일 수 
+    return np.sqrt(variances) * np.sqrt(252)
 
-    return result_df['Volatility'].mean()
+def _mean_yearly_volatility(returns: np.ndarray, years: np.ndarray, downward_only: bool, valid: np.ndarray = None) -> np.ndarray:
+    """
+    연도 별 변동성의 평균 (변동성을 계산할 수 없는 연도는 제외)
+    """
+    yearly_volatility = _yearly_volatility(returns, years, downward_only, valid)
+    valid = ~np.isnan(yearly_volatility)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, yearly_volatility, 0.0).sum(axis=0) / valid.sum(axis=0)
 
-def get_mixed_data(stock_info: list[pd.DataFrame], ratio: list[float], abbrs: list[str] = None) -> tuple[pd.DataFrame, str]:
+@timed("align.mixed_data")
+def get_mixed_data(stock_info: list[pd.DataFrame] | ReturnsPanel, ratio: list[float], abbrs: list[str] = None) -> tuple[pd.DataFrame, str]:
     """
     여러 개의 주식을 특정 비율에 따라 투자했을 때의 일 별 수익률을 반환
     
     Args:
-        tickers (list[pd.DataFrame]): 합칠 종목 정보
+        tickers (list[pd.DataFrame] | ReturnsPanel): 합칠 종목 정보 혹은 합칠 종목들이 선택된 수익률 panel
         ratio (list[float]): 합칠 비율 (소수점)
         abbrs (list[str]): 각 종목을 대표할 알파벳 1개
     """
     assert abs(sum(ratio) - 1) < 1e-6, "Ratio의 합은 1이어야 합니다."
     
     # 합친 종목 코드 생성 (e.g. S8Q2)
-    rounded_ratios = [round(r * 10) for r in ratio]
+    combined_ticker = get_combined_ticker(abbrs, ratio) if abbrs is not None else None
     
-    combined_ticker = "".join(f"{abbr}{r}" for abbr, r in zip(abbrs, rounded_ratios)) if abbrs is not None else None
+    # panel이 주어지면 이미 정렬된 수익률 배열을 복사 없이 사용
+    if isinstance(stock_info, ReturnsPanel):
+        weighted_return = pd.DataFrame({combined_ticker: stock_info.weighted_returns(ratio)}, index=stock_info.index)
+        return weighted_return, combined_ticker
         
     combined_df = pd.concat(stock_info, axis=1, join='inner') # 가장 최근에 만들어진 종목에 맞춰서 데이터 사용
     daily_return = combined_df['Adj Close'].pct_change().dropna() # 각 종복에 대해서 일 별 수익률 사용
@@ -82,19 +126,129 @@ def get_mixed_data(stock_info: list[pd.DataFrame], ratio: list[float], abbrs: li
     
     return weighted_return, combined_ticker
 
-def get_multiple_stock_info(tickers: list[str]) -> list[pd.DataFrame]:
+def _as_panel(daily_returns: pd.DataFrame | ReturnsPanel) -> ReturnsPanel:
+    return daily_returns if isinstance(daily_returns, ReturnsPanel) else ReturnsPanel.from_frame(daily_returns)
+
+def evaluate_portfolios(daily_returns: pd.DataFrame | ReturnsPanel, weights: np.ndarray, downward_only: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """
+    일 별 수익률 행렬 (days x assets)과 투자 비율 행렬 (assets x portfolios)을 받아,
+    모든 포트폴리오의 연 평균 수익률과 연간 변동성을 한 번에 계산
+    
+    Args:
+        daily_returns (pd.DataFrame | ReturnsPanel): 종목 별 일 별 수익률
+        weights (np.ndarray): 포트폴리오 별 투자 비율 (각 열의 합은 1)
+        downward_only (bool): 하락 구간만 계산할지 여부
+    """
+    weights = np.asarray(weights, dtype=float)
+    assert weights.shape[0] == daily_returns.shape[1], "투자 비율의 행 개수는 종목 개수와 같아야 합니다."
+    assert np.allclose(weights.sum(axis=0), 1), "Ratio의 합은 1이어야 합니다."
+    
+    panel = _as_panel(daily_returns).trim_first_last_year()
+    
+    # 선택되지 않은 종목의 비율을 0으로 채워 전체 배열에 곱하므로 종목 선택 시에도 배열 복사 없음
+    return _evaluate_trimmed(panel._values, panel.years, panel.full_weights(weights), downward_only)
+
+def _evaluate_trimmed(returns: np.ndarray, years: np.ndarray, weights: np.ndarray, downward_only: bool) -> tuple[np.ndarray, np.ndarray]:
+    """
+    첫 & 마지막 연도가 이미 제거된 수익률 행렬과 각 날짜의 연도에 대해 evaluate_portfolios() 계산 수행
+    """
+    portfolio_returns = returns @ weights # (days x portfolios)
+    
+    num_years = years.max() - years.min() + 1
+    annualized_returns = np.prod(1 + portfolio_returns, axis=0) ** (1 / num_years) - 1
+    
+    volatilities = _mean_yearly_volatility(portfolio_returns, years, downward_only)
+    
+    return annualized_returns, volatilities
+
+def _evaluate_chunk_task(task: tuple[list, bool], arrays: dict[str, np.ndarray], rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (종목 index, 투자 비율) 후보 묶음을 투자 비율 행렬로 만들어 평가 (imap_tasks()의 worker에서 실행)
+    """
+    chunk, downward_only = task
+    returns = arrays['returns']
+    
+    weights = np.zeros((returns.shape[1], len(chunk)))
+    for col, (index_comb, ratio) in enumerate(chunk):
+        weights[list(index_comb), col] = ratio
+        
+    return _evaluate_trimmed(returns, arrays['years'], weights, downward_only)
+
+def evaluate_portfolio_candidates(daily_returns: pd.DataFrame | ReturnsPanel, candidates: Iterable[tuple[tuple[int, ...], tuple[float, ...]]], 
+                                  downward_only: bool = True, chunk_size: int = 1024, workers: int = 1) -> Iterator[tuple[tuple, tuple, float, float]]:
+    """
+    (종목 index, 투자 비율) 후보들을 chunk_size개씩 묶어 투자 비율 행렬로 만든 뒤 process pool에서 병렬로 평가하고,
+    (종목 index, 투자 비율, 연 평균 수익률, 연간 변동성)을 후보 순서대로 하나씩 반환
+    
+    Args:
+        daily_returns (pd.DataFrame | ReturnsPanel): 종목 별 일 별 수익률 (days x assets)
+        candidates (Iterable): utils.portfolio_candidates()와 같은 형태의 후보 생성기
+        downward_only (bool): 하락 구간만 계산할지 여부
+        chunk_size (int): 한 번에 평가할 후보의 개수
+        workers (int): 병렬로 평가할 worker process 개수
+    """
+    panel = _as_panel(daily_returns).trim_first_last_year()
+    
+    # 수익률 행렬은 shared memory로 한 번만 전달
+    arrays = {
+        'returns': panel.values,
+        'years': panel.years,
+    }
+    
+    candidates = iter(candidates)
+    chunks = iter(lambda: list(itertools.islice(candidates, chunk_size)), [])
+    
+    # 결과와 함께 후보를 돌려받기 위해 chunk를 따로 보관 (imap_tasks()는 task 순서대로 결과 반환)
+    submitted = []
+    
+    def tasks():
+        for chunk in chunks:
+            submitted.append(chunk)
+            yield chunk, downward_only
+    
+    for avg_returns, avg_volatilities in imap_tasks(_evaluate_chunk_task, tasks(), arrays, workers):
+        chunk = submitted.pop(0)
+        
+        for (index_comb, ratio), avg_return, avg_volatility in zip(chunk, avg_returns, avg_volatilities):
+            yield index_comb, ratio, avg_return, avg_volatility
+
+def get_stock_info(ticker: str, cache: PriceCache = None) -> pd.DataFrame:
+    """
+    종목 번호를 받아 가격 데이터 반환 (로컬 캐시에 없는 기간만 데이터 소스에서 수집)
+    
+    Args:
+        ticker (str): 불러올 종목 번호
+        cache (PriceCache): 사용할 가격 캐시 (default: Yahoo Finance 기반 기본 캐시)
+    """
+    cache = cache if cache is not None else PriceCache()
+    
+    return cache.load(ticker)
+
+def get_multiple_stock_info(tickers: list[str], cache: PriceCache = None) -> list[pd.DataFrame]:
     """
-    여러 종목 번호를 받아 Yahoo Finance에서 데이터 수집 후, 
+    여러 종목 번호를 받아 가격 데이터를 병렬로 수집 후, 
     가장 최근에 상장된 주식의 시작 날짜 이후의 데이터만 반환
     
     Args:
         tickers (list[str]): 불러올 종목 번호
+        cache (PriceCache): 사용할 가격 캐시 (default: Yahoo Finance 기반 기본 캐시)
+    """
+    cache = cache if cache is not None else PriceCache()
+    
+    # 여러 종목을 동시에 불러옴 (동시 요청 수, 재시도, 요청 제한은 cache 설정을 따름)
+    return align_stock_info(cache.load_many(tickers))
+
+def align_stock_info(stock_info: list[pd.DataFrame]) -> list[pd.DataFrame]:
+    """
+    빈 데이터를 제외하고, 가장 최근에 상장된 주식의 시작 날짜 이후의 데이터만 반환
+    
+    Args:
+        stock_info (list[pd.DataFrame]): 종목 정보
     """
     data_list = []
     start_dates = []
     
-    for ticker in tickers:
-        df = yf.download(ticker, period="max", interval="1d", auto_adjust=False)
+    for df in stock_info:
         if not df.empty:
             start_dates.append(df.index.min())  # 첫 데이터 날짜
             data_list.append(df)
@@ -107,41 +261,490 @@ def get_multiple_stock_info(tickers: list[str]) -> list[pd.DataFrame]:
 
     return filtered_data_list
 
-def sample_random_returns(daily_return: pd.DataFrame, invest_year: int, sample_num: int) -> list[float]:
+class RollingReturns:
+    """
+    일 별 수익률의 누적 로그 성장률을 한 번만 계산해두고,
+    여러 투자 기간(invest_year)의 구간 수익률을 searchsorted와 배열 뺄셈으로 한 번에 계산
+    
+    Args:
+        daily_return (pd.DataFrame): 주식/포트폴리오의 일일 수익률 (컬럼 1개)
+    """
+    def __init__(self, daily_return: pd.DataFrame):
+        daily_return = daily_return.sort_index()
+        returns = np.asarray(daily_return, dtype=float).reshape(len(daily_return), -1)[:, 0]
+        
+        self.dates = daily_return.index
+        # log_growth[i] = 0 ~ i-1번째 날까지의 누적 로그 수익률 => [s, e] 구간의 수익률 = exp(log_growth[e+1] - log_growth[s])
+        self.log_growth = np.concatenate(([0.0], np.cumsum(np.log1p(returns))))
+        
+    @classmethod
+    def from_arrays(cls, dates: np.ndarray, log_growth: np.ndarray) -> "RollingReturns":
+        """
+        to_arrays()로 만든 배열들로부터 복원 (worker process에서 shared memory 배열을 그대로 사용)
+        """
+        rolling_returns = cls.__new__(cls)
+        rolling_returns.dates = pd.DatetimeIndex(dates)
+        rolling_returns.log_growth = log_growth
+        
+        return rolling_returns
+    
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        return {'dates': np.asarray(self.dates, dtype='datetime64[ns]'), 'log_growth': self.log_growth}
+        
+    def window_indices(self, invest_year: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        invest_year년 투자가 가능한 모든 시작 지점과, 각 시작 지점에 대응되는 종료 지점의 index 반환
+        
+        Args:
+            invest_year (int): 투자할 연수
+        """
+        # 샘플 가능한 시작 지점
+        latest_start_date = self.dates[-1] - pd.DateOffset(years=invest_year)
+        num_valid = self.dates.searchsorted(latest_start_date, side='right')
+        
+        if num_valid == 0:
+            raise ValueError(f"투자 기간({invest_year}년)에 해당하는 충분한 데이터가 없습니다.")
+        
+        start_idx = np.arange(num_valid)
+        
+        # target_date가 실제 존재하지 않으면, 가장 가까운 다음 거래일 사용
+        target_dates = self.dates[:num_valid] + pd.DateOffset(years=invest_year)
+        end_idx = self.dates.searchsorted(target_dates, side='left')
+        
+        return start_idx, end_idx
+    
+    def window_returns(self, invest_year: int, sample_num: int = None, rng: np.random.Generator = None) -> np.ndarray:
+        """
+        invest_year년 투자 구간들의 연 평균 수익률(%) 반환
+        
+        Args:
+            invest_year (int): 투자할 연수
+            sample_num (int): 무작위로 샘플링할 구간의 개수. None이면 가능한 모든 시작 지점에 대해 계산
+            rng (np.random.Generator): 샘플링에 사용할 난수 생성기 (default: np.random)
+        """
+        start_idx, end_idx = self.window_indices(invest_year)
+        
+        start_idx, end_idx = sample_windows(start_idx, end_idx, invest_year, sample_num, rng)
+        
+        # 해당 기간 이후 데이터가 없으면 스킵
+        has_end = end_idx < len(self.dates)
+        start_idx, end_idx = start_idx[has_end], end_idx[has_end]
+        
+        log_earning = self.log_growth[end_idx + 1] - self.log_growth[start_idx]
+        annualized_return = np.exp(log_earning / invest_year) - 1
+        
+        return annualized_return * 100
+
+def sample_windows(start_idx: np.ndarray, end_idx: np.ndarray, invest_year: int, sample_num: int = None,
+                   rng: np.random.Generator = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    투자 구간 중 sample_num개를 중복 없이 무작위로 선택. 가능한 구간이 sample_num개보다 적으면 모든 구간을 사용
+    
+    Args:
+        start_idx (np.ndarray): 투자 구간의 시작 위치
+        end_idx (np.ndarray): 투자 구간의 마지막 위치
+        invest_year (int): 투자할 연수 (안내 메시지에 사용)
+        sample_num (int): 샘플링할 구간의 개수. None이면 모든 구간 사용
+        rng (np.random.Generator): 샘플링에 사용할 난수 생성기 (default: np.random)
+    """
+    if sample_num is None:
+        return start_idx, end_idx
+    
+    if sample_num > len(start_idx):
+        print(f"투자 기간 {invest_year}년의 가능한 구간은 {len(start_idx)}개뿐이므로 {sample_num}개 대신 모든 구간을 사용합니다.")
+        sample_num = len(start_idx)
+    
+    sampled = (rng if rng is not None else np.random).choice(len(start_idx), size=sample_num, replace=False)
+    
+    return start_idx[sampled], end_idx[sampled]
+
+def _window_returns_task(task: tuple[int, int], arrays: dict[str, np.ndarray], rng: np.random.Generator) -> np.ndarray:
+    """
+    하나의 투자 기간에 대한 구간 수익률 계산 (imap_tasks()의 worker에서 실행)
+    """
+    invest_year, sample_num = task
+    
+    return RollingReturns.from_arrays(arrays['dates'], arrays['log_growth']).window_returns(invest_year, sample_num, rng)
+
+def _bootstrap_task(task: tuple[int, int, int, str], arrays: dict[str, np.ndarray], rng: np.random.Generator) -> np.ndarray:
+    """
+    하나의 투자 기간에 대한 bootstrap 시뮬레이션 (imap_tasks()의 worker에서 실행)
+    """
+    invest_year, num_paths, block_size, method = task
+    
+    return bootstrap_log_returns(arrays['log_returns'], invest_year, num_paths, block_size, method, rng=rng)
+
+@timed("sampling")
+def long_term_returns(daily_return: pd.DataFrame, invest_years: list[int], sample_num: int = None, workers: int = 1, seed: int = None,
+                      simulation: str = "history", block_size: int = 20) -> list[np.ndarray]:
+    """
+    여러 투자 기간에 대한 구간 연 평균 수익률(%)을 process pool에서 병렬로 계산.
+    투자 기간마다 seed에서 파생된 난수 생성기를 사용하므로, worker 개수와 관계없이 결과가 같음
+    
+    Args:
+        daily_return (pd.DataFrame): 주식/포트폴리오의 일일 수익률
+        invest_years (list[int]): 투자할 연수들
+        sample_num (int): 투자 기간마다 샘플링할 구간(bootstrap이면 경로)의 개수. None이면 가능한 모든 구간 사용
+        workers (int): worker process 개수
+        seed (int): 샘플링에 사용할 seed
+        simulation (str): "history"면 실제 과거 구간, "stationary" 혹은 "block"이면 bootstrap으로 만든 가상 경로 사용
+        block_size (int): bootstrap에서 연속으로 가져올 (평균) 일 수
+    """
+    rolling_returns = RollingReturns(daily_return) # 누적 수익률은 한 번만 계산 후 모든 투자 기간에 재사용
+    
+    if simulation == "history":
+        tasks = [(invest_year, sample_num) for invest_year in invest_years]
+        return run_tasks(_window_returns_task, tasks, rolling_returns.to_arrays(), workers, seed)
+    
+    assert sample_num is not None, "bootstrap 시뮬레이션에는 경로 개수(sample_num)가 필요합니다."
+    
+    tasks = [(invest_year, sample_num, block_size, simulation) for invest_year in invest_years]
+    arrays = {'log_returns': np.diff(rolling_returns.log_growth)}
+    
+    return run_tasks(_bootstrap_task, tasks, arrays, workers, seed)
+
+def _simulation_task(task: tuple[int, int, str, float, str], arrays: dict[str, np.ndarray], rng: np.random.Generator) -> np.ndarray:
+    """
+    하나의 투자 기간에 대한 rebalance/적립 시뮬레이션 (imap_tasks()의 worker에서 실행)
+    """
+    invest_year, sample_num, rebalance, drift_band, contribution = task
+    
+    dates = pd.DatetimeIndex(arrays['dates'])
+    start_idx, end_idx = RollingReturns.from_arrays(dates, None).window_indices(invest_year)
+    
+    # window_returns()와 같은 방식으로 구간 샘플링
+    start_idx, end_idx = sample_windows(start_idx, end_idx, invest_year, sample_num, rng)
+    
+    has_end = end_idx < len(dates)
+    start_idx, end_idx = start_idx[has_end], end_idx[has_end]
+    
+    annualized_returns = simulate_windows(arrays['returns'], arrays['weights'], dates, start_idx, end_idx,
+                                          rebalance, drift_band, contribution, invest_year)
+    
+    return annualized_returns[:, 0] * 100
+
+@timed("sampling")
+def simulated_long_term_returns(panel: ReturnsPanel, weights: list[float], invest_years: list[int], sample_num: int = None, workers: int = 1,
+                                seed: int = None, rebalance: str = "monthly", drift_band: float = None, contribution: str = "none") -> list[np.ndarray]:
+    """
+    long_term_returns()와 같은 투자 구간들에 대해, 주기적 rebalance와 정기 적립을 반영한 연 평균 수익률(%)을 계산.
+    적립이 있으면 금액 가중 수익률(IRR)을 사용
+    
+    Args:
+        panel (ReturnsPanel): 포트폴리오를 구성하는 종목들의 수익률 panel
+        weights (list[float]): 종목 별 투자 비율
+        invest_years (list[int]): 투자할 연수들
+        sample_num (int): 투자 기간마다 샘플링할 구간의 개수. None이면 가능한 모든 구간 사용
+        workers (int): worker process 개수
+        seed (int): 샘플링에 사용할 seed
+        rebalance (str): rebalance 주기 ("daily", "monthly", "quarterly", "yearly", "none")
+        drift_band (float): 어떤 종목의 비율이든 목표 비율에서 이 값 이상 벗어났을 때만 rebalance (default: 항상 rebalance)
+        contribution (str): 같은 금액을 추가로 투자할 주기 ("none", "monthly", "quarterly", "yearly")
+    """
+    arrays = {
+        'returns': panel.values,
+        'weights': np.asarray(weights, dtype=float).reshape(-1, 1),
+        'dates': np.asarray(panel.index, dtype='datetime64[ns]'),
+    }
+    tasks = [(invest_year, sample_num, rebalance, drift_band, contribution) for invest_year in invest_years]
+    
+    return run_tasks(_simulation_task, tasks, arrays, workers, seed)
+
+def bootstrap_log_returns(log_returns: np.ndarray, invest_year: int, num_paths: int, block_size: int = 20, method: str = "stationary",
+                          max_chunk_elements: int = 2 ** 22, rng: np.random.Generator = None) -> np.ndarray:
+    """
+    일 별 로그 수익률을 block 단위로 재추출(bootstrap)하여 invest_year년 길이의 가상 경로 num_paths개를 만들고, 각 경로의 연 평균 수익률(%) 반환.
+    각 block의 수익률은 누적 로그 수익률의 차이로 계산하므로 경로 당 일 수가 아닌 block 수만큼만 계산하며,
+    경로는 (paths x blocks) 배열로 max_chunk_elements개씩 나누어 생성하므로 메모리 사용량이 경로 개수와 무관하게 제한됨
+    
+    Args:
+        log_returns (np.ndarray): 일 별 로그 수익률 (log(1 + r))
+        invest_year (int): 투자할 연수
+        num_paths (int): 생성할 경로의 개수
+        block_size (int): 연속으로 가져올 일 수 ("stationary"이면 평균 일 수)
+        method (str): "stationary"면 block 길이가 기하분포를 따르는 stationary bootstrap, "block"이면 고정 길이 block bootstrap
+        max_chunk_elements (int): 한 번에 생성할 (paths x blocks) 배열의 최대 원소 개수
+        rng (np.random.Generator): 사용할 난수 생성기
+    """
+    assert method in ("stationary", "block"), f"{method}은 가능한 bootstrap 방식이 아닙니다."
+    
+    rng = rng if rng is not None else np.random.default_rng()
+    
+    num_returns = len(log_returns)
+    num_days = int(round(invest_year * 252)) # 252는 연간 거래일 수
+    
+    # 데이터 끝에 도달하면 처음으로 순환하도록 두 번 이어붙인 누적 로그 수익률
+    circular_growth = np.concatenate(([0.0], np.cumsum(np.concatenate((log_returns, log_returns)))))
+    total_growth = circular_growth[num_returns]
+    
+    # 경로 당 필요한 block 개수 (stationary는 block 길이가 무작위이므로 여유있게 생성)
+    if method == "stationary":
+        num_blocks = int(np.ceil(num_days / block_size * 1.5)) + 10
+    else:
+        num_blocks = int(np.ceil(num_days / block_size))
+    chunk_paths = max(1, max_chunk_elements // num_blocks)
+    
+    annualized_returns = np.empty(num_paths)
+    
+    for chunk_start in range(0, num_paths, chunk_paths):
+        num_chunk = min(chunk_paths, num_paths - chunk_start)
+        
+        if method == "stationary":
+            block_lengths = rng.geometric(1 / block_size, size=(num_chunk, num_blocks))
+            
+            # 드물게 block 길이의 합이 투자 기간보다 짧은 경로는 다시 생성
+            short = block_lengths.sum(axis=1) < num_days
+            while short.any():
+                block_lengths[short] = rng.geometric(1 / block_size, size=(short.sum(), num_blocks))
+                short = block_lengths.sum(axis=1) < num_days
+        else:
+            block_lengths = np.full((num_chunk, num_blocks), block_size)
+        
+        # 투자 기간을 넘어가는 부분은 잘라냄
+        block_ends = np.minimum(np.cumsum(block_lengths, axis=1), num_days)
+        block_lengths = np.diff(block_ends, axis=1, prepend=0)
+        
+        block_sources = rng.integers(0, num_returns, size=(num_chunk, num_blocks))
+        
+        # block 수익률 = 전체 순환 횟수 x 전체 수익률 + 나머지 구간의 누적 수익률 차이
+        full_cycles, remainder = np.divmod(block_lengths, num_returns)
+        block_growth = full_cycles * total_growth + circular_growth[block_sources + remainder] - circular_growth[block_sources]
+        
+        log_earning = block_growth.sum(axis=1)
+        annualized_returns[chunk_start:chunk_start + num_chunk] = np.exp(log_earning / invest_year) - 1
+        
+    return annualized_returns * 100
+
+def sample_random_returns(daily_return: pd.DataFrame, invest_year: int, sample_num: int = None, rng: np.random.Generator = None) -> np.ndarray:
     """
     주어진 일일 수익률 데이터에서 invest_year년 동안의 구간을 무작위로 sample_num개 샘플링하여,
-    각 구간에서 invest_year년 동안 일적립식 투자를 하였을 때 연 평균 수익률을 계산 후 반환
+    각 구간의 시작 시점에 한 번에 투자(거치식)하고 매일 rebalance하였을 때 연 평균 수익률을 계산 후 반환
+    (정기 적립 및 주기적 rebalance는 simulated_long_term_returns() 참고)
     
     Args:
         daily_return (pd.DataFrame): 주식/포트폴리오의 일일 수익률
         invest_year (int): 투자할 연수
-        sample_num (int): 샘플링할 구간의 개수
+        sample_num (int): 샘플링할 구간의 개수. None이면 가능한 모든 구간 사용
+        rng (np.random.Generator): 샘플링에 사용할 난수 생성기 (default: np.random)
+    """
+    return RollingReturns(daily_return).window_returns(invest_year, sample_num, rng)
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    누적 합의 차이로 모든 window일 구간의 합 (days - window + 1 x series)을 O(n)에 계산
+    """
+    cumulative = np.concatenate((np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)))
+    
+    return cumulative[window:] - cumulative[:-window]
+
+def get_drawdowns(daily_returns: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    일 별 수익률을 받아, 직전 최고점 대비 하락률(drawdown)과 최고점 이후 지난 거래일 수(drawdown duration) 반환 (series 별)
+    
+    Args:
+        daily_returns (pd.DataFrame): 일 별 수익률 (days x series)
+    """
+    returns = daily_returns.to_numpy(dtype=float).reshape(len(daily_returns), -1)
+    
+    # 최고점은 누적 최대값(np.maximum.accumulate)으로 한 번에 계산 (투자 시작 시점의 1도 최고점으로 간주)
+    wealth = np.exp(np.cumsum(np.log1p(returns), axis=0))
+    peak = np.maximum(np.maximum.accumulate(wealth, axis=0), 1.0)
+    drawdown = wealth / peak - 1
+    
+    # 마지막으로 최고점이었던 날짜의 위치를 누적 최대값으로 전파
+    days = np.arange(len(returns))[:, None]
+    last_peak = np.maximum.accumulate(np.where(drawdown < 0, -1, days), axis=0)
+    duration = days - last_peak
+    
+    return (
+        pd.DataFrame(drawdown, index=daily_returns.index, columns=daily_returns.columns),
+        pd.DataFrame(duration, index=daily_returns.index, columns=daily_returns.columns),
+    )
+
+def rolling_metrics(daily_returns: pd.DataFrame, window: int = 252, risk_free: float = 0.0) -> dict[str, pd.DataFrame]:
+    """
+    일 별 수익률을 받아, window일 구간 별 연 환산 수익률, 연간 변동성, Sharpe/Sortino 비율과 drawdown을 반환 (series 별).
+    모든 구간 지표는 누적 합의 차이로 계산하므로, 구간 길이와 관계없이 O(days x series)
+    
+    Args:
+        daily_returns (pd.DataFrame): 일 별 수익률 (days x series)
+        window (int): 구간 길이 (거래일)
+        risk_free (float): 연간 무위험 수익률 (소수점)
     """
-    available_dates = daily_return.index.sort_values()
+    returns = daily_returns.to_numpy(dtype=float).reshape(len(daily_returns), -1)
+    assert 2 <= window <= len(returns), "window는 2 이상, 데이터 길이 이하여야 합니다."
+    
+    daily_risk_free = (1 + risk_free) ** (1 / 252) - 1
+    
+    # 연 환산 수익률: 구간 로그 수익률 합 x (252 / window)
+    annual_return = np.expm1(_rolling_sum(np.log1p(returns), window) * 252 / window)
+    
+    # 분산은 이동하지 않으므로, 전체 평균을 뺀 값으로 합/제곱합을 계산하여 자릿수 손실을 줄임
+    center = returns.mean(axis=0)
+    centered = returns - center
+    sums = _rolling_sum(centered, window)
+    squared_sums = _rolling_sum(centered ** 2, window)
+    
+    variance = np.maximum((squared_sums - sums ** 2 / window) / (window - 1), 0.0)
+    volatility = np.sqrt(variance * 252)
+    
+    # 무위험 수익률보다 낮은 수익률만 반영한 하방 편차
+    downside_deviation = np.sqrt(_rolling_sum(np.minimum(returns - daily_risk_free, 0.0) ** 2, window) / window * 252)
+    excess_return = (sums / window + center - daily_risk_free) * 252
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(volatility > 0, excess_return / volatility, np.nan)
+        sortino = np.where(downside_deviation > 0, excess_return / downside_deviation, np.nan)
     
-    # 샘플 가능한 시작 지점
-    latest_start_date = available_dates[-1] - pd.DateOffset(years=invest_year)
-    valid_start_dates = available_dates[available_dates <= latest_start_date]
+    index = daily_returns.index[window - 1:]
+    drawdown, drawdown_duration = get_drawdowns(daily_returns)
+    
+    metrics = {
+        "annual_return": annual_return,
+        "volatility": volatility,
+        "sharpe": sharpe,
+        "sortino": sortino,
+    }
+    metrics = {name: pd.DataFrame(values, index=index, columns=daily_returns.columns) for name, values in metrics.items()}
+    metrics.update(drawdown=drawdown, drawdown_duration=drawdown_duration)
+
+    return metrics
+
+@timed("metrics.correlation")
+def correlation_matrix(returns: np.ndarray, downward_only: bool = False, block_size: int = 4096) -> np.ndarray:
+    """
+    일 별 수익률 (days x assets)에서 모든 종목 쌍의 상관계수 행렬 (assets x assets) 반환.
+    block_size일씩 (block x assets).T @ (block x assets)를 누적하므로, 종목 수가 많아도 복사본 없이 행렬 곱 몇 번으로 계산.
+    downward_only면 음수 수익률만 반영한 하방 반상관계수 Σ min(x, 0) min(y, 0) / sqrt(Σ min(x, 0)² Σ min(y, 0)²) 반환
+    (frontier.risk_matrix()의 하방 반공분산을 정규화한 값)
+
+    Args:
+        returns (np.ndarray): 일 별 수익률 (days x assets)
+        downward_only (bool): 하락 구간만 계산할지 여부
+        block_size (int): 한 번에 곱할 날짜 수
+    """
+    assert len(returns) >= 2, "상관계수는 2일 이상의 수익률이 필요합니다."
+
+    # 전체 평균을 뺀 값으로 곱하여 자릿수 손실을 줄임
+    center = 0.0 if downward_only else returns.mean(axis=0)
+    products = np.zeros((returns.shape[1], returns.shape[1]))
+
+    for start in range(0, len(returns), block_size):
+        block = returns[start:start + block_size] - center
+        if downward_only:
+            block = np.minimum(block, 0.0)
+        products += block.T @ block
+
+    scale = np.sqrt(np.diag(products))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlations = np.clip(products / np.outer(scale, scale), -1.0, 1.0)
+    np.fill_diagonal(correlations, 1.0)
+
+    return correlations
+
+def rolling_correlation(returns: np.ndarray, pairs: list[tuple[int, int]], window: int = 252, downward_only: bool = False) -> np.ndarray:
+    """
+    종목 쌍 별 window일 구간 상관계수 (days - window + 1 x pairs)를 누적 합의 차이로 O(days x pairs)에 계산
+
+    Args:
+        returns (np.ndarray): 일 별 수익률 (days x assets)
+        pairs (list[tuple[int, int]]): 종목 index 쌍
+        window (int): 구간 길이 (거래일)
+        downward_only (bool): 하락 구간만 계산할지 여부 (하방 반상관계수)
+    """
+    assert 2 <= window <= len(returns), "window는 2 이상, 데이터 길이 이하여야 합니다."
+
+    first, second = (np.array(index, dtype=np.int64) for index in zip(*pairs)) if pairs else (np.empty(0, dtype=np.int64),) * 2
+
+    if downward_only:
+        downside = np.minimum(returns, 0.0)
+        x, y = downside[:, first], downside[:, second]
+
+        products = _rolling_sum(x * y, window)
+        x_scale, y_scale = _rolling_sum(x ** 2, window), _rolling_sum(y ** 2, window)
+    else:
+        centered = returns - returns.mean(axis=0)
+        x, y = centered[:, first], centered[:, second]
+        x_sums, y_sums = _rolling_sum(x, window), _rolling_sum(y, window)
+
+        products = _rolling_sum(x * y, window) - x_sums * y_sums / window
+        x_scale = np.maximum(_rolling_sum(x ** 2, window) - x_sums ** 2 / window, 0.0)
+        y_scale = np.maximum(_rolling_sum(y ** 2, window) - y_sums ** 2 / window, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.clip(products / np.sqrt(x_scale * y_scale), -1.0, 1.0)
+
+def _screen_block(returns: np.ndarray, ranges: np.ndarray, dates: pd.DatetimeIndex, invest_years: list[int], downward_only: bool) -> np.ndarray:
+    """
+    NaN으로 채워진 수익률 block (days x tickers)의 각 종목을 자신의 전체 기간에서 평가하여
+    (연 평균 수익률, 연간 변동성, 투자 기간 별 구간 수익률의 중앙값과 하위 5%)를 (tickers x metrics) 배열로 반환
+    """
+    years = dates.year.to_numpy()
+    valid = ~np.isnan(returns)
+    num_tickers = returns.shape[1]
     
-    if len(valid_start_dates) == 0:
-        raise ValueError(f"투자 기간({invest_year}년)에 해당하는 충분한 데이터가 없습니다.")
+    # get_annual_return()/get_annual_volatility()와 같이 종목 별 첫 & 마지막 연도 제거
+    has_data = ranges[:, 1] > ranges[:, 0]
+    first_years = np.where(has_data, years[np.minimum(ranges[:, 0], len(years) - 1)], 0)
+    last_years = np.where(has_data, years[np.maximum(ranges[:, 1] - 1, 0)], 0)
+    trimmed = valid & (years[:, None] > first_years) & (years[:, None] < last_years)
     
-    sampled_start_dates = np.random.choice(valid_start_dates, size=sample_num, replace=False)
-    sampled_returns = []
+    num_years = np.where(has_data, last_years - first_years - 1, 0)
+    log_growth = np.where(trimmed, np.log1p(np.where(valid, returns, 0.0)), 0.0).sum(axis=0)
     
-    for start_date in sampled_start_dates:
-        target_date = start_date + pd.DateOffset(years=invest_year)
-        future_dates = available_dates[available_dates >= target_date] # target_date가 실제 존재하지 않으면, 가장 가까운 다음 거래일 찾기
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annual_returns = np.where(num_years > 0, np.exp(log_growth / num_years) - 1, np.nan)
         
-        # 해당 기간 이후 데이터가 없으면 스킵
-        if len(future_dates) == 0:
+    volatilities = _mean_yearly_volatility(returns, years, downward_only, trimmed)
+    
+    metrics = np.full((num_tickers, 2 + 2 * len(invest_years)), np.nan)
+    metrics[:, 0], metrics[:, 1] = annual_returns, volatilities
+    
+    # 구간 수익률은 종목 별 거래일만으로 long_term_investment와 같은 방식(RollingReturns)으로 계산
+    dates_array = dates.to_numpy(dtype='datetime64[ns]')
+    for col in range(num_tickers):
+        positions = np.flatnonzero(valid[:, col])
+        if len(positions) == 0:
             continue
         
-        actual_end_date = future_dates[0]
-        invest_period = daily_return.loc[start_date:actual_end_date]
+        log_prices = np.concatenate(([0.0], np.cumsum(np.log1p(returns[positions, col]))))
+        rolling_returns = RollingReturns.from_arrays(dates_array[positions], log_prices)
         
-        cumulative_earning = (1 + invest_period).cumprod().iloc[-1]
-        annualized_return = float(cumulative_earning.iloc[0]) ** (1 / invest_year) - 1
-        sampled_returns.append(annualized_return * 100)
+        for i, invest_year in enumerate(invest_years):
+            try:
+                window_returns = rolling_returns.window_returns(invest_year) / 100
+            except ValueError: # 투자 기간보다 데이터가 짧은 종목
+                continue
+            
+            if len(window_returns) > 0:
+                metrics[col, 2 + 2 * i] = np.median(window_returns)
+                metrics[col, 3 + 2 * i] = np.percentile(window_returns, 5)
+                
+    return metrics
+
+@timed("metrics.screen")
+def screen_universe(store: ReturnsStore, invest_years: list[int], downward_only: bool = False) -> pd.DataFrame:
+    """
+    ReturnsStore의 모든 종목을 자신의 전체 기간에서 평가하여 (다른 종목의 상장일에 맞춰 기간을 자르지 않음)
+    연 평균 수익률, 연간 (하락) 변동성, 투자 기간 별 구간 연 평균 수익률의 중앙값과 하위 5%를 종목 별로 반환.
+    block 단위로 읽고 계산하므로 종목 수와 관계없이 메모리 사용량은 (날짜 수 x block_size)로 제한됨
+    
+    Args:
+        store (ReturnsStore): 종목 별 수익률 store
+        invest_years (list[int]): 구간 수익률을 계산할 투자 기간 (년)
+        downward_only (bool): 하락 구간만 계산할지 여부
+    """
+    columns = ["annual_return", "volatility"]
+    for invest_year in invest_years:
+        columns += [f"{invest_year}y_median", f"{invest_year}y_p5"]
+        
+    results = [_screen_block(returns, ranges, store.dates, invest_years, downward_only) for _, returns, ranges in store.blocks()]
+    
+    screened = pd.DataFrame(np.concatenate(results) if results else np.empty((0, len(columns))), index=pd.Index(store.tickers, name="ticker"), columns=columns)
+    
+    has_data = store.ranges[:, 1] > store.ranges[:, 0]
+    screened.insert(0, "start_date", pd.Series(store.dates[np.minimum(store.ranges[:, 0], len(store.dates) - 1)], index=screened.index).where(has_data))
+    screened.insert(1, "end_date", pd.Series(store.dates[np.maximum(store.ranges[:, 1] - 1, 0)], index=screened.index).where(has_data))
     
-    return sampled_returns
\ No newline at end of file
+    return screened
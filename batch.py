@@ -0,0 +1,136 @@
+import matplotlib
+matplotlib.use("Agg") # 화면 출력 없이 파일로만 저장하는 backend 사용
+
+import os
+import json
+import argparse
+from graphlib import TopologicalSorter
+import matplotlib.pyplot as plt
+
+from utils import parse_string_digit_pairs
+from context import AnalysisContext, panel_key
+from main import build_parser, build_price_cache, build_result_cache, run_analysis
+
+# AnalysisContext를 만들 때 사용하는 arguments. 값이 다른 작업끼리는 context를 공유하지 않음
+CONTEXT_OPTIONS = ("cache_dir", "offline_dir", "no_refresh", "fetch_workers", "retries", "rate_limit", "metrics_dir", "result_cache_dir")
+
+def load_job_spec(path: str) -> dict:
+    """
+    JSON 혹은 YAML 형식의 작업 명세를 불러옴
+    {"defaults": {<공통 arguments>}, "jobs": [{"analysis": ..., "tickers": ..., ...}, ...]}
+    
+    Args:
+        path (str): 작업 명세 파일 경로 (.json, .yaml, .yml)
+    """
+    with open(path, encoding="utf-8") as f:
+        if os.path.splitext(path)[1] in (".yaml", ".yml"):
+            import yaml # YAML 명세를 사용할 때만 필요
+            return yaml.safe_load(f)
+        
+        return json.load(f)
+
+def job_to_argv(options: dict) -> list[str]:
+    """
+    작업 arguments dict를 main.py의 command line arguments로 변환 (True는 flag, False/None은 생략, list는 띄어쓰기로 연결)
+    
+    Args:
+        options (dict): 작업 arguments (e.g. {"analysis": "long_term_investment", "tickers": "QQQ5IEF5"})
+    """
+    argv = []
+    
+    for key, value in options.items():
+        if value is None or value is False:
+            continue
+        if value is True:
+            argv.append(f"--{key}")
+            continue
+        if isinstance(value, (list, tuple)):
+            value = " ".join(str(v) for v in value)
+        
+        argv.extend([f"--{key}", str(value)])
+    
+    return argv
+
+def job_to_args(job: dict, defaults: dict = None) -> argparse.Namespace:
+    """
+    작업 하나를 main.py의 arguments로 변환 (main.py와 같은 parser로 검증)
+    
+    Args:
+        job (dict): 작업 arguments (e.g. {"analysis": "long_term_investment", "tickers": "QQQ5IEF5"})
+        defaults (dict): 모든 작업에 공통으로 적용할 arguments
+    """
+    return build_parser().parse_args(job_to_argv({**(defaults or {}), **job}))
+
+def required_tickers(args: argparse.Namespace) -> list[str]:
+    """
+    분석에 필요한 종목 번호 반환 (포트폴리오 문자열은 구성 종목으로 분리)
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+    """
+    if args.analysis == "avg_return_volatility":
+        return list(args.tickers)
+    
+    tickers = []
+    for portfolio_str in args.tickers:
+        tickers.extend(ticker for ticker, _ in parse_string_digit_pairs(portfolio_str))
+        
+    return list(dict.fromkeys(tickers))
+
+def build_job_graph(jobs: list[argparse.Namespace]) -> dict[tuple, set]:
+    """
+    작업 간 공유되는 데이터 로딩을 하나의 node로 합친 DAG 생성 (node -> 선행 node 집합)
+    - ("prices",): 모든 작업에 필요한 종목의 가격 데이터를 한 번에 불러옴
+    - ("panel", tickers): 같은 종목 구성의 수익률 panel은 (순서가 달라도) 한 번만 생성
+    - ("job", i): i번째 작업
+    
+    Args:
+        jobs (list[argparse.Namespace]): 작업 arguments
+    """
+    graph = {("prices",): set()}
+    
+    for i, args in enumerate(jobs):
+        panel_node = ("panel", panel_key(required_tickers(args)))
+        graph.setdefault(panel_node, {("prices",)})
+        graph[("job", i)] = {panel_node}
+        
+    return graph
+
+def run_batch(spec: dict):
+    """
+    작업 명세의 모든 분석을 하나의 process에서 수행 (가격 데이터와 수익률은 캐시 설정이 같은 작업 간 공유)
+    
+    Args:
+        spec (dict): 작업 명세
+    """
+    defaults = spec.get("defaults", {})
+    jobs = [job_to_args(job, defaults) for job in spec["jobs"]]
+    
+    # 가격 캐시, 지표 상태, 결과 캐시 설정이 같은 작업끼리 하나의 context를 공유 (같은 포트폴리오는 작업 간에 한 번만 계산)
+    groups = {}
+    for i, args in enumerate(jobs):
+        groups.setdefault(tuple(getattr(args, option) for option in CONTEXT_OPTIONS), []).append(i)
+    
+    for indices in groups.values():
+        group_jobs = [jobs[i] for i in indices]
+        context = AnalysisContext(build_price_cache(group_jobs[0]), group_jobs[0].metrics_dir, build_result_cache(group_jobs[0]))
+        
+        for node in TopologicalSorter(build_job_graph(group_jobs)).static_order():
+            if node[0] == "prices":
+                context.prefetch([ticker for args in group_jobs for ticker in required_tickers(args)])
+            elif node[0] == "panel":
+                # 이 panel을 사용하는 첫 번째 작업의 종목 순서로 생성 (다른 순서의 작업은 배열을 공유하는 view를 사용)
+                context.panel(next(tickers for tickers in map(required_tickers, group_jobs) if panel_key(tickers) == node[1]))
+            else:
+                args = group_jobs[node[1]]
+                print(f"[{indices[node[1]] + 1}/{len(jobs)}] {args.analysis}: {' '.join(args.tickers)}")
+                
+                run_analysis(args, context)
+                plt.close('all') # 작업마다 figure를 닫아 batch 중 메모리가 늘어나지 않도록 함
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many ETF analyses in one process")
+    parser.add_argument("spec", type=str, help="Path to JSON/YAML job spec")
+    
+    args = parser.parse_args()
+    run_batch(load_job_spec(args.spec))
@@ -0,0 +1,281 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import tracemalloc
+from datetime import datetime
+from functools import partial
+from typing import Callable, Iterator
+import numpy as np
+import pandas as pd
+
+from analysis import get_mixed_data, get_annual_return, get_annual_volatility, sample_random_returns
+from data_source import SyntheticDataSource
+from returns_panel import ReturnsPanel
+from simulation import simulate_windows
+from utils import stock_combination
+from commands import ANALYSIS_MODULES
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_PATH = os.path.join(BASE_DIR, "main.py")
+
+def measure(func: Callable, repeat: int = 3) -> dict:
+    """
+    func의 실행 시간(repeat번 중 최소값)과 최대 메모리 사용량(tracemalloc) 측정.
+    tracemalloc은 실행을 느리게 하므로 시간 측정과 별도로 한 번 더 실행
+
+    Args:
+        func (Callable): 측정할 함수 (인자 없음)
+        repeat (int): 시간을 측정할 반복 횟수
+    """
+    func() # 첫 실행의 캐시/할당 영향을 제외하기 위한 warm-up
+
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": min(seconds), "mean_seconds": float(np.mean(seconds)), "peak_memory_bytes": peak_memory}
+
+def synthetic_stock_info(num_tickers: int, num_years: int, seed: int = 0) -> list[pd.DataFrame]:
+    """
+    yf.download 형태의 GBM 가격 데이터 num_tickers개 생성
+
+    Args:
+        num_tickers (int): 종목 개수
+        num_years (int): 데이터 기간 (년)
+        seed (int): 난수 seed
+    """
+    source = SyntheticDataSource(num_days=252 * num_years, seed=seed)
+
+    return [source.fetch(f"T{i:03d}") for i in range(num_tickers)]
+
+def _sample_random_returns(daily_return: pd.DataFrame, invest_year: int, sample_num: int, seed: int) -> np.ndarray:
+    # 매 실행마다 같은 구간을 샘플링하도록 난수 생성기를 새로 만듦
+    return sample_random_returns(daily_return, invest_year, sample_num, np.random.default_rng(seed))
+
+def _count_combinations(stock_info: list[pd.DataFrame], abbrs: list[str], r: int) -> int:
+    # 생성기이므로 끝까지 소비해야 실제 비용이 측정됨
+    return sum(1 for _ in stock_combination(stock_info, abbrs, r))
+
+def benchmark_cases(args: argparse.Namespace) -> Iterator[tuple[str, dict, Callable]]:
+    """
+    (이름, 파라미터, 측정할 함수)를 하나씩 생성
+
+    Args:
+        args (argparse.Namespace): 벤치마크 arguments
+    """
+    for num_years in args.years:
+        for num_tickers in args.tickers:
+            stock_info = synthetic_stock_info(num_tickers, num_years, args.seed)
+            ratio = [1 / num_tickers] * num_tickers
+            params = {"tickers": num_tickers, "years": num_years}
+
+            yield "get_mixed_data", params, partial(get_mixed_data, stock_info, ratio)
+
+            panel = ReturnsPanel.from_stock_info(stock_info)
+            yield "get_mixed_data[panel]", params, partial(get_mixed_data, panel, ratio)
+            yield "get_annual_return[panel]", params, partial(get_annual_return, panel)
+            yield "get_annual_volatility[panel]", params, partial(get_annual_volatility, panel, True)
+
+        daily_return, _ = get_mixed_data(synthetic_stock_info(2, num_years, args.seed), [0.5, 0.5])
+        params = {"years": num_years}
+
+        yield "get_annual_return", params, partial(get_annual_return, daily_return)
+        for downward_only in (True, False):
+            yield "get_annual_volatility", {**params, "downward_only": downward_only}, partial(get_annual_volatility, daily_return, downward_only)
+
+        invest_year = min(args.invest_year, num_years - 1)
+        for sample_num in args.samples:
+            yield "sample_random_returns", {**params, "invest_year": invest_year, "samples": sample_num}, \
+                partial(_sample_random_returns, daily_return, invest_year, sample_num, args.seed)
+
+        # --all_windows처럼 매일 시작하는 모든 투자 구간을 매월 rebalance (구간 수가 날짜 수만큼 많아도 날짜 x 구간 반복이 없어야 함)
+        panel = ReturnsPanel.from_stock_info(synthetic_stock_info(2, num_years, args.seed))
+        start_idx = np.arange(len(panel.index) - 252 * invest_year)
+        weights = np.array([[0.5], [0.5]])
+        for contribution in ("none", "monthly"):
+            yield "simulate_windows[all_windows]", {**params, "invest_year": invest_year, "contribution": contribution}, \
+                partial(simulate_windows, panel.values, weights, panel.index, start_idx, start_idx + 252 * invest_year - 1, "monthly", None, contribution)
+
+    # 조합 생성은 데이터 기간과 무관하므로 종목 개수만 변경
+    for num_tickers in args.tickers:
+        stock_info = synthetic_stock_info(num_tickers, 1, args.seed)
+        abbrs = [f"T{i:03d}" for i in range(num_tickers)]
+
+        for r in args.num_assets:
+            if r <= num_tickers:
+                yield "stock_combination", {"tickers": num_tickers, "r": r}, partial(_count_combinations, stock_info, abbrs, r)
+
+def measure_startup(argv: list[str], repeat: int = 3, returncode: int = 0) -> dict:
+    """
+    새로운 python process로 argv를 실행하는 데 걸린 시간(repeat번 중 최소값)과, -X importtime으로 측정한 import 시간 및
+    가장 오래 걸린 import들 (최상위 module과 그 바로 아래 module) 반환 (process를 새로 띄우므로 이미 불러온 module의 영향을 받지 않음).
+    실행 위치와 무관하도록 저장소 디렉토리에서 실행하며, 종료 코드가 returncode와 다르면 (실패한 실행의 시간이므로) 예외 발생
+
+    Args:
+        argv (list[str]): python 뒤에 붙일 arguments (e.g. [MAIN_PATH, "--help"])
+        repeat (int): 측정할 반복 횟수
+        returncode (int): 예상되는 종료 코드
+    """
+    seconds = []
+    import_seconds = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-X", "importtime", *argv], capture_output=True, text=True, cwd=BASE_DIR)
+        seconds.append(time.perf_counter() - start)
+
+        stderr = completed.stderr
+        if completed.returncode != returncode:
+            errors = [line for line in stderr.splitlines() if not line.startswith("import time:")]
+            raise RuntimeError(f"{' '.join(argv)}의 종료 코드가 {returncode}이 아닌 {completed.returncode}입니다: {' '.join(errors[-3:])}")
+
+        # "import time: self [us] | cumulative | imported package"에서 들여쓰기가 깊이를 나타내므로, 최상위 import만 합산
+        total = 0.0
+        imports = {}
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+
+            _, cumulative, name = line[len("import time:"):].split("|")
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+
+            if depth == 0:
+                total += int(cumulative) / 1e6
+            if depth <= 1:
+                imports[name.strip()] = int(cumulative) / 1e6
+
+        import_seconds.append(total)
+
+    slowest = sorted(imports.items(), key=lambda item: -item[1])[:5]
+
+    return {"seconds": min(seconds), "mean_seconds": float(np.mean(seconds)), "peak_memory_bytes": 0,
+            "import_seconds": min(import_seconds), "top_imports": dict(slowest)}
+
+def startup_cases() -> Iterator[tuple[str, dict, list[str], int]]:
+    """
+    (이름, 파라미터, python arguments, 예상 종료 코드)를 하나씩 생성. CLI 자체의 시작 시간과 분석 module 별 import 시간을 측정
+    """
+    yield "startup", {"command": "main.py --help"}, [MAIN_PATH, "--help"], 0
+    # 잘못된 분석 이름은 argparse가 종료 코드 2로 거절하는 것이 정상
+    yield "startup", {"command": "main.py --analysis invalid"}, [MAIN_PATH, "--analysis", "invalid", "--tickers", "SPY"], 2
+
+    for analysis, module in ANALYSIS_MODULES.items():
+        yield "startup", {"command": f"import {module}"}, ["-c", f"import {module}"], 0
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(args: argparse.Namespace) -> dict:
+    """
+    모든 벤치마크를 실행하고, 실행 환경과 결과를 dict로 반환
+
+    Args:
+        args (argparse.Namespace): 벤치마크 arguments
+    """
+    results = []
+
+    for name, params, func in benchmark_cases(args):
+        if args.filter is not None and args.filter not in name:
+            continue
+
+        result = {"name": name, "params": params, **measure(func, args.repeat)}
+        results.append(result)
+
+        print(f"{name:<30} {json.dumps(params):<55} {result['seconds'] * 1000:>10.2f} ms {result['peak_memory_bytes'] / 2 ** 20:>9.2f} MiB")
+
+    # 시작 시간은 새로운 process로 측정하므로 warm-up 없이 측정
+    for name, params, argv, returncode in startup_cases():
+        if args.filter is not None and args.filter not in name:
+            continue
+
+        result = {"name": name, "params": params, **measure_startup(argv, args.repeat, returncode)}
+        results.append(result)
+
+        print(f"{name:<30} {json.dumps(params):<55} {result['seconds'] * 1000:>10.2f} ms (imports {result['import_seconds'] * 1000:.2f} ms)")
+
+    return {
+        "revision": git_revision(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+def compare_benchmarks(baseline: dict, current: dict, threshold: float = 1.1) -> list[dict]:
+    """
+    같은 이름과 파라미터의 결과끼리 실행 시간과 메모리 비율(current / baseline)을 비교하여 출력 후 반환
+
+    Args:
+        baseline (dict): 기준이 되는 벤치마크 결과
+        current (dict): 비교할 벤치마크 결과
+        threshold (float): 실행 시간 비율이 이 값보다 크면 느려진 것으로 표시
+    """
+    def key(result):
+        return result["name"], json.dumps(result["params"], sort_keys=True)
+
+    baseline_results = {key(result): result for result in baseline["results"]}
+    comparisons = []
+
+    print(f"\n{baseline.get('revision')} -> {current.get('revision')}")
+    for result in current["results"]:
+        old = baseline_results.get(key(result))
+        if old is None:
+            continue
+
+        time_ratio = result["seconds"] / old["seconds"] if old["seconds"] > 0 else float("nan")
+        memory_ratio = result["peak_memory_bytes"] / old["peak_memory_bytes"] if old["peak_memory_bytes"] > 0 else float("nan")
+        comparisons.append({"name": result["name"], "params": result["params"], "time_ratio": time_ratio, "memory_ratio": memory_ratio})
+
+        mark = " (slower)" if time_ratio > threshold else ""
+        print(f"{result['name']:<30} {json.dumps(result['params']):<55} time x{time_ratio:>6.2f}  memory x{memory_ratio:>6.2f}{mark}")
+
+    return comparisons
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark analysis hot paths on synthetic (GBM) price data")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[2, 8, 32], help="Ticker counts to benchmark (default: 2 8 32)")
+    parser.add_argument("--years", type=int, nargs="+", default=[10, 30], help="History lengths in years (default: 10 30)")
+    parser.add_argument("--samples", type=int, nargs="+", default=[100, 1000, 10000], help="Sample counts for sample_random_returns (default: 100 1000 10000)")
+    parser.add_argument("--num_assets", type=int, nargs="+", default=[2, 3], help="Combination sizes for stock_combination (default: 2 3)")
+    parser.add_argument("--invest_year", type=int, default=5, help="Investment period for sample_random_returns (default: 5)")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs per case; the minimum is reported (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for synthetic data and sampling (default: 0)")
+    parser.add_argument("--filter", type=str, default=None, help="Run only cases whose name contains this string (default: None)")
+    parser.add_argument("--output", type=str, default="./output/benchmark.json", help="Path to save the results as JSON (default: ./output/benchmark.json)")
+    parser.add_argument("--compare", type=str, default=None, help="Baseline JSON to compare the results against (default: None)")
+
+    return parser
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+
+    current = run_benchmarks(args)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as f:
+            compare_benchmarks(json.load(f), current)
@@ -0,0 +1,27 @@
+import importlib
+from typing import Callable
+
+# 분석 방법 -> 분석을 수행하는 module. 각 module은 run(args, context) -> str을 정의하며,
+# 실제로 수행할 분석의 module만 불러오므로 다른 분석이 사용하는 라이브러리는 불러오지 않음
+ANALYSIS_MODULES = {
+    "avg_return_volatility": "commands.avg_return_volatility",
+    "compare_avg_return_volatility": "commands.compare_avg_return_volatility",
+    "long_term_investment": "commands.long_term_investment",
+    "cummulative_return": "commands.cummulative_return",
+    "rolling_metrics": "commands.rolling_metrics",
+    "screen": "commands.screen",
+    "correlation": "commands.correlation",
+}
+
+AVAIL_ANALYSIS = list(ANALYSIS_MODULES)
+
+def get_runner(analysis: str) -> Callable:
+    """
+    분석 방법에 해당하는 module을 불러와 run 함수 반환
+
+    Args:
+        analysis (str): 분석 방법
+    """
+    assert analysis in ANALYSIS_MODULES, f"{analysis}은 가능한 분석 목록에 없습니다."
+
+    return importlib.import_module(ANALYSIS_MODULES[analysis]).run
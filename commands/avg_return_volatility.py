@@ -0,0 +1,200 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+from analysis import evaluate_portfolios
+from utils import portfolio_candidates, get_combined_ticker, get_ratio_scale, simplify_ticker, assign_color, export_points
+from context import AnalysisContext
+from frontier import efficient_frontier
+from profiling import stage, count
+from commands.common import single_ticker_metrics
+
+def run(args: argparse.Namespace, context: AnalysisContext) -> str:
+    """
+    특정 종목 혹은 여러 종목들의 조합(포트폴리오)에 대한 연평균 수익률과 연평균 변동률 분석
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+        context (AnalysisContext): 가격 데이터 및 수익률을 공유할 context
+    """
+    if args.frontier:
+        return run_frontier(args, context)
+    
+    assert len(args.tickers) == len(args.abbrs), "Tickers와 abbrs의 개수가 같아야 합니다."
+    assert all(len(abbr) == 1 for abbr in args.abbrs), "각 종목은 1개의 알파벳으로 표현해야 합니다."
+    assert len(args.abbrs) == len(set(args.abbrs)), "각 종목은 각각 다른 알파벳으로 표현해야 합니다."
+    assert args.must_include is None or all(len(abbr) == 1 for abbr in args.must_include), "must_include는 abbreviation으로 주어져야 합니다."
+    assert args.must_include is None or all(abbr in args.abbrs for abbr in args.must_include), "must_include에 포함된 종목들은 abbrs 안에 정의돼있어야 합니다."
+    assert len(args.tickers) == 1 or 2 <= args.num_assets <= len(args.tickers), "num_assets는 2 이상, 종목 개수 이하여야 합니다."
+    
+    save_dir = f"{args.save_path}/avg_return_volatility/"
+    if not os.path.exists(save_dir):
+        os.makedirs(save_dir)
+        
+    stock_info = context.multiple_stock_info(args.tickers)
+        
+    # get_annual_return()와 get_annual_volatility()에서 첫 & 마지막 연도 제거할 것을 고려하여 설정
+    start_year = stock_info[0].index.min().year + 1
+    end_year = stock_info[0].index.max().year - 1
+    
+    # 모든 종목을 한 번만 정렬한 뒤, (days x assets) @ (assets x portfolios)로 모든 포트폴리오를 한 번에 계산
+    # (이미 계산한 포트폴리오는 context의 result_cache에서 가져옴)
+    analysed_info = {}
+    
+    if len(args.tickers) > 1:
+        # 상관계수가 max_corr보다 높은 쌍이 포함된 조합은 비율 별로 평가하기 전에 제외 (downward_only면 하방 반상관계수 사용)
+        allowed = None
+        if args.max_corr is not None:
+            allowed = context.correlation(args.tickers, args.downward_only) <= args.max_corr
+            
+        # 후보 포트폴리오는 생성기로 하나씩 만들어 chunk 단위로 병렬 평가
+        candidates = portfolio_candidates(args.abbrs, args.num_assets, args.ratio_step, args.must_include, allowed)
+        ratio_scale = get_ratio_scale(args.ratio_step)
+        
+        with stage("metrics.portfolios"):
+            for index_comb, ratio, avg_return, avg_volatility in context.portfolio_metrics(
+                args.tickers, candidates, args.downward_only, args.chunk_size, args.workers
+            ):
+                abbr_comb = [args.abbrs[i] for i in index_comb]
+                combined_ticker = get_combined_ticker(abbr_comb, ratio, ratio_scale)
+                assert combined_ticker not in analysed_info, f"포트폴리오 이름 {combined_ticker}이(가) 중복됩니다."
+                analysed_info[combined_ticker] = (avg_return, avg_volatility)
+        count("portfolios", len(analysed_info))
+                
+    # 개별 종목은 해당 종목의 비율만 1인 포트폴리오로 계산
+    avg_returns, avg_volatilities = single_ticker_metrics(args, context, args.tickers)
+    analysed_info.update(zip(args.tickers, zip(avg_returns, avg_volatilities)))
+            
+    color_map = assign_color(list(set([simplify_ticker(ticker) for ticker in analysed_info.keys()])))
+    
+    file_name = "-".join([ticker for ticker in args.tickers])
+    
+    if args.downward_only:
+        file_name += "-downward_only"
+    if args.must_include is not None:
+        file_name += "-must_include-"
+        file_name += "-".join([ticker for ticker in args.must_include])
+    if args.max_corr is not None:
+        file_name += f"-max_corr_{args.max_corr:g}"
+        
+    file_path = f"{save_dir}/{file_name}"
+        
+    names = list(analysed_info.keys())
+    points = pd.DataFrame(np.array(list(analysed_info.values())).reshape(-1, 2) * 100, index=pd.Index(names, name="portfolio"), columns=["return", "volatility"])
+    
+    if args.export is not None:
+        export_points(points, file_path, args.export)
+    if args.no_plot:
+        return file_path
+
+    from plotting import get_figure, save_figure, scatter_points # 그림을 그릴 때만 matplotlib을 불러옴
+    
+    colors = [color_map.get(simplify_ticker(name), "gray") for name in names]
+
+    fig, ax = get_figure("avg_return_volatility", (10, 6))
+    scatter_points(ax, points["volatility"], points["return"], colors, names)
+
+    abbr_text = "\n".join([f"{abbr}: {ticker}" for abbr, ticker in zip(args.abbrs, args.tickers)])
+    ax.text(1.02, 0.5, abbr_text, transform=ax.transAxes, fontsize=10, verticalalignment='center', bbox=dict(facecolor='white', alpha=0.5))
+
+    x_label = "Downside Volatility" if args.downward_only else "Volatility"
+    
+    ax.set_xlabel(f"{x_label} (%)")
+    ax.set_ylabel("Average Annual Return (%)")
+    ax.set_title(f"Average Return & {x_label} ({start_year} ~ {end_year})")
+    ax.grid(True, linestyle='--', alpha=0.7)
+    
+    save_figure(fig, f"{file_path}.png")
+        
+    return file_path
+
+def run_frontier(args: argparse.Namespace, context: AnalysisContext) -> str:
+    """
+    모든 종목에 대해 (하방) 공분산 행렬을 한 번만 계산하고, 기대 수익률 별 최소 위험 포트폴리오(효율적 투자선)를 최적화하여
+    개별 종목들과 함께 연평균 수익률 & 연평균 변동률 그래프에 표시. 아래에는 효율적 투자선을 따라 투자 비율 변화를 표시
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+        context (AnalysisContext): 가격 데이터 및 수익률을 공유할 context
+    """
+    assert len(args.tickers) >= 2, "효율적 투자선은 2개 이상의 종목이 필요합니다."
+    assert len(args.tickers) == len(set(args.tickers)), "각 종목은 한 번씩만 주어져야 합니다."
+    assert args.frontier_points >= 2, "frontier_points는 2 이상이어야 합니다."
+    
+    save_dir = f"{args.save_path}/avg_return_volatility/"
+    if not os.path.exists(save_dir):
+        os.makedirs(save_dir)
+        
+    returns_panel = context.panel(args.tickers)
+    trimmed_panel = returns_panel.trim_first_last_year()
+    start_year, end_year = trimmed_panel.years[0], trimmed_panel.years[-1]
+    
+    with stage("metrics.frontier"):
+        weights, expected_returns, _ = efficient_frontier(trimmed_panel.values, args.downward_only, args.frontier_points)
+    count("portfolios", weights.shape[1])
+    
+    # 최적화한 투자 비율을 다른 분석과 같은 기준(연 평균 수익률, 연도 별 변동성의 평균)으로 다시 평가
+    with stage("metrics.portfolios"):
+        frontier_returns, frontier_volatilities = evaluate_portfolios(returns_panel, weights, args.downward_only)
+    avg_returns, avg_volatilities = single_ticker_metrics(args, context, args.tickers)
+    
+    file_name = "-".join(args.tickers)
+    if len(file_name) > 200:
+        file_name = f"{args.tickers[0]}-{len(args.tickers)}_tickers" # 파일 이름 길이 제한을 넘지 않도록 줄임
+    
+    file_name += "-frontier"
+    if args.downward_only:
+        file_name += "-downward_only"
+        
+    file_path = f"{save_dir}/{file_name}"
+    
+    frontier_names = [f"frontier_{i}" for i in range(weights.shape[1])]
+    points = pd.DataFrame(
+        np.column_stack([np.concatenate([frontier_returns, avg_returns]), np.concatenate([frontier_volatilities, avg_volatilities])]) * 100,
+        index=pd.Index(frontier_names + args.tickers, name="portfolio"), columns=["return", "volatility"],
+    )
+    
+    if args.export is not None:
+        # 효율적 투자선 위의 포트폴리오는 종목 별 투자 비율도 함께 저장 (개별 종목은 비율 없음)
+        ratios = pd.DataFrame(weights.T, index=frontier_names, columns=args.tickers).add_prefix("weight_")
+        export_points(points.join(ratios), file_path, args.export)
+    if args.no_plot:
+        return file_path
+
+    from plotting import get_figure, save_figure, scatter_points # 그림을 그릴 때만 matplotlib을 불러옴
+    
+    color_map = assign_color(args.tickers)
+    colors = [color_map[ticker] for ticker in args.tickers]
+    x_label = "Downside Volatility" if args.downward_only else "Volatility"
+    
+    fig, (ax, weight_ax) = get_figure("avg_return_volatility", (10, 10), nrows=2)
+    
+    scatter_points(ax, avg_volatilities * 100, avg_returns * 100, colors, size=100)
+    with stage("render.draw"):
+        for ticker, volatility, avg_return in zip(args.tickers, avg_volatilities, avg_returns):
+            ax.annotate(ticker, (volatility * 100, avg_return * 100), textcoords="offset points", xytext=(0, 8), ha='center', fontsize=8)
+            
+        ax.plot(frontier_volatilities * 100, frontier_returns * 100, color='black', marker='o', markersize=3, linewidth=1.5, label="Efficient Frontier")
+        
+        # 효율적 투자선 위에서 한 번이라도 투자되는 종목만 표시
+        used = weights.max(axis=1) > 1e-4
+        used_tickers = [ticker for ticker, is_used in zip(args.tickers, used) if is_used]
+        weight_ax.stackplot(expected_returns * 100, weights[used] * 100, labels=used_tickers, colors=[color_map[ticker] for ticker in used_tickers], alpha=0.8)
+    
+    ax.set_xlabel(f"{x_label} (%)")
+    ax.set_ylabel("Average Annual Return (%)")
+    ax.set_title(f"Efficient Frontier: Average Return & {x_label} ({start_year} ~ {end_year})")
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend(loc='upper left')
+    
+    weight_ax.set_xlabel("Expected Annual Return on Frontier (%, mean of daily returns x 252)")
+    weight_ax.set_ylabel("Investment Ratio (%)")
+    weight_ax.set_ylim(0, 100)
+    weight_ax.set_xlim(expected_returns.min() * 100, expected_returns.max() * 100)
+    weight_ax.legend(loc='center left', bbox_to_anchor=(1.01, 0.5), fontsize=8, ncol=1 + len(used_tickers) // 20)
+    
+    fig.tight_layout()
+    save_figure(fig, f"{file_path}.png")
+    
+    return file_path
@@ -0,0 +1,54 @@
+import argparse
+import numpy as np
+
+from context import AnalysisContext
+
+def single_ticker_metrics(args: argparse.Namespace, context: AnalysisContext, tickers: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    개별 종목들의 연 평균 수익률과 연간 변동성 반환 (지표 상태가 있으면 새로운 날짜만 반영하여 사용)
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+        context (AnalysisContext): 가격 데이터 및 수익률을 공유할 context
+        tickers (list[str]): 종목 번호
+    """
+    state = context.metrics(tickers)
+    if state is not None:
+        return state.annual_return(), state.annual_volatility(args.downward_only)
+    
+    # 개별 종목은 해당 종목의 비율만 1인 포트폴리오로 계산 (이미 계산한 종목은 result_cache에서 가져옴)
+    candidates = [((i,), (1.0,)) for i in range(len(tickers))]
+    evaluated = list(context.portfolio_metrics(tickers, candidates, args.downward_only))
+    
+    return np.array([avg_return for _, _, avg_return, _ in evaluated]), np.array([avg_volatility for _, _, _, avg_volatility in evaluated])
+
+def get_invest_years(args: argparse.Namespace) -> list[int]:
+    """
+    --min_year부터 --max_year까지 --interval 간격의 투자 기간 (마지막은 항상 --max_year)
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+    """
+    years = list(range(args.min_year, args.max_year + 1, args.interval))
+    if years[-1] != args.max_year:
+        years.append(args.max_year)
+        
+    return years
+
+def investment_suffix(args: argparse.Namespace) -> str:
+    """
+    rebalance/적립 방식이 기본값(매일 rebalance, 거치식)과 다르면 파일 이름에 붙일 suffix 반환
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+    """
+    suffix = ""
+    
+    if args.rebalance != "daily":
+        suffix += f"-{args.rebalance}_rebalance"
+    if args.drift_band is not None:
+        suffix += f"-band_{args.drift_band:g}"
+    if getattr(args, "contribution", "none") != "none":
+        suffix += f"-{args.contribution}_contribution"
+        
+    return suffix
@@ -0,0 +1,115 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+from utils import parse_string_digit_pairs, assign_color, export_points
+from context import AnalysisContext
+from profiling import stage, count
+from commands.common import single_ticker_metrics
+
+def run(args: argparse.Namespace, context: AnalysisContext) -> str:
+    """
+    여러 포트폴리오 별 연평균 수익률과 연평균 변동률 비교
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+        context (AnalysisContext): 가격 데이터 및 수익률을 공유할 context
+    """
+    save_dir = f"{args.save_path}/compare_avg_return_volatility/"
+    if not os.path.exists(save_dir):
+        os.makedirs(save_dir)
+        
+    analysed_info = {}
+    
+    portfolio_list = []
+    ticker_list = []
+    
+    for portfolio_str in args.tickers:
+        portfolio = parse_string_digit_pairs(portfolio_str)
+        portfolio_list.append(portfolio)
+        
+        if len(portfolio) > 1:
+            ticker, _ = zip(*portfolio)
+        else:
+            ticker = portfolio[0][0]
+            
+        if type(ticker) == str:
+            ticker_list.append(ticker)
+        else:
+            ticker_list.extend(ticker)
+        
+    ticker_list = list(dict.fromkeys(ticker_list)) # 입력 순서를 유지하여 같은 구성의 panel을 재사용
+    stock_info = context.multiple_stock_info(ticker_list)
+    
+    start_year = stock_info[0].index.min().year + 1
+    end_year = stock_info[0].index.max().year - 1
+
+    ticker_index = {ticker: i for i, ticker in enumerate(ticker_list)}
+    
+    # 개별 종목에 대한 수익률 및 변동성 먼저 계산
+    avg_returns, avg_volatilities = single_ticker_metrics(args, context, ticker_list)
+    single_ticker_info = dict(zip(ticker_list, zip(avg_returns, avg_volatilities)))
+    
+    portfolio_names = []
+    candidates = []
+    
+    for portfolio in portfolio_list:
+        if len(portfolio) > 1: # 개별 종목에 대한 수익률 및 변동성은 위에서 계산 됐기에 생략 가능
+            tickers, ratios = zip(*portfolio)
+            
+            assert abs(sum(ratios) - 1) < 1e-6, "Ratio의 합은 1이어야 합니다."
+            candidates.append((tuple(ticker_index[ticker] for ticker in tickers), ratios))
+            
+            rounded_ratios = [round(r * 10) for r in ratios]
+            portfolio_names.append("-".join(f"{ticker}{ratio}" for ticker, ratio in zip(tickers, rounded_ratios)))
+    
+    # 포트폴리오들을 worker 개수만큼 나누어 병렬 평가
+    chunk_size = max(1, min(args.chunk_size, -(-len(candidates) // args.workers)))
+    evaluated = context.portfolio_metrics(ticker_list, candidates, args.downward_only, chunk_size, args.workers)
+    
+    with stage("metrics.portfolios"):
+        for portfolio_name, (_, _, avg_return, avg_volatility) in zip(portfolio_names, evaluated):
+            analysed_info[portfolio_name] = (avg_return, avg_volatility)
+    count("portfolios", len(analysed_info))
+        
+    color_map = assign_color(list(analysed_info.keys()) + list(single_ticker_info.keys()))
+    
+    file_name = "-".join([ticker for ticker in args.tickers])
+    if args.downward_only:
+        file_name += "-downward_only"
+        
+    file_path = f"{save_dir}/{file_name}"
+        
+    portfolio_points = pd.DataFrame(np.array(list(analysed_info.values())).reshape(-1, 2) * 100, index=list(analysed_info.keys()), columns=["return", "volatility"])
+    ticker_points = pd.DataFrame(np.array(list(single_ticker_info.values())).reshape(-1, 2) * 100, index=list(single_ticker_info.keys()), columns=["return", "volatility"])
+    
+    if args.export is not None:
+        points = pd.concat([portfolio_points, ticker_points]).rename_axis("portfolio")
+        export_points(points, file_path, args.export)
+    if args.no_plot:
+        return file_path
+
+    from plotting import get_figure, save_figure, scatter_points # 그림을 그릴 때만 matplotlib을 불러옴
+    from matplotlib.patches import Patch
+    
+    fig, ax = get_figure("compare_avg_return_volatility", (10, 6))
+    
+    portfolio_colors = [color_map[portfolio_name] for portfolio_name in portfolio_points.index]
+    scatter_points(ax, portfolio_points["volatility"], portfolio_points["return"], portfolio_colors)
+    legend_handles = [Patch(facecolor=color, edgecolor='black', label=f"{portfolio_name}") for portfolio_name, color in zip(portfolio_points.index, portfolio_colors)]
+    
+    ticker_colors = [color_map[ticker_name] for ticker_name in ticker_points.index]
+    scatter_points(ax, ticker_points["volatility"], ticker_points["return"], ticker_colors, list(ticker_points.index))
+        
+    x_label = "Downside Volatility" if args.downward_only else "Volatility"
+    
+    ax.set_xlabel(f"{x_label} (%)")
+    ax.set_ylabel("Average Annual Return (%)")
+    ax.set_title(f"Average Return & {x_label} ({start_year} ~ {end_year})")
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend(handles=legend_handles, title="Portfolios",loc='lower right', bbox_to_anchor=(0.98, 0.02), fontsize=10)
+    
+    save_figure(fig, f"{file_path}.png")
+        
+    return file_path
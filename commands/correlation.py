@@ -0,0 +1,94 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+from analysis import rolling_correlation
+from utils import assign_color, export_points
+from context import AnalysisContext
+from profiling import stage, count
+
+def run(args: argparse.Namespace, context: AnalysisContext) -> str:
+    """
+    종목들의 모든 쌍에 대한 (하방 반)상관계수 행렬과, 상관계수가 가장 낮은 --top개 쌍의 --window일 구간 상관계수 분석
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+        context (AnalysisContext): 가격 데이터 및 수익률을 공유할 context
+    """
+    assert len(args.tickers) >= 2, "상관계수는 2개 이상의 종목이 필요합니다."
+    assert len(args.tickers) == len(set(args.tickers)), "각 종목은 한 번씩만 주어져야 합니다."
+    
+    save_dir = f"{args.save_path}/correlation/"
+    if not os.path.exists(save_dir):
+        os.makedirs(save_dir)
+    
+    returns_panel = context.panel(args.tickers)
+    correlations = context.correlation(args.tickers, args.downward_only)
+    count("pairs", len(args.tickers) * (len(args.tickers) - 1) // 2)
+    
+    # 상관계수가 가장 낮은 (분산 효과가 큰) 쌍의 구간 상관계수만 계산
+    first, second = np.triu_indices(len(args.tickers), k=1)
+    pair_correlations = np.nan_to_num(correlations[first, second], nan=np.inf)
+    lowest = np.argsort(pair_correlations, kind='stable')[:args.top]
+    pairs = list(zip(first[lowest], second[lowest]))
+    pair_names = [f"{args.tickers[i]}-{args.tickers[j]}" for i, j in pairs]
+    
+    with stage("metrics.rolling"):
+        rolling = pd.DataFrame(rolling_correlation(returns_panel.values, pairs, args.window, args.downward_only),
+                               index=returns_panel.index[args.window - 1:], columns=pair_names)
+    
+    file_name = "-".join(args.tickers)
+    if len(file_name) > 200:
+        file_name = f"{args.tickers[0]}-{len(args.tickers)}_tickers" # 파일 이름 길이 제한을 넘지 않도록 줄임
+    
+    file_name += f"-window_{args.window}"
+    if args.downward_only:
+        file_name += "-downward_only"
+    
+    file_path = f"{save_dir}/{file_name}"
+    
+    if args.export is not None:
+        export_points(pd.DataFrame(correlations, index=pd.Index(args.tickers, name="ticker"), columns=args.tickers), file_path, args.export)
+        export_points(rolling, f"{file_path}-rolling", args.export)
+    if args.no_plot:
+        return file_path
+    
+    from plotting import get_figure, save_figure # 그림을 그릴 때만 matplotlib을 불러옴
+    
+    start_date = str(returns_panel.index.min().date())
+    end_date = str(returns_panel.index.max().date())
+    title = "Downside Semi-correlation" if args.downward_only else "Correlation"
+    
+    fig, (ax, rolling_ax) = get_figure("correlation", (12, 16), nrows=2)
+    
+    with stage("render.draw"):
+        image = ax.imshow(correlations, cmap="coolwarm", vmin=-1, vmax=1)
+        fig.colorbar(image, ax=ax, fraction=0.046, pad=0.04)
+    
+        # 종목이 많으면 이름이 겹치므로 표시하지 않음
+        if len(args.tickers) <= 50:
+            ax.set_xticks(range(len(args.tickers)), args.tickers, rotation=90, fontsize=8)
+            ax.set_yticks(range(len(args.tickers)), args.tickers, fontsize=8)
+        if len(args.tickers) <= 15:
+            for i, j in np.ndindex(correlations.shape):
+                ax.text(j, i, f"{correlations[i, j]:.2f}", ha='center', va='center', fontsize=8)
+    
+        color_map = assign_color(pair_names)
+        for (i, j), name in zip(pairs, pair_names):
+            rolling_ax.plot(rolling.index, rolling[name], label=f"{name} ({correlations[i, j]:.2f})", color=color_map[name], linewidth=1)
+    
+    ax.set_title(f"{title} ({start_date} ~ {end_date})")
+    
+    rolling_ax.axhline(y=0, color='black', linestyle='--', linewidth=0.8)
+    rolling_ax.set_title(f"{args.window}-day {title} of {len(pairs)} Least Correlated Pairs")
+    rolling_ax.set_xlabel("Time (Year)")
+    rolling_ax.set_ylabel(title)
+    rolling_ax.set_ylim(-1, 1)
+    rolling_ax.grid(True, linestyle='--', alpha=0.7)
+    rolling_ax.legend(loc='center left', bbox_to_anchor=(1.01, 0.5), fontsize=8, ncol=1 + len(pairs) // 20)
+    
+    fig.tight_layout()
+    save_figure(fig, f"{file_path}.png")
+    
+    return file_path
@@ -0,0 +1,103 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+from utils import parse_portfolios, assign_color, export_points
+from context import AnalysisContext
+from simulation import rebalanced_returns
+from profiling import stage
+from commands.common import investment_suffix
+
+def run(args: argparse.Namespace, context: AnalysisContext) -> str:
+    """
+    종목 혹은 포트폴리오들의 누적 수익률 분석. 포트폴리오가 하나면 구성 종목들의 누적 수익률도 함께 표시
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+        context (AnalysisContext): 가격 데이터 및 수익률을 공유할 context
+    """
+    assert args.max_points == 0 or args.max_points >= 4, "max_points는 0 (줄이지 않음) 혹은 4 이상이어야 합니다."
+    
+    save_dir = f"{args.save_path}/cummulative_return/"
+    if not os.path.exists(save_dir):
+        os.makedirs(save_dir)
+    
+    names, tickers, weights = parse_portfolios(args.tickers)
+    
+    state = context.metrics(tickers)
+    if state is not None:
+        # 지표 상태에 저장된 종목 별 누적 로그 수익률에서 일 별 수익률을 되살려 사용 (새로운 날짜만 반영하고 전체 panel은 만들지 않음)
+        index = pd.DatetimeIndex(state.dates)
+        returns = np.expm1(np.diff(state.cumulative_growth, axis=0, prepend=0.0))
+    else:
+        # 모든 종목을 한 번만 정렬하여 (days x assets) 배열 하나로 사용
+        returns_panel = context.panel(tickers)
+        index, returns = returns_panel.index, returns_panel.values
+    
+    file_name = "_".join(names)
+    if len(file_name) > 200:
+        file_name = f"{names[0]}-{len(names)}_portfolios" # 파일 이름 길이 제한을 넘지 않도록 줄임
+    
+    if args.start_year is not None:
+        # 시작 연도의 첫 거래일 가격을 기준으로 누적 (첫 거래일의 수익률은 제외)
+        start = np.searchsorted(index, pd.Timestamp(f"{args.start_year}-01-01")) + 1
+        index, returns = index[start:], returns[start:]
+        file_name += f"-from_{args.start_year}"
+    
+    assert len(index) > 0, "start_year 이후의 데이터가 없습니다."
+    
+    if args.rebalance == "daily":
+        portfolio_returns = returns @ weights
+    else:
+        # 주기적으로 rebalance하면 rebalance 사이에는 종목 별 비율이 달라지므로 기간 단위로 계산 (모든 포트폴리오를 함께 계산)
+        portfolio_returns = rebalanced_returns(returns, weights, index, args.rebalance, args.drift_band)
+    
+    if ((weights > 0).sum(axis=0) > 1).any():
+        file_name += investment_suffix(args)
+    
+    labels = list(names)
+    series_returns = portfolio_returns
+    
+    if len(names) == 1 and len(tickers) > 1:
+        labels = tickers + labels
+        series_returns = np.column_stack((returns, portfolio_returns))
+    
+    # 모든 누적 수익률을 (days x series) 배열 하나에 대한 한 번의 cumprod로 계산
+    with stage("metrics.cumulative"):
+        cumulative_returns = pd.DataFrame((np.cumprod(1 + series_returns, axis=0) - 1) * 100, index=index, columns=labels)
+    
+    color_map = assign_color(labels)
+    start_date = str(index.min().date())
+    end_date = str(index.max().date())
+    
+    file_path = f"{save_dir}/{file_name}"
+    
+    if args.export is not None:
+        export_points(cumulative_returns, file_path, args.export)
+    if args.no_plot:
+        return file_path
+    
+    from plotting import get_figure, save_figure, minmax_indices # 그림을 그릴 때만 matplotlib을 불러옴
+    
+    fig, ax = get_figure("cummulative_return", (12, 6))
+    
+    # 긴 기간의 많은 series도 빠르게 그리도록 series 별로 최대 --max_points개의 점만 그림
+    with stage("render.downsample"):
+        values = cumulative_returns.to_numpy()
+        indices = minmax_indices(values, args.max_points)
+    
+    with stage("render.draw"):
+        for i, label in enumerate(labels):
+            ax.plot(index[indices[:, i]], values[indices[:, i], i], label=label, color=color_map[label])
+    
+    ax.axhline(y=0, color='black', linestyle='--', linewidth=0.8)
+    ax.set_title(f"Cumulative Return ({start_date} ~ {end_date})")
+    ax.set_xlabel("Time (Year)")
+    ax.set_ylabel("Cumulative Return (%)")
+    ax.legend(loc='upper left', fontsize=8, ncol=1 + len(labels) // 20)
+    ax.grid(True)
+    
+    save_figure(fig, f"{file_path}.png")
+    
+    return file_path
@@ -0,0 +1,117 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+from analysis import long_term_returns, simulated_long_term_returns
+from utils import parse_string_digit_pairs, export_points
+from context import AnalysisContext
+from profiling import stage, count
+from commands.common import investment_suffix, get_invest_years
+
+def run(args: argparse.Namespace, context: AnalysisContext) -> str:
+    """
+    장기 투자 기간에 따른 연평균 수익률 분포 분석
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+        context (AnalysisContext): 가격 데이터 및 수익률을 공유할 context
+    """
+    assert len(args.tickers) == 1, "여러 종목으로 이루어진 포트폴리오에 대한 수익률을 원하는 경우는 README를 참고하여 하나의 string으로 작성 바랍니다."
+    
+    save_dir = f"{args.save_path}/long_term_investment/"
+    if not os.path.exists(save_dir):
+        os.makedirs(save_dir)
+        
+    portfolio = parse_string_digit_pairs(args.tickers[0])
+    
+    if len(portfolio) > 1:
+        tickers, ratios = zip(*portfolio)
+        
+        tickers = list(tickers)
+        ratios = list(ratios)
+        
+        daily_return = context.portfolio_returns(tickers, ratios)
+    else:
+        ticker = portfolio[0][0]
+        df = context.stock_info(ticker)
+        daily_return = df['Adj Close'].pct_change().dropna()
+        
+        tickers, ratios = [ticker], [1.0]
+        
+    start_date = str(daily_return.index.min().date())
+    end_date = str(daily_return.index.max().date())
+        
+    invest_years = get_invest_years(args)
+        
+    if len(portfolio) > 1:
+        rounded_ratios = [round(r * 10) for r in ratios]
+        file_name = "-".join(f"{ticker}{ratio}" for ticker, ratio in zip(tickers, rounded_ratios))
+    else:
+        file_name = ticker
+        
+    title = f"Long-Term Investment of {file_name} ({start_date} ~ {end_date})"
+    if args.simulation != "history":
+        title += f", {args.simulation} bootstrap"
+        file_name += f"-{args.simulation}_bootstrap"
+        
+    # 매일 rebalance하는 거치식 투자가 아니면, 투자 구간마다 rebalance와 적립을 시뮬레이션
+    simulated = investment_suffix(args) != ""
+    if simulated:
+        assert args.simulation == "history", "rebalance/적립 시뮬레이션은 --simulation history에서만 사용할 수 있습니다."
+        
+        title += f", {args.rebalance} rebalance"
+        if args.contribution != "none":
+            title += f", {args.contribution} contribution (IRR)"
+        file_name += investment_suffix(args)
+        
+    file_path = f"{save_dir}/{file_name}"
+    
+    # 투자 기간들은 worker process들에서 병렬로 계산
+    sample_num = None if args.all_windows and args.simulation == "history" else args.num_samples
+    if simulated:
+        all_sampled_returns = simulated_long_term_returns(context.panel(tickers), ratios, invest_years, sample_num, args.workers, args.seed,
+                                                          args.rebalance, args.drift_band, args.contribution)
+    else:
+        all_sampled_returns = long_term_returns(daily_return, invest_years, sample_num, args.workers, args.seed, args.simulation, args.block_size)
+    count("samples", sum(len(sampled_returns) for sampled_returns in all_sampled_returns))
+    
+    if args.export is not None:
+        points = pd.DataFrame({
+            "invest_year": np.repeat(invest_years, [len(sampled_returns) for sampled_returns in all_sampled_returns]),
+            "annual_return": np.concatenate(all_sampled_returns),
+        })
+        export_points(points, file_path, args.export)
+    if args.no_plot:
+        return file_path
+
+    from plotting import get_figure, save_figure # 그림을 그릴 때만 matplotlib을 불러옴
+    import matplotlib.pyplot as plt
+        
+    plt.rc('font', family='Malgun Gothic')
+    plt.rcParams['axes.unicode_minus'] = False
+    
+    fig, axes = get_figure("long_term_investment", (10, len(invest_years) * 5), nrows=len(invest_years))  # 개수만큼 세로 배치
+    axes = np.atleast_1d(axes)
+    
+    fig.suptitle(title, fontsize=16, fontweight='bold')
+    
+    # 모든 투자 기간에 같은 구간(5% 단위)을 사용하므로 한 번만 계산
+    bins = np.arange(min(all_sampled_returns[0]) // 5 * 5, max(all_sampled_returns[0]) // 5 * 5 + 6, 5)
+    
+    with stage("render.draw"):
+        for ax, invest_year, sampled_returns in zip(axes, invest_years, all_sampled_returns):
+            counts, edges = np.histogram(sampled_returns, bins=bins)
+
+            ax.bar(edges[:-1], counts, width=5, edgecolor="black", align="edge")
+            ax.set_xlabel("Average Annual Return (%)")
+            ax.set_ylabel("Num Samples")
+            ax.set_title(f"Distribution of annual return of {invest_year}-year investment")
+            ax.set_xticks(edges)
+            ax.grid(axis="y", linestyle="--", alpha=0.7)
+        
+    fig.tight_layout(rect=[0, 0, 1, 0.96])  # suptitle이 잘리지 않도록 여백 확보
+    
+    save_figure(fig, f"{file_path}.png")
+        
+    return file_path
@@ -0,0 +1,78 @@
+import os
+import argparse
+import pandas as pd
+
+from analysis import rolling_metrics
+from utils import parse_portfolios, assign_color, export_points
+from context import AnalysisContext
+from profiling import stage
+
+def run(args: argparse.Namespace, context: AnalysisContext) -> str:
+    """
+    종목 혹은 포트폴리오들의 구간(rolling) 수익률, 변동성, Sharpe/Sortino 비율과 drawdown 분석
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+        context (AnalysisContext): 가격 데이터 및 수익률을 공유할 context
+    """
+    save_dir = f"{args.save_path}/rolling_metrics/"
+    if not os.path.exists(save_dir):
+        os.makedirs(save_dir)
+        
+    names, tickers, weights = parse_portfolios(args.tickers)
+    
+    # 모든 포트폴리오의 일 별 수익률을 (days x assets) @ (assets x portfolios) 한 번으로 계산
+    returns_panel = context.panel(tickers)
+    daily_returns = pd.DataFrame(returns_panel.weighted_returns(weights), index=returns_panel.index, columns=names)
+    
+    with stage("metrics.rolling"):
+        metrics = rolling_metrics(daily_returns, args.window, args.risk_free)
+    
+    file_name = "-".join(args.tickers) + f"-window_{args.window}"
+    file_path = f"{save_dir}/{file_name}"
+    
+    if args.export is not None:
+        export_points(pd.concat(metrics, axis=1, names=["metric", "portfolio"], sort=True), file_path, args.export)
+    if args.no_plot:
+        return file_path
+
+    from plotting import get_figure, save_figure # 그림을 그릴 때만 matplotlib을 불러옴
+    
+    start_date = str(daily_returns.index.min().date())
+    end_date = str(daily_returns.index.max().date())
+    
+    max_drawdowns = metrics["drawdown"].min()
+    longest_durations = metrics["drawdown_duration"].max()
+    
+    panels = [
+        ("annual_return", 100, f"{args.window}-day Annualized Return (%)"),
+        ("volatility", 100, f"{args.window}-day Volatility (%)"),
+        ("sharpe", 1, f"{args.window}-day Sharpe Ratio"),
+        ("sortino", 1, f"{args.window}-day Sortino Ratio"),
+        ("drawdown", 100, "Drawdown (%)"),
+    ]
+    color_map = assign_color(names)
+    
+    fig, axes = get_figure("rolling_metrics", (12, 4 * len(panels)), nrows=len(panels))
+    fig.suptitle(f"Rolling Metrics ({start_date} ~ {end_date})", fontsize=16, fontweight='bold')
+    
+    with stage("render.draw"):
+        for ax, (metric, scale, y_label) in zip(axes, panels):
+            for name in names:
+                label = name
+                if metric == "drawdown":
+                    label += f" (MDD {max_drawdowns[name] * 100:.1f}%, {longest_durations[name]} days)"
+                    
+                ax.plot(metrics[metric].index, metrics[metric][name] * scale, label=label, color=color_map[name], linewidth=1)
+                
+            ax.axhline(y=0, color='black', linestyle='--', linewidth=0.8)
+            ax.set_ylabel(y_label)
+            ax.grid(True, linestyle='--', alpha=0.7)
+            ax.legend(loc='upper left', fontsize=8)
+            
+    axes[-1].set_xlabel("Time (Year)")
+    fig.tight_layout(rect=[0, 0, 1, 0.97])  # suptitle이 잘리지 않도록 여백 확보
+    
+    save_figure(fig, f"{file_path}.png")
+    
+    return file_path
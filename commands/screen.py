@@ -0,0 +1,83 @@
+import os
+import hashlib
+import argparse
+
+from analysis import screen_universe
+from utils import export_points
+from returns_store import ReturnsStore
+from context import AnalysisContext
+from profiling import stage, count
+from commands.common import get_invest_years
+
+def run(args: argparse.Namespace, context: AnalysisContext) -> str:
+    """
+    많은 종목(전체 시장 등)을 각 종목의 전체 기간에서 연평균 수익률, 연평균 (하락) 변동률, 장기 투자 구간 수익률로 평가.
+    수익률은 디스크의 memory-mapped 배열(ReturnsStore)에 저장한 뒤 --column_block개 종목씩 읽어 계산하므로,
+    종목 수와 관계없이 메모리 사용량이 제한됨
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+        context (AnalysisContext): 가격 데이터 및 수익률을 공유할 context
+    """
+    assert args.column_block > 0, "column_block은 0보다 커야 합니다."
+    
+    save_dir = f"{args.save_path}/screen/"
+    if not os.path.exists(save_dir):
+        os.makedirs(save_dir)
+    
+    tickers = list(dict.fromkeys(args.tickers))
+    
+    # 같은 종목 구성이면 저장된 store를 재사용 (가격 캐시가 갱신되면 다시 생성)
+    store_name = hashlib.sha1(" ".join(tickers).encode("utf-8")).hexdigest()[:16]
+    store_dir = os.path.join(args.cache_dir, "returns_store", store_name)
+    
+    with stage("fetch"):
+        store = ReturnsStore.open_or_build(store_dir, tickers, context.price_cache, args.column_block, args.rebuild_store)
+    count("tickers_screened", len(tickers))
+    
+    invest_years = get_invest_years(args)
+    screened = screen_universe(store, invest_years, args.downward_only)
+    
+    # 다른 분석의 export와 같이 수익률과 변동률은 % 단위로 저장
+    metric_columns = screened.columns[2:]
+    screened[metric_columns] = screened[metric_columns] * 100
+    screened = screened.rename(columns={"annual_return": "return"}).sort_values("return", ascending=False)
+    
+    file_name = "-".join(tickers)
+    if len(file_name) > 200:
+        file_name = f"{tickers[0]}-{len(tickers)}_tickers" # 파일 이름 길이 제한을 넘지 않도록 줄임
+    if args.downward_only:
+        file_name += "-downward_only"
+    
+    file_path = f"{save_dir}/{file_name}"
+    
+    # screening 결과는 표가 주된 결과이므로 --export가 없어도 csv로 저장
+    export_points(screened, file_path, args.export if args.export is not None else "csv")
+    if args.no_plot:
+        return file_path
+    
+    from plotting import get_figure, save_figure, scatter_points # 그림을 그릴 때만 matplotlib을 불러옴
+    
+    points = screened.dropna(subset=["return", "volatility"])
+    top = points.head(args.top)
+    rest = points.iloc[len(top):]
+    
+    x_label = "Downside Volatility" if args.downward_only else "Volatility"
+    
+    fig, ax = get_figure("screen", (10, 6))
+    
+    scatter_points(ax, rest["volatility"], rest["return"], ["gray"] * len(rest), size=15)
+    scatter_points(ax, top["volatility"], top["return"], ["red"] * len(top), size=40)
+    
+    with stage("render.draw"):
+        for ticker, volatility, avg_return in zip(top.index, top["volatility"], top["return"]):
+            ax.annotate(ticker, (volatility, avg_return), textcoords="offset points", xytext=(0, 6), ha='center', fontsize=7)
+    
+    ax.set_xlabel(f"{x_label} (%)")
+    ax.set_ylabel("Average Annual Return (%)")
+    ax.set_title(f"Screening of {len(tickers)} tickers (top {len(top)} by return, each over its own history)")
+    ax.grid(True, linestyle='--', alpha=0.7)
+    
+    save_figure(fig, f"{file_path}.png")
+    
+    return file_path
@@ -0,0 +1,228 @@
+import os
+import itertools
+from typing import Iterable, Iterator
+import numpy as np
+import pandas as pd
+from analysis import align_stock_info, get_mixed_data, evaluate_portfolio_candidates, correlation_matrix
+from data_source import PriceCache
+from returns_panel import ReturnsPanel
+from metrics_state import IncrementalMetrics, update_metrics_state
+from result_cache import ResultCache, result_key, data_digest
+from profiling import stage, count
+
+class AnalysisContext:
+    """
+    한 process 안에서 여러 분석이 가격 데이터, 수익률 panel, 포트폴리오 수익률을 공유하도록 메모리에 보관
+
+    Args:
+        price_cache (PriceCache): 가격 데이터를 불러올 캐시
+        metrics_dir (str): 종목 별 지표 상태(IncrementalMetrics)를 저장할 디렉토리. None이면 사용하지 않음
+        result_cache (ResultCache): 포트폴리오 지표를 보관할 캐시 (default: 메모리에만 보관하는 캐시)
+    """
+    def __init__(self, price_cache: PriceCache = None, metrics_dir: str = None, result_cache: ResultCache = None):
+        self.price_cache = price_cache if price_cache is not None else PriceCache()
+        self.metrics_dir = metrics_dir
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
+        
+        if metrics_dir is not None and not os.path.exists(metrics_dir):
+            os.makedirs(metrics_dir)
+
+        self._prices = {}
+        self._panels = {}
+        self._portfolio_returns = {}
+        self._correlations = {}
+        self._data_versions = {}
+
+    def prefetch(self, tickers: list[str]):
+        """
+        아직 불러오지 않은 종목들의 가격 데이터를 한 번에 (병렬로) 불러옴
+
+        Args:
+            tickers (list[str]): 불러올 종목 번호
+        """
+        missing = [ticker for ticker in dict.fromkeys(tickers) if ticker not in self._prices]
+
+        if missing:
+            with stage("fetch"):
+                self._prices.update(zip(missing, self.price_cache.load_many(missing)))
+            count("tickers_fetched", len(missing))
+
+    def stock_info(self, ticker: str) -> pd.DataFrame:
+        """
+        종목의 가격 데이터 반환
+
+        Args:
+            ticker (str): 종목 번호
+        """
+        self.prefetch([ticker])
+
+        return self._prices[ticker]
+
+    def multiple_stock_info(self, tickers: list[str]) -> list[pd.DataFrame]:
+        """
+        analysis.get_multiple_stock_info()와 같이 가장 최근에 상장된 주식의 시작 날짜 이후의 데이터만 반환
+
+        Args:
+            tickers (list[str]): 종목 번호
+        """
+        self.prefetch(tickers)
+
+        with stage("align"):
+            return align_stock_info([self._prices[ticker] for ticker in tickers])
+
+    def panel(self, tickers: list[str]) -> ReturnsPanel:
+        """
+        종목들의 수익률 panel 반환 (같은 종목 구성이면 순서가 달라도 한 번만 생성하고, 다른 순서는 배열을 공유하는 select()로 반환)
+
+        Args:
+            tickers (list[str]): 종목 번호
+        """
+        key = panel_key(tickers)
+
+        if key not in self._panels:
+            stock_info = self.multiple_stock_info(tickers)
+
+            with stage("align.panel"):
+                self._panels[key] = ReturnsPanel.from_stock_info(stock_info, list(tickers))
+
+        panel = self._panels[key]
+
+        return panel if panel.tickers == list(tickers) else panel.select(tickers)
+
+    def portfolio_returns(self, tickers: list[str], ratios: list[float]) -> pd.DataFrame:
+        """
+        포트폴리오의 일 별 수익률 반환 (같은 종목, 비율이면 한 번만 계산)
+
+        Args:
+            tickers (list[str]): 종목 번호
+            ratios (list[float]): 투자 비율 (소수점)
+        """
+        key = (tuple(tickers), tuple(ratios))
+
+        if key not in self._portfolio_returns:
+            self._portfolio_returns[key], _ = get_mixed_data(self.panel(tickers), list(ratios), None)
+
+        return self._portfolio_returns[key]
+
+    def correlation(self, tickers: list[str], downward_only: bool = False) -> np.ndarray:
+        """
+        종목들의 (하방 반)상관계수 행렬 반환 (같은 종목 구성이면 한 번만 계산)
+
+        Args:
+            tickers (list[str]): 종목 번호
+            downward_only (bool): 하락 구간만 계산할지 여부
+        """
+        key = (tuple(tickers), downward_only)
+
+        if key not in self._correlations:
+            self._correlations[key] = correlation_matrix(self.panel(tickers).values, downward_only)
+
+        return self._correlations[key]
+
+    def metrics(self, tickers: list[str]) -> IncrementalMetrics:
+        """
+        종목들의 지표 상태를 불러와 새로운 날짜만 반영하여 반환. metrics_dir이 없으면 None 반환
+
+        Args:
+            tickers (list[str]): 종목 번호
+        """
+        if self.metrics_dir is None:
+            return None
+
+        path = os.path.join(self.metrics_dir, "-".join(tickers) + ".npz")
+
+        with stage("metrics.incremental"):
+            return update_metrics_state(path, tickers, lambda since: self.returns_since(tickers, since))
+
+    def returns_since(self, tickers: list[str], since: pd.Timestamp = None) -> pd.DataFrame:
+        """
+        종목들의 공통 날짜 중 since 다음 날부터의 일 별 수익률 (days x tickers) 반환.
+        since 이후의 가격만 정렬하므로 비용은 전체 기간이 아닌 since 이후의 날짜 수에 비례함
+
+        Args:
+            tickers (list[str]): 종목 번호
+            since (pd.Timestamp): 기준 날짜 (수익률 계산에 사용할 첫 가격 날짜). None이면 전체 기간의 수익률 반환
+        """
+        if since is None:
+            return self.panel(tickers).to_frame()
+
+        self.prefetch(tickers)
+
+        stock_info = [df.iloc[df.index.searchsorted(since):] for df in (self._prices[ticker] for ticker in tickers)]
+
+        return ReturnsPanel.from_stock_info(stock_info, list(tickers)).to_frame()
+
+    def data_version(self, tickers: list[str]) -> tuple[tuple[str, str], dict[str, str]]:
+        """
+        종목들의 수익률 panel의 (첫 날짜, 마지막 날짜)와 종목 별 수익률 digest 반환 (result_key()에 사용)
+
+        Args:
+            tickers (list[str]): 종목 번호
+        """
+        key = tuple(tickers)
+
+        if key not in self._data_versions:
+            panel = self.panel(tickers)
+            values = panel.values
+
+            date_range = (str(panel.index[0].date()), str(panel.index[-1].date()))
+            digests = {ticker: data_digest(values[:, i]) for i, ticker in enumerate(panel.tickers)}
+            self._data_versions[key] = date_range, digests
+
+        return self._data_versions[key]
+
+    def portfolio_metrics(self, tickers: list[str], candidates: Iterable[tuple[tuple[int, ...], tuple[float, ...]]], downward_only: bool = True,
+                          chunk_size: int = 1024, workers: int = 1) -> Iterator[tuple[tuple, tuple, float, float]]:
+        """
+        analysis.evaluate_portfolio_candidates()와 같지만, 이미 계산한 (종목, 비율, 데이터, 옵션)의 결과는 result_cache에서 가져오고
+        캐시에 없는 후보만 평가하여 저장
+
+        Args:
+            tickers (list[str]): 종목 번호 (후보의 종목 index가 가리키는 순서)
+            candidates (Iterable): utils.portfolio_candidates()와 같은 형태의 후보 생성기
+            downward_only (bool): 하락 구간만 계산할지 여부
+            chunk_size (int): 한 번에 평가할 후보의 개수
+            workers (int): 병렬로 평가할 worker process 개수
+        """
+        panel = self.panel(tickers)
+        date_range, digests = self.data_version(tickers)
+        candidates = iter(candidates)
+
+        # worker들이 모두 일할 수 있을 만큼씩 캐시를 조회하고, 캐시에 없는 후보만 모아 평가
+        for block in iter(lambda: list(itertools.islice(candidates, chunk_size * max(workers, 1))), []):
+            keys = []
+            for index_comb, ratio in block:
+                block_tickers = [tickers[i] for i in index_comb]
+                versions = [digests[ticker] for ticker in block_tickers]
+
+                keys.append((
+                    result_key("annual_return", block_tickers, ratio, versions, date_range),
+                    result_key("annual_volatility", block_tickers, ratio, versions, date_range, downward_only=downward_only),
+                ))
+
+            cached = self.result_cache.get_many([key for pair in keys for key in pair])
+            missing = [i for i, (return_key, volatility_key) in enumerate(keys) if return_key not in cached or volatility_key not in cached]
+            count("portfolios_cached", len(block) - len(missing))
+
+            computed = {}
+            if missing:
+                evaluated = evaluate_portfolio_candidates(panel, [block[i] for i in missing], downward_only, chunk_size, workers)
+
+                for i, (_, _, avg_return, avg_volatility) in zip(missing, evaluated):
+                    computed[keys[i][0]] = np.array([avg_return])
+                    computed[keys[i][1]] = np.array([avg_volatility])
+
+                self.result_cache.put_many(computed)
+                cached.update(computed)
+
+            for (index_comb, ratio), (return_key, volatility_key) in zip(block, keys):
+                yield index_comb, ratio, cached[return_key][0], cached[volatility_key][0]
+
+def panel_key(tickers: list[str]) -> tuple[str, ...]:
+    """
+    수익률 panel의 캐시 key. 같은 종목 구성이면 순서와 관계없이 같은 key
+
+    Args:
+        tickers (list[str]): 종목 번호
+    """
+    return tuple(sorted(tickers))
@@ -0,0 +1,340 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from options import DEFAULT_CACHE_DIR
+
+class PriceDataError(ValueError):
+    """
+    종목의 가격 데이터를 불러오지 못했을 때 (빈 데이터 혹은 모두 NaN) 발생하는 예외
+    """
+
+class DataSource:
+    """
+    일 별 가격 데이터(OHLCV)를 제공하는 데이터 소스의 공통 인터페이스.
+    반환하는 DataFrame은 yf.download(auto_adjust=False)와 같은 형태여야 함 (Price, Ticker MultiIndex 컬럼)
+    """
+    def fetch(self, ticker: str, start: pd.Timestamp = None) -> pd.DataFrame:
+        """
+        종목의 일 별 가격 데이터를 반환
+
+        Args:
+            ticker (str): 불러올 종목 번호
+            start (pd.Timestamp): 시작 날짜. None이면 전체 기간
+        """
+        raise NotImplementedError
+
+class YahooDataSource(DataSource):
+    """
+    Yahoo Finance에서 가격 데이터를 불러오는 데이터 소스
+    """
+    def fetch(self, ticker: str, start: pd.Timestamp = None) -> pd.DataFrame:
+        import yfinance as yf # 네트워크에서 새로 불러올 때만 필요 (import 비용이 크므로 캐시/fixture만 사용할 때는 불러오지 않음)
+
+        if start is None:
+            df = yf.download(ticker, period="max", interval="1d", auto_adjust=False)
+        else:
+            df = yf.download(ticker, start=start.strftime("%Y-%m-%d"), interval="1d", auto_adjust=False)
+
+        # yf.download는 실패해도 예외 대신 빈 DataFrame을 반환하므로, 재시도할 수 있도록 예외로 바꿈
+        if not has_prices(df):
+            raise PriceDataError(f"Yahoo Finance에서 {ticker}의 가격 데이터를 불러오지 못했습니다.")
+
+        return df
+
+class FixtureDataSource(DataSource):
+    """
+    네트워크 없이 로컬 파일 혹은 메모리의 DataFrame에서 가격 데이터를 불러오는 데이터 소스 (오프라인 실행 및 테스트용)
+
+    Args:
+        data_dir (str): {ticker}.parquet 혹은 {ticker}.csv 파일이 저장된 디렉토리
+        frames (dict[str, pd.DataFrame]): 종목 번호별 DataFrame
+    """
+    def __init__(self, data_dir: str = None, frames: dict[str, pd.DataFrame] = None):
+        self.data_dir = data_dir
+        self.frames = dict(frames) if frames is not None else {}
+
+    def _load(self, ticker: str) -> pd.DataFrame:
+        if ticker in self.frames:
+            return self.frames[ticker]
+
+        if self.data_dir is not None:
+            parquet_path = os.path.join(self.data_dir, f"{ticker}.parquet")
+            csv_path = os.path.join(self.data_dir, f"{ticker}.csv")
+
+            if os.path.exists(parquet_path):
+                return pd.read_parquet(parquet_path)
+            if os.path.exists(csv_path):
+                return pd.read_csv(csv_path, header=[0, 1], index_col=0, parse_dates=True)
+
+        return pd.DataFrame()
+
+    def fetch(self, ticker: str, start: pd.Timestamp = None) -> pd.DataFrame:
+        df = self._load(ticker)
+
+        if start is not None and not df.empty:
+            df = df[df.index >= start]
+
+        return df
+
+class SyntheticDataSource(DataSource):
+    """
+    기하 브라운 운동(GBM)으로 가격을 생성하는 데이터 소스 (네트워크 없이 벤치마크/테스트용).
+    같은 seed와 종목 번호면 항상 같은 가격을 생성함
+
+    Args:
+        num_days (int): 생성할 영업일 수
+        end (str): 마지막 날짜
+        mu (float): 연간 기대 수익률 (drift)
+        sigma (float): 연간 변동성
+        seed (int): 난수 seed
+    """
+    def __init__(self, num_days: int = 252 * 20, end: str = "2024-12-31", mu: float = 0.07, sigma: float = 0.2, seed: int = 0):
+        self.num_days = num_days
+        self.end = end
+        self.mu = mu
+        self.sigma = sigma
+        self.seed = seed
+
+    def fetch(self, ticker: str, start: pd.Timestamp = None) -> pd.DataFrame:
+        # 종목 번호마다 독립적이면서도 재현 가능한 난수 생성기 사용
+        rng = np.random.default_rng([self.seed] + [ord(c) for c in ticker])
+        df = synthetic_price_frame(ticker, self.num_days, self.end, self.mu, self.sigma, rng)
+
+        if start is not None:
+            df = df[df.index >= start]
+
+        return df
+
+def synthetic_price_frame(ticker: str, num_days: int, end: str = "2024-12-31", mu: float = 0.07, sigma: float = 0.2,
+                          rng: np.random.Generator = None) -> pd.DataFrame:
+    """
+    기하 브라운 운동(GBM)으로 생성한 일 별 가격을 yf.download(auto_adjust=False)와 같은 형태의 DataFrame으로 반환
+
+    Args:
+        ticker (str): 종목 번호
+        num_days (int): 생성할 영업일 수
+        end (str): 마지막 날짜
+        mu (float): 연간 기대 수익률 (drift)
+        sigma (float): 연간 변동성
+        rng (np.random.Generator): 난수 생성기 (default: np.random.default_rng())
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    index = pd.bdate_range(end=end, periods=num_days, name="Date")
+
+    # log S_t = log S_0 + Σ (μ - σ²/2)Δt + σ√Δt Z => Δt = 1/252
+    dt = 1 / 252
+    log_returns = (mu - sigma ** 2 / 2) * dt + sigma * np.sqrt(dt) * rng.standard_normal(num_days)
+    adj_close = 100 * np.exp(np.cumsum(log_returns))
+
+    # 배당을 단순화하여 종가는 수정 종가보다 일정 비율 높다고 가정
+    close = adj_close * 1.1
+    spread = np.abs(rng.standard_normal(num_days)) * sigma * np.sqrt(dt) * close
+    open_ = close * np.exp(sigma * np.sqrt(dt) * rng.standard_normal(num_days) / 2)
+    volume = rng.integers(10 ** 5, 10 ** 7, num_days)
+
+    columns = pd.MultiIndex.from_product([["Adj Close", "Close", "High", "Low", "Open", "Volume"], [ticker]], names=["Price", "Ticker"])
+    values = np.column_stack([
+        adj_close, close, np.maximum(close, open_) + spread, np.minimum(close, open_) - spread, open_, volume,
+    ])
+
+    return pd.DataFrame(values, index=index, columns=columns)
+
+class TokenBucket:
+    """
+    초당 rate개의 요청만 허용하는 token bucket 방식의 요청 제한기 (여러 thread에서 공유 가능)
+
+    Args:
+        rate (float): 초당 허용할 요청 수
+        capacity (int): 한 번에 몰아서 보낼 수 있는 최대 요청 수 (default: 1)
+    """
+    def __init__(self, rate: float, capacity: int = 1):
+        assert rate > 0, "rate는 0보다 커야 합니다."
+
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        token이 생길 때까지 기다린 뒤 하나 사용
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+class PriceCache:
+    """
+    종목별 가격 데이터를 Parquet 파일로 디스크에 저장해두고, 마지막으로 저장된 날짜 이후의 데이터만 새로 불러오는 캐시
+
+    Args:
+        source (DataSource): 캐시에 없는 데이터를 불러올 데이터 소스
+        cache_dir (str): 캐시 파일을 저장할 디렉토리
+        refresh (bool): 캐시가 최신이 아닐 때 이후 데이터를 새로 불러올지 여부
+        max_workers (int): 여러 종목을 불러올 때 동시에 요청할 최대 개수
+        retries (int): 요청이 실패했을 때 재시도할 횟수
+        backoff (float): 첫 재시도 전 대기 시간(초). 재시도마다 2배씩 증가
+        rate_limit (float): 데이터 소스에 보낼 초당 최대 요청 수 (default: 제한 없음)
+    """
+    def __init__(self, source: DataSource = None, cache_dir: str = DEFAULT_CACHE_DIR, refresh: bool = True,
+                 max_workers: int = 8, retries: int = 3, backoff: float = 1.0, rate_limit: float = None):
+        self.source = source if source is not None else YahooDataSource()
+        self.cache_dir = os.path.join(cache_dir, "prices")
+        self.refresh = refresh
+        
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit is not None else None
+
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def path(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, f"{ticker}.parquet")
+
+    def read(self, ticker: str) -> pd.DataFrame:
+        """
+        디스크에 저장된 가격 데이터를 반환. 캐시가 없으면 None 반환
+
+        Args:
+            ticker (str): 불러올 종목 번호
+        """
+        path = self.path(ticker)
+
+        if not os.path.exists(path):
+            return None
+
+        return pd.read_parquet(path)
+
+    def write(self, ticker: str, df: pd.DataFrame):
+        """
+        가격 데이터를 디스크에 저장 (임시 파일에 쓴 뒤 교체하여 중간에 실패해도 기존 캐시 유지)
+
+        Args:
+            ticker (str): 저장할 종목 번호
+            df (pd.DataFrame): 저장할 가격 데이터
+        """
+        assert has_prices(df), f"{ticker}의 빈 가격 데이터는 캐시에 저장하지 않습니다."
+
+        tmp_path = self.path(ticker) + ".tmp"
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, self.path(ticker))
+
+    def fetch(self, ticker: str, start: pd.Timestamp = None) -> pd.DataFrame:
+        """
+        요청 제한과 exponential backoff 재시도를 적용하여 데이터 소스에서 가격 데이터를 불러옴
+
+        Args:
+            ticker (str): 불러올 종목 번호
+            start (pd.Timestamp): 시작 날짜. None이면 전체 기간
+        """
+        for attempt in range(self.retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                df = self.source.fetch(ticker, start)
+                if not has_prices(df):
+                    raise PriceDataError(f"{ticker}의 가격 데이터가 없습니다.")
+                return df
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def load_many(self, tickers: list[str]) -> list[pd.DataFrame]:
+        """
+        여러 종목의 가격 데이터를 최대 max_workers개씩 동시에 불러와, 주어진 종목 순서대로 반환
+
+        Args:
+            tickers (list[str]): 불러올 종목 번호
+        """
+        unique_tickers = list(dict.fromkeys(tickers))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(unique_tickers)))) as executor:
+            loaded = dict(zip(unique_tickers, executor.map(self.load, unique_tickers)))
+
+        return [loaded[ticker] for ticker in tickers]
+
+    def load(self, ticker: str) -> pd.DataFrame:
+        """
+        캐시된 가격 데이터를 반환. 캐시가 없으면 전체 기간을, 캐시가 오래됐으면 마지막 날짜 이후의 데이터만 불러와 캐시 갱신
+
+        Args:
+            ticker (str): 불러올 종목 번호
+        """
+        cached = self.read(ticker)
+
+        if cached is None or not has_prices(cached):
+            df = self.fetch(ticker)
+            self.write(ticker, df)
+            return df
+
+        if not self.refresh or not is_stale(cached.index.max()):
+            return cached
+
+        last_date = cached.index.max()
+        try:
+            tail = self.fetch(ticker, start=last_date)
+        except Exception as e:
+            # 재시도 후에도 새로운 데이터를 불러오지 못하면 저장된 데이터로 분석을 계속함
+            print(f"{ticker}의 새로운 가격 데이터를 불러오지 못해 저장된 데이터를 사용합니다: {e}")
+            return cached
+
+        # 배당/분할로 과거 수정주가(Adj Close)가 바뀌었으면 이어붙일 수 없으므로 전체 기간을 다시 불러옴
+        if last_date not in tail.index or not np.allclose(
+            np.asarray(cached.loc[last_date, 'Adj Close'], dtype=float),
+            np.asarray(tail.loc[last_date, 'Adj Close'], dtype=float),
+            rtol=1e-6
+        ):
+            df = self.fetch(ticker)
+        elif (tail.index <= last_date).all():
+            return cached # 새로운 거래일이 없으면 (휴일 등) 캐시를 다시 쓰지 않음
+        else:
+            df = pd.concat([cached[cached.index < last_date], tail])
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+
+        self.write(ticker, df)
+
+        return df
+
+def has_prices(df: pd.DataFrame) -> bool:
+    """
+    가격 데이터에 값이 있는 수정 종가(Adj Close)가 하나라도 있는지 여부 (빈 DataFrame이나 모두 NaN이면 False)
+
+    Args:
+        df (pd.DataFrame): 가격 데이터 (yf.download 형태)
+    """
+    if df is None or df.empty or 'Adj Close' not in df.columns.get_level_values(0):
+        return False
+
+    return not np.isnan(np.asarray(df['Adj Close'], dtype=float)).all()
+
+def is_stale(last_date: pd.Timestamp, today: pd.Timestamp = None) -> bool:
+    """
+    마지막으로 저장된 날짜 이후에 새로운 거래일 데이터가 있을 수 있는지 확인 (직전 영업일까지 저장돼 있으면 최신으로 간주)
+
+    Args:
+        last_date (pd.Timestamp): 캐시에 저장된 마지막 날짜
+        today (pd.Timestamp): 기준 날짜 (default: 오늘)
+    """
+    today = pd.Timestamp.today().normalize() if today is None else today.normalize()
+    previous_business_day = today - pd.offsets.BDay(1)
+
+    return last_date.normalize() < previous_business_day
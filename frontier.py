@@ -0,0 +1,103 @@
+import numpy as np
+
+def risk_matrix(returns: np.ndarray, downward_only: bool = False) -> np.ndarray:
+    """
+    일 별 수익률 (days x assets)에서 연 환산 공분산 행렬 (assets x assets) 반환.
+    downward_only면 음수 수익률만 반영한 하방 반공분산(semi-covariance) 행렬 반환
+
+    Args:
+        returns (np.ndarray): 일 별 수익률 (days x assets)
+        downward_only (bool): 하락 구간만 계산할지 여부
+    """
+    if downward_only:
+        downside = np.minimum(returns, 0.0)
+        return downside.T @ downside / len(returns) * 252
+
+    centered = returns - returns.mean(axis=0)
+
+    return centered.T @ centered / (len(returns) - 1) * 252
+
+def project_simplex(values: np.ndarray) -> np.ndarray:
+    """
+    각 열 (assets x portfolios)을 {w >= 0, Σw = 1}에 가장 가까운 점으로 사영 (정렬 기반, O(N log N))
+
+    Args:
+        values (np.ndarray): 사영할 값 (assets x portfolios)
+    """
+    num_assets = values.shape[0]
+
+    sorted_values = -np.sort(-values, axis=0)
+    cumulative = np.cumsum(sorted_values, axis=0) - 1
+    ranks = np.arange(1, num_assets + 1)[:, None]
+
+    # Σ(sorted_values[:rho] - theta) = 1을 만족하는 가장 큰 rho 선택
+    rho = (sorted_values - cumulative / ranks > 0).sum(axis=0)
+    theta = cumulative[rho - 1, np.arange(values.shape[1])] / rho
+
+    return np.maximum(values - theta, 0.0)
+
+def efficient_frontier(returns: np.ndarray, downward_only: bool = False, num_points: int = 50, iterations: int = 5000,
+                       tolerance: float = 1e-10) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    공분산 (혹은 하방 반공분산) 행렬을 한 번만 계산한 뒤, 여러 위험 회피 계수 γ에 대해
+    min w'Σw - γ μ'w (w >= 0, Σw = 1)를 가속 사영 경사 하강법(FISTA)으로 한 번에 풀어 효율적 투자선 반환.
+    각 해는 자신의 기대 수익률에서 위험이 가장 작은 포트폴리오이며 (γ = 0이면 최소 위험 포트폴리오),
+    촘촘한 γ들의 해 중에서 최소 위험 ~ 최대 수익률 사이의 목표 수익률에 가장 가까운 포트폴리오들을 선택
+
+    Args:
+        returns (np.ndarray): 일 별 수익률 (days x assets)
+        downward_only (bool): 하방 반공분산을 위험으로 사용할지 여부
+        num_points (int): 효율적 투자선 위의 포트폴리오 개수
+        iterations (int): 최대 반복 횟수
+        tolerance (float): 투자 비율 변화가 이 값보다 작아지면 종료
+
+    Returns:
+        weights (np.ndarray): 투자 비율 (assets x points), 기대 수익률 오름차순
+        expected_returns (np.ndarray): 연 환산 기대 수익률 (points,)
+        risks (np.ndarray): 연 환산 (하방) 표준편차 (points,)
+    """
+    num_assets = returns.shape[1]
+
+    mean_returns = returns.mean(axis=0) * 252
+    covariance = risk_matrix(returns, downward_only)
+
+    # 목적 함수의 gradient 2Σw - γμ는 2λ_max(Σ)-Lipschitz
+    lipschitz = 2 * max(np.linalg.eigvalsh(covariance)[-1], 1e-12)
+
+    # γ가 충분히 크면 기대 수익률이 가장 높은 종목 하나에 수렴하므로, 수익률 차이 대비 위험의 크기로 γ 범위 설정
+    scale = lipschitz / max(np.ptp(mean_returns), 1e-12)
+    gammas = np.concatenate(([0.0], np.geomspace(scale * 1e-4, scale * 1e2, 4 * num_points)))
+
+    weights = np.full((num_assets, len(gammas)), 1 / num_assets)
+    momentum = weights.copy()
+    t = 1.0
+
+    for _ in range(iterations):
+        gradient = 2 * covariance @ momentum - mean_returns[:, None] * gammas
+        next_weights = project_simplex(momentum - gradient / lipschitz)
+
+        # 목적 함수가 증가하는 방향으로 움직였으면 가속을 초기화 (adaptive restart)
+        if np.sum((momentum - next_weights) * (next_weights - weights)) > 0:
+            t = 1.0
+
+        next_t = (1 + np.sqrt(1 + 4 * t ** 2)) / 2
+        momentum = next_weights + (t - 1) / next_t * (next_weights - weights)
+
+        converged = np.abs(next_weights - weights).max() < tolerance
+        weights, t = next_weights, next_t
+
+        if converged:
+            break
+
+    expected_returns = mean_returns @ weights
+
+    # γ가 커질수록 기대 수익률이 증가하므로, 목표 수익률을 일정 간격으로 나눠 가장 가까운 해 선택
+    order = np.argsort(expected_returns, kind='stable')
+    targets = np.linspace(expected_returns[order[0]], expected_returns[order[-1]], num_points)
+    nearest = np.searchsorted(expected_returns[order], targets).clip(0, len(order) - 1)
+    selected = order[np.unique(nearest)]
+
+    weights, expected_returns = weights[:, selected], expected_returns[selected]
+    risks = np.sqrt(np.maximum(np.einsum('ip,ij,jp->p', weights, covariance, weights), 0.0))
+
+    return weights, expected_returns, risks
@@ -1,24 +1,68 @@
 import os
-import numpy as np
 import argparse
-import yfinance as yf
-from matplotlib.patches import Patch
-import matplotlib.ticker as mticker
-from matplotlib.ticker import MultipleLocator
 
-from analysis import *
-from utils import *
+from options import DEFAULT_CACHE_DIR, EXPORT_FORMATS, REBALANCE_FREQUENCIES, CONTRIBUTION_FREQUENCIES
+from commands import AVAIL_ANALYSIS, get_runner
 
-AVAIL_ANALYSIS = ["avg_return_volatility", "compare_avg_return_volatility", "long_term_investment", "cummulative_return"]
+# numpy/pandas/matplotlib/yfinance는 분석을 실제로 수행할 때 각 분석 module(commands/)에서 불러오므로,
+# --help나 잘못된 argument로 실행할 때는 불러오지 않음
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="ETF Analysis Script")
+def parse_tickers(s: str) -> list[str]:
+    """
+    띄어쓰기로 구분된 종목 번호들을 list로 변환. "@경로"로 주어지면 파일에서 띄어쓰기/줄바꿈으로 구분된 종목 번호를 읽음
+    
+    Args:
+        s (str): --tickers에 주어진 문자열 (e.g. "SCHD QQQ TLT", "@universe.txt")
+    """
+    if s.startswith("@"):
+        with open(s[1:], encoding="utf-8") as f:
+            return f.read().split()
+        
+    return s.split(' ')
+
+class AnalysisArgumentParser(argparse.ArgumentParser):
+    """
+    각 argument뿐 아니라 argument 간의 조합도 확인하는 parser. 잘못된 조합이면 다른 argument 오류와 같이 종료 코드 2로 종료
+    (main.py, batch.py, server.py 모두 같은 parser를 사용하므로 한 곳에서 확인)
+    """
+    def parse_known_args(self, args: list[str] = None, namespace: argparse.Namespace = None) -> tuple[argparse.Namespace, list[str]]:
+        namespace, extras = super().parse_known_args(args, namespace)
+        
+        if namespace.drift_band is not None:
+            if namespace.rebalance == "daily":
+                self.error("--drift_band는 --rebalance daily와 함께 사용할 수 없습니다 (monthly, quarterly, yearly, none 중 하나를 지정하세요).")
+            if namespace.drift_band < 0:
+                self.error("--drift_band는 0 이상이어야 합니다.")
+                
+        return namespace, extras
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = AnalysisArgumentParser(description="ETF Analysis Script")
     
     available_methods = ", ".join(method for method in AVAIL_ANALYSIS)
-    parser.add_argument("--analysis", type=str, required=True, help=f"Type of analysis to perform: {available_methods}")
-    parser.add_argument("--tickers", type=lambda s: s.split(' '), required=True,
-                        help="Whitespace-separated list of ETF tickers (default: SCHD SPY QQQ)")
+    parser.add_argument("--analysis", type=str, required=True, choices=AVAIL_ANALYSIS, metavar="ANALYSIS",
+                        help=f"Type of analysis to perform: {available_methods}")
+    parser.add_argument("--tickers", type=parse_tickers, required=True,
+                        help="Whitespace-separated list of ETF tickers, or @file to read them from a file (default: SCHD SPY QQQ)")
     parser.add_argument("--save_path", type=str, default="./output", help="Directory to save results")
+    parser.add_argument("--cache_dir", type=str, default=DEFAULT_CACHE_DIR, help="Directory to cache downloaded price data")
+    parser.add_argument("--offline_dir", type=str, default=None,
+                        help="Directory of {ticker}.parquet/.csv files to use instead of Yahoo Finance (default: None)")
+    parser.add_argument("--no_refresh", action="store_true", help="Use cached price data without fetching new dates (default: False)")
+    parser.add_argument("--fetch_workers", type=int, default=8, help="Maximum number of concurrent price downloads (default: 8)")
+    parser.add_argument("--retries", type=int, default=3, help="Number of retries for a failed download (default: 3)")
+    parser.add_argument("--rate_limit", type=float, default=None, help="Maximum downloads per second (default: None)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of parallel worker processes (default: 1)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible sampling (default: None)")
+    parser.add_argument("--metrics_dir", type=str, default=None,
+                        help="Directory to persist per-ticker metric states updated only with new dates (default: None)")
+    parser.add_argument("--result_cache_dir", type=str, default=None,
+                        help="Directory to persist portfolio metrics across runs, on top of the in-memory cache (default: None)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Save per-stage timing/memory and cProfile results next to the output image (default: False)")
+    parser.add_argument("--export", type=str, default=None, choices=EXPORT_FORMATS,
+                        help="Also save the plotted values as csv or parquet next to the output image (default: None)")
+    parser.add_argument("--no_plot", action="store_true", help="Skip drawing the image (use with --export) (default: False)")
     
     # avg_return_volatility & single_avg_return_volatility 전용
     parser.add_argument("--downward_only", action="store_true", help="Get downward value only (default: False)")
@@ -26,320 +70,108 @@ if __name__ == "__main__":
                         help="Whitespace-separated list of abbreviation of ETF tickers (default: S P Q)")
     parser.add_argument("--must_include", type=lambda s: s.split(' '), default=None,
                         help="Whitespace-separated list of abbreviation of ETF that must be included in combination (default: None)")
+    parser.add_argument("--num_assets", type=int, default=2, help="Number of ETFs in each combination (default: 2)")
+    parser.add_argument("--ratio_step", type=float, default=0.1, help="Step of investment ratio in each combination (default: 0.1)")
+    parser.add_argument("--chunk_size", type=int, default=1024, help="Number of portfolios evaluated at once (default: 1024)")
+    parser.add_argument("--frontier", action="store_true",
+                        help="Optimize the efficient frontier over all tickers instead of the ratio grid (default: False)")
+    parser.add_argument("--frontier_points", type=int, default=50, help="Number of portfolios on the efficient frontier (default: 50)")
+    parser.add_argument("--max_corr", type=float, default=None,
+                        help="Skip combinations containing a pair whose (downside semi-)correlation is above this value (default: None)")
+    
+    # long_term_investment & cummulative_return 전용
+    parser.add_argument("--rebalance", type=str, default="daily", choices=REBALANCE_FREQUENCIES,
+                        help="How often portfolios are rebalanced back to their target ratios (default: daily)")
+    parser.add_argument("--drift_band", type=float, default=None,
+                        help="Rebalance only when a ratio drifts at least this far from its target, e.g. 0.05 (default: None)")
     
     # long_term_investment 전용
+    parser.add_argument("--contribution", type=str, default="none", choices=CONTRIBUTION_FREQUENCIES,
+                        help="Invest the same amount again every period; returns become money-weighted (IRR) (default: none)")
     parser.add_argument("--min_year", type=int, default=2, help="Minimum years of investment")
     parser.add_argument("--max_year", type=int, default=10, help="Maximum years of investment")
     parser.add_argument("--interval", type=int, default=2, help="Interval of years to investigate effect of long-term investment")
     parser.add_argument("--num_samples", type=int, default=500, help="Number of samples")
+    parser.add_argument("--all_windows", action="store_true", help="Use every valid start date instead of random samples (default: False)")
+    parser.add_argument("--simulation", type=str, default="history", choices=["history", "stationary", "block"],
+                        help="Use historical windows or bootstrapped synthetic paths (default: history)")
+    parser.add_argument("--block_size", type=int, default=20, help="(Mean) block length in days for bootstrap simulation (default: 20)")
     
     # cummulative_return 전용
     parser.add_argument("--start_year", type=int, default=None, help="Starting year to measure cummulative return")
+    parser.add_argument("--max_points", type=int, default=2000,
+                        help="Maximum points drawn per line, keeping the min/max of each segment; 0 draws every point (default: 2000)")
     
-    args = parser.parse_args()
+    # screen & correlation 전용
+    parser.add_argument("--column_block", type=int, default=256, help="Number of tickers read and scored at once (default: 256)")
+    parser.add_argument("--top", type=int, default=30,
+                        help="Number of top tickers by return (screen) or least correlated pairs (correlation) to show (default: 30)")
+    parser.add_argument("--rebuild_store", action="store_true", help="Rebuild the on-disk returns store even if it is up to date (default: False)")
     
-    error_msg = f"{args.analysis}은 가능한 분석 목록에 없습니다."
-    assert args.analysis in AVAIL_ANALYSIS, error_msg
+    # rolling_metrics & correlation 전용
+    parser.add_argument("--window", type=int, default=252, help="Rolling window length in trading days (default: 252)")
+    parser.add_argument("--risk_free", type=float, default=0.0, help="Annual risk-free rate for Sharpe/Sortino ratios (default: 0.0)")
     
-    if not os.path.exists(args.save_path):
-        os.makedirs(args.save_path)
-        
-    if args.analysis == "avg_return_volatility":
-        assert len(args.tickers) == len(args.abbrs), "Tickers와 abbrs의 개수가 같아야 합니다."
-        assert all(len(abbr) == 1 for abbr in args.abbrs), "각 종목은 1개의 알파벳으로 표현해야 합니다."
-        assert len(args.abbrs) == len(set(args.abbrs)), "각 종목은 각각 다른 알파벳으로 표현해야 합니다."
-        assert args.must_include is None or all(len(abbr) == 1 for abbr in args.must_include), "must_include는 abbreviation으로 주어져야 합니다."
-        assert args.must_include is None or all(abbr in args.abbrs for abbr in args.must_include), "must_include에 포함된 종목들은 abbrs 안에 정의돼있어야 합니다."
-        
-        save_dir = f"{args.save_path}/avg_return_volatility/"
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
-            
-        analysed_info = {}
-        
-        if len(args.tickers) > 1:
-            stock_info = get_multiple_stock_info(args.tickers)
-            paired_stock_info, paired_abbrs = stock_combination(stock_info, args.abbrs, 2, args.must_include)
-            
-            for stock_comb, abbr_comb in zip(paired_stock_info, paired_abbrs):
-                stock_comb = list(stock_comb)
-                abbr_comb = list(abbr_comb)
-                
-                ratio_interval = np.arange(0.1, 1.0, 0.1)
-                ratios = [[r, 1 - r] for r in ratio_interval]
-                
-                for ratio in ratios:
-                    weighted_return, combined_ticker = get_mixed_data(stock_comb, ratio, abbr_comb)
-                    avg_return = get_annual_return(weighted_return)
-                    avg_volatility = get_annual_volatility(weighted_return, args.downward_only)
-                    
-                    analysed_info[combined_ticker] = (avg_return, avg_volatility)
-        else:
-            stock_info = [yf.download(args.tickers[0], period="max", interval="1d", auto_adjust=False)]
-            
-        # get_annual_return()와 get_annual_volatility()에서 첫 & 마지막 연도 제거할 것을 고려하여 설정
-        start_year = stock_info[0].index.min().year + 1
-        end_year = stock_info[0].index.max().year - 1
-                    
-        for i in range(len(args.tickers)):
-            daily_return = stock_info[i]['Adj Close'].pct_change().dropna()
-            avg_return = get_annual_return(daily_return)
-            avg_volatility = get_annual_volatility(daily_return, args.downward_only)
-            analysed_info[args.tickers[i]] = (avg_return, avg_volatility)
-                
-        color_map = assign_color(list(set([simplify_ticker(ticker) for ticker in analysed_info.keys()])))
+    return parser
 
-        plt.figure(figsize=(10, 6))
-        for ticker, (avg_return, avg_volatility) in analysed_info.items():
-            base = simplify_ticker(ticker)
-            color = color_map[base] if base in color_map else "gray"
-            
-            plt.scatter(avg_volatility * 100, avg_return * 100, s=500, color=color, alpha=0.6, edgecolors='black')
-            plt.text(avg_volatility * 100, avg_return * 100, ticker, fontsize=8, ha='center', va='center', fontweight='bold')
-
-        abbr_text = "\n".join([f"{abbr}: {ticker}" for abbr, ticker in zip(args.abbrs, args.tickers)])
-        plt.text(1.02, 0.5, abbr_text, transform=plt.gca().transAxes, fontsize=10, verticalalignment='center', bbox=dict(facecolor='white', alpha=0.5))
-
-        x_label = "Downside Volatility" if args.downward_only else "Volatility"
-        file_name = "-".join([ticker for ticker in args.tickers])
-        
-        if args.downward_only:
-            file_name += "-downward_only"
-        if args.must_include is not None:
-            file_name += "-must_include-"
-            file_name += "-".join([ticker for ticker in args.must_include])
-        
-        plt.xlabel(f"{x_label} (%)")
-        plt.ylabel("Average Annual Return (%)")
-        plt.title(f"Average Return & {x_label} ({start_year} ~ {end_year})")
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.savefig(f"{save_dir}/{file_name}.png")
+def build_result_cache(args: argparse.Namespace) -> "ResultCache":
+    """
+    arguments에 맞는 포트폴리오 결과 캐시 생성 (--result_cache_dir이 없으면 메모리에만 보관)
     
-    if args.analysis == "compare_avg_return_volatility":
-        save_dir = f"{args.save_path}/compare_avg_return_volatility/"
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
-            
-        analysed_info = {}
-        valid_years = {}
-        
-        single_ticker_info = {}
-        
-        stock_info_dict = {}
-        
-        portfolio_list = []
-        ticker_list = []
-        
-        for portfolio_str in args.tickers:
-            portfolio = parse_string_digit_pairs(portfolio_str)
-            portfolio_list.append(portfolio)
-            
-            if len(portfolio) > 1:
-                ticker, _ = zip(*portfolio)
-            else:
-                ticker = portfolio[0][0]
-                
-            if type(ticker) == str:
-                ticker_list.append(ticker)
-            else:
-                ticker_list.extend(ticker)
-            
-        ticker_list = list(set(ticker_list))
-        stock_info = get_multiple_stock_info(ticker_list)
-        
-        start_year = stock_info[0].index.min().year + 1
-        end_year = stock_info[0].index.max().year - 1
+    Args:
+        args (argparse.Namespace): 분석 arguments
+    """
+    from result_cache import ResultCache
     
-        for ticker, stock_info in zip(ticker_list, stock_info):
-            stock_info_dict[ticker] = stock_info
-            
-            # 개별 종목에 대한 수익률 및 변동성 먼저 계산
-            daily_return = stock_info['Adj Close'].pct_change().dropna()
-                
-            avg_return = get_annual_return(daily_return)
-            avg_volatility = get_annual_volatility(daily_return, args.downward_only)
-            
-            single_ticker_info[ticker] = (avg_return, avg_volatility)
-            
-        for portfolio in portfolio_list:
-            if len(portfolio) > 1: # 개별 종목에 대한 수익률 및 변동성은 위에서 계산 됐기에 생략 가능
-                tickers, ratios = zip(*portfolio)
-                
-                tickers = list(tickers)
-                ratios = list(ratios)
-                
-                stock_info = [stock_info_dict[ticker] for ticker in tickers]
-                daily_return, _ = get_mixed_data(stock_info, ratios, None)
-                
-                avg_return = get_annual_return(daily_return)
-                avg_volatility = get_annual_volatility(daily_return, args.downward_only)
-                
-                rounded_ratios = [round(r * 10) for r in ratios]
-                portfolio_name = "-".join(f"{ticker}{ratio}" for ticker, ratio in zip(tickers, rounded_ratios))
-                analysed_info[portfolio_name] = (avg_return, avg_volatility)
-            
-        color_map = assign_color(list(analysed_info.keys()) + list(single_ticker_info.keys()))
-        
-        plt.figure(figsize=(10, 6))
-        
-        legend_handles = []
-        
-        for portfolio_name, (avg_return, avg_volatility) in analysed_info.items():
-            color = color_map[portfolio_name]
-            plt.scatter(avg_volatility * 100, avg_return * 100, s=500, color=color, alpha=0.6, edgecolors='black')
-            
-            legend_label = f"{portfolio_name}"
-            legend_handles.append(Patch(facecolor=color, edgecolor='black', label=legend_label))
-            
-        for ticker_name, (avg_return, avg_volatility) in single_ticker_info.items():
-            color = color_map[ticker_name]
-            
-            plt.scatter(avg_volatility * 100, avg_return * 100, s=500, color=color, alpha=0.6, edgecolors='black')
-            plt.text(avg_volatility * 100, avg_return * 100, ticker_name, fontsize=8, ha='center', va='center', fontweight='bold')
-
-        file_name = "-".join([ticker for ticker in args.tickers])
-        if args.downward_only:
-            file_name += "-downward_only"
-            
-        x_label = "Downside Volatility" if args.downward_only else "Volatility"
-        
-        plt.xlabel(f"{x_label} (%)")
-        plt.ylabel("Average Annual Return (%)")
-        plt.title(f"Average Return & {x_label} ({start_year} ~ {end_year})")
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.legend(handles=legend_handles, title="Portfolios",loc='lower right', bbox_to_anchor=(0.98, 0.02), fontsize=10)
-        plt.savefig(f"{save_dir}/{file_name}.png")
-
-    if args.analysis == "long_term_investment":
-        assert len(args.tickers) == 1, "여러 종목으로 이루어진 포트폴리오에 대한 수익률을 원하는 경우는 README를 참고하여 하나의 string으로 작성 바랍니다."
-        
-        save_dir = f"{args.save_path}/long_term_investment/"
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
-            
-        portfolio = parse_string_digit_pairs(args.tickers[0])
-        
-        if len(portfolio) > 1:
-            tickers, ratios = zip(*portfolio)
-            
-            tickers = list(tickers)
-            ratios = list(ratios)
-            
-            stock_info = get_multiple_stock_info(tickers)
-            daily_return, _ = get_mixed_data(stock_info, ratios, None)
-        else:
-            ticker = portfolio[0][0]
-            df = yf.download(ticker, period="max", interval="1d", auto_adjust=False)
-            daily_return = df['Adj Close'].pct_change().dropna()
-            
-        start_date = str(daily_return.index.min().date())
-        end_date = str(daily_return.index.max().date())
-            
-        invest_years = list(range(args.min_year, args.max_year+1, args.interval))
-        if invest_years[-1] != args.max_year:
-            invest_years.append(args.max_year)
-            
-        if len(portfolio) > 1:
-            rounded_ratios = [round(r * 10) for r in ratios]
-            file_name = "-".join(f"{ticker}{ratio}" for ticker, ratio in zip(tickers, rounded_ratios))
-        else:
-            file_name = ticker
-            
-        bin = None
-            
-        fig, axes = plt.subplots(nrows=len(invest_years), figsize=(10, len(invest_years) * 5))  # 개수만큼 세로 배치
+    return ResultCache(cache_dir=args.result_cache_dir)
 
-        plt.rc('font', family='Malgun Gothic')
-        plt.rcParams['axes.unicode_minus'] = False
-        
-        fig.suptitle(f"Long-Term Investment of {file_name} ({start_date} ~ {end_date})", fontsize=16, fontweight='bold')
-        
-        for i, (ax, invest_year) in enumerate(zip(axes, invest_years)):
-            sampled_returns = sample_random_returns(daily_return, invest_year, args.num_samples)
-            
-            if i == 0:
-                bins = np.arange(min(sampled_returns) // 5 * 5, max(sampled_returns) // 5 * 5 + 6, 5) # 5% 단위로 수익률 계산
-
-            counts, edges = np.histogram(sampled_returns, bins=bins)
+def build_price_cache(args: argparse.Namespace) -> "PriceCache":
+    """
+    arguments에 맞는 가격 캐시 생성
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+    """
+    from data_source import PriceCache, FixtureDataSource
+    
+    source = FixtureDataSource(args.offline_dir) if args.offline_dir is not None else None
+    
+    return PriceCache(source, args.cache_dir, refresh=not args.no_refresh,
+                      max_workers=args.fetch_workers, retries=args.retries, rate_limit=args.rate_limit)
 
-            ax.bar(edges[:-1], counts, width=5, edgecolor="black", align="edge")
-            ax.set_xlabel("Average Annual Return (%)")
-            ax.set_ylabel("Num Samples")
-            ax.set_title(f"Distribution of annual return of {invest_year}-year investment")
-            ax.set_xticks(edges)
-            ax.grid(axis="y", linestyle="--", alpha=0.7)
-            
-        plt.tight_layout(rect=[0, 0, 1, 0.96])  # suptitle이 잘리지 않도록 여백 확보
-        plt.savefig(f"{save_dir}/{file_name}.png")
+def run_analysis(args: argparse.Namespace, context: "AnalysisContext" = None) -> str:
+    """
+    args.analysis에 해당하는 분석 수행 후 결과 경로 (확장자 제외) 반환.
+    --profile이면 단계 별 실행 시간/메모리를 결과와 같은 이름의 .profile.json으로 저장
+    
+    Args:
+        args (argparse.Namespace): 분석 arguments
+        context (AnalysisContext): 가격 데이터 및 수익률을 공유할 context (default: args로 새로 생성)
+    """
+    run = get_runner(args.analysis)
+    
+    from context import AnalysisContext
+    from profiling import stage, start_profiling, stop_profiling
+    
+    if not os.path.exists(args.save_path):
+        os.makedirs(args.save_path)
         
-    if args.analysis == "cummulative_return":
-        assert len(args.tickers) == 1, "여러 종목으로 이루어진 포트폴리오에 대한 수익률을 원하는 경우는 README를 참고하여 하나의 string으로 작성 바랍니다."
+    profiler = start_profiling() if args.profile else None
+    
+    try:
+        context = context if context is not None else AnalysisContext(build_price_cache(args), args.metrics_dir, build_result_cache(args))
         
-        save_dir = f"{args.save_path}/cummulative_return/"
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
+        with stage("total"):
+            result_path = run(args, context)
+    finally:
+        if profiler is not None:
+            stop_profiling()
             
-        portfolio = parse_string_digit_pairs(args.tickers[0])
-        cumulative_returns = []
-        labels = []
+    if profiler is not None:
+        profiler.save(os.path.normpath(result_path) + ".profile.json")
         
-        if len(portfolio) > 1:
-            tickers, ratios = zip(*portfolio)
-            
-            tickers = list(tickers)
-            ratios = list(ratios)
-            
-            rounded_ratios = [round(r * 10) for r in ratios]
-            file_name = "-".join(f"{ticker}{ratio}" for ticker, ratio in zip(tickers, rounded_ratios))
-            
-            stock_info = get_multiple_stock_info(tickers)
-            
-            if args.start_year is not None:
-                start_datetime = pd.to_datetime(f"{args.start_year}-01-01")
-                for i in range(len(stock_info)):
-                    stock_info[i] = stock_info[i][stock_info[i].index >= start_datetime]
-                file_name += f"-from_{args.start_year}"
-            
-            for i, info in enumerate(stock_info):
-                daily_return = info['Adj Close'].pct_change().dropna()
-                cumulative_return = (1 + daily_return).cumprod() - 1
-                cumulative_returns.append(cumulative_return * 100)
-                labels.append(tickers[i])
-            
-            daily_return, _ = get_mixed_data(stock_info, ratios, None)
-            cumulative_return = (1 + daily_return).cumprod() - 1
-            cumulative_returns.append(cumulative_return * 100)
-            labels.append(file_name)
-        else:
-            ticker = portfolio[0][0]
-            df = yf.download(ticker, period="max", interval="1d", auto_adjust=False)
-            
-            file_name = ticker
-            
-            if args.start_year is not None:
-                start_datetime = pd.to_datetime(f"{args.start_year}-01-01")
-                df = df[df.index >= start_datetime]
-                file_name += f"-from_{args.start_year}"
-            
-            daily_return = df['Adj Close'].pct_change().dropna()
-            cumulative_return = (1 + daily_return).cumprod() - 1
-            cumulative_returns.append(cumulative_return * 100)
-            labels.append(ticker)
-            
-        color_map = assign_color(labels)
-        start_date = str(cumulative_returns[0].index.min().date())
-        end_date = str(cumulative_returns[0].index.max().date())
-            
-        plt.figure(figsize=(12, 6))
-
-        for i, cumulative_return in enumerate(cumulative_returns):
-            plt.plot(cumulative_return.index, cumulative_return, label=labels[i], color=color_map[labels[i]])
+    return result_path
 
-        plt.axhline(y=0, color='black', linestyle='--', linewidth=0.8)
-        plt.title(f"Cumulative Return ({start_date} ~ {end_date})")
-        plt.xlabel("Time (Year)")
-        plt.ylabel("Cumulative Return (%)")
-        plt.legend()
-        plt.grid(True)
-
-        plt.savefig(f"{save_dir}/{file_name}.png")
\ No newline at end of file
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    run_analysis(args)
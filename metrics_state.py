@@ -0,0 +1,321 @@
+import os
+from typing import Callable
+import numpy as np
+import pandas as pd
+
+class IncrementalMetrics:
+    """
+    일 별 수익률이 추가될 때마다 새로 추가된 날짜만 반영하여 누적 수익률, 연 평균 수익률, 연간 (하락) 변동성을 갱신하는 상태.
+    연도 별 로그 수익률 합과 Welford 분산 (전체/하락 구간)을 보관하므로, 갱신 비용은 전체 기간이 아닌 새로운 날짜 수에 비례함
+
+    Args:
+        columns (list[str]): 각 수익률 series의 이름
+    """
+    def __init__(self, columns: list[str]):
+        num_columns = len(columns)
+
+        self.columns = list(columns)
+        self.first_date = None
+        self.last_date = None
+
+        # 연도 별 상태 (years x series)
+        self.years = np.empty(0, dtype=np.int64)
+        self.log_growth = np.empty((0, num_columns))
+        self.full_stats = np.empty((3, 0, num_columns))     # (개수, 평균, M2)
+        self.downside_stats = np.empty((3, 0, num_columns)) # 하락 구간(음수 수익률)만의 (개수, 평균, M2)
+
+        # 누적 로그 수익률 series. 날짜가 추가될 때마다 다시 복사하지 않도록 여유 공간을 두고 앞의 num_days개만 사용
+        self.num_days = 0
+        self._saved_days = 0
+        self._dates = np.empty(0, dtype='datetime64[ns]')
+        self._growth = np.empty((0, num_columns))
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self._dates[:self.num_days]
+
+    @property
+    def cumulative_growth(self) -> np.ndarray:
+        """
+        종목 별 누적 로그 수익률 (days x series)
+        """
+        return self._growth[:self.num_days]
+
+    def _reserve(self, num_days: int):
+        """
+        num_days개의 날짜를 담을 수 있도록 series 버퍼를 (2배씩) 늘림
+        """
+        if num_days <= len(self._dates):
+            return
+
+        capacity = max(num_days, 2 * len(self._dates), 256)
+
+        dates = np.empty(capacity, dtype='datetime64[ns]')
+        dates[:self.num_days] = self.dates
+
+        growth = np.empty((capacity, len(self.columns)))
+        growth[:self.num_days] = self.cumulative_growth
+
+        self._dates, self._growth = dates, growth
+
+    def overlaps(self, daily_returns: pd.DataFrame) -> bool:
+        """
+        daily_returns가 마지막으로 반영된 날짜부터 시작하고, 그 날의 수익률이 반영된 값과 같은지 여부.
+        배당/분할로 과거 수익률이 다시 쓰였으면 False
+
+        Args:
+            daily_returns (pd.DataFrame): 일 별 수익률 (days x series)
+        """
+        if self.num_days < 2 or daily_returns.empty or daily_returns.index[0] != self.last_date:
+            return False
+
+        new_growth = np.log1p(daily_returns.iloc[0].to_numpy(dtype=float))
+        cached_growth = self.cumulative_growth[-1] - self.cumulative_growth[-2]
+
+        return new_growth.shape == cached_growth.shape and np.allclose(new_growth, cached_growth, rtol=1e-9, atol=1e-12)
+
+    def update(self, daily_returns: pd.DataFrame) -> int:
+        """
+        마지막으로 반영된 날짜 이후의 수익률만 반영하고, 새로 반영된 날짜 수 반환
+
+        Args:
+            daily_returns (pd.DataFrame): 일 별 수익률 (days x series). 이미 반영된 날짜가 포함돼 있어도 됨
+        """
+        daily_returns = daily_returns.sort_index()
+        if self.last_date is not None:
+            daily_returns = daily_returns[daily_returns.index > self.last_date]
+
+        if daily_returns.empty:
+            return 0
+
+        returns = daily_returns.to_numpy(dtype=float).reshape(len(daily_returns), -1)
+        assert returns.shape[1] == len(self.columns), "수익률 series 개수가 상태와 같아야 합니다."
+
+        new_years = daily_returns.index.year.to_numpy()
+        year_starts = np.flatnonzero(np.r_[True, new_years[1:] != new_years[:-1]])
+        batch_years = new_years[year_starts]
+
+        self._add_years(batch_years)
+        rows = np.searchsorted(self.years, batch_years)
+
+        log_returns = np.log1p(returns)
+        self.log_growth[rows] += np.add.reduceat(log_returns, year_starts, axis=0)
+
+        self.full_stats[:, rows] = _merge_stats(self.full_stats[:, rows], _batch_stats(returns, np.ones(returns.shape, dtype=bool), year_starts))
+        self.downside_stats[:, rows] = _merge_stats(self.downside_stats[:, rows], _batch_stats(returns, returns < 0, year_starts))
+
+        last_growth = self.cumulative_growth[-1] if self.num_days else np.zeros(len(self.columns))
+        start, end = self.num_days, self.num_days + len(daily_returns)
+
+        self._reserve(end)
+        self._growth[start:end] = last_growth + np.cumsum(log_returns, axis=0)
+        self._dates[start:end] = np.asarray(daily_returns.index, dtype='datetime64[ns]')
+        self.num_days = end
+
+        self.first_date = self.first_date if self.first_date is not None else daily_returns.index[0]
+        self.last_date = daily_returns.index[-1]
+
+        return len(daily_returns)
+
+    def _add_years(self, years: np.ndarray):
+        missing = np.setdiff1d(years, self.years)
+        if len(missing) == 0:
+            return
+
+        all_years = np.union1d(self.years, missing)
+        rows = np.searchsorted(all_years, self.years)
+
+        log_growth = np.zeros((len(all_years), len(self.columns)))
+        log_growth[rows] = self.log_growth
+
+        full_stats = np.zeros((3, len(all_years), len(self.columns)))
+        full_stats[:, rows] = self.full_stats
+
+        downside_stats = np.zeros((3, len(all_years), len(self.columns)))
+        downside_stats[:, rows] = self.downside_stats
+
+        self.years, self.log_growth, self.full_stats, self.downside_stats = all_years, log_growth, full_stats, downside_stats
+
+    def annual_return(self) -> np.ndarray:
+        """
+        analysis.get_annual_return()과 같이 첫 연도와 마지막 연도를 제외한 연 평균 수익률 반환 (series 별)
+        """
+        years = self.years[1:-1]
+        num_years = years[-1] - years[0] + 1
+
+        return np.exp(self.log_growth[1:-1].sum(axis=0) / num_years) - 1
+
+    def annual_volatility(self, downward_only: bool = True) -> np.ndarray:
+        """
+        analysis.get_annual_volatility()와 같이 첫 연도와 마지막 연도를 제외한 연도 별 변동성의 평균 반환 (series 별)
+
+        Args:
+            downward_only (bool): 하락 구간만 계산할지 여부
+        """
+        counts, _, m2 = (self.downside_stats if downward_only else self.full_stats)[:, 1:-1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # σ_annual = σ_daily × √252 => 252는 연간 거래일 수
+            yearly_volatility = np.where(counts > 1, np.sqrt(m2 / (counts - 1)), np.nan) * np.sqrt(252)
+            valid = ~np.isnan(yearly_volatility)
+
+            return np.where(valid, yearly_volatility, 0.0).sum(axis=0) / valid.sum(axis=0)
+
+    def cumulative_return(self) -> pd.DataFrame:
+        """
+        누적 수익률 (days x series) 반환
+        """
+        return pd.DataFrame(np.expm1(self.cumulative_growth), index=pd.DatetimeIndex(self.dates), columns=self.columns)
+
+    def save(self, path: str):
+        """
+        상태를 저장. 연도 별 상태는 .npz 파일을 교체하고, 누적 로그 수익률 series는 아직 저장하지 않은 날짜만 별도 파일 뒤에 이어서 씀
+
+        Args:
+            path (str): 저장할 .npz 파일 경로
+        """
+        dates_path, growth_path = _series_paths(path)
+        _write_rows(dates_path, self.dates.view(np.int64), self._saved_days)
+        _write_rows(growth_path, self.cumulative_growth, self._saved_days)
+
+        # series 파일을 먼저 쓰고 .npz를 교체하므로, 중간에 실패해도 .npz의 num_days까지는 항상 올바른 값임
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path, columns=np.array(self.columns), first_date=np.datetime64(self.first_date, 'ns'), last_date=np.datetime64(self.last_date, 'ns'),
+            years=self.years, log_growth=self.log_growth, full_stats=self.full_stats, downside_stats=self.downside_stats, num_days=self.num_days,
+        )
+        os.replace(tmp_path, path)
+
+        self._saved_days = self.num_days
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalMetrics":
+        """
+        save()로 저장된 상태를 불러옴
+
+        Args:
+            path (str): 저장된 .npz 파일 경로
+        """
+        with np.load(path) as data:
+            state = cls([str(column) for column in data['columns']])
+            state.first_date = pd.Timestamp(data['first_date'][()])
+            state.last_date = pd.Timestamp(data['last_date'][()])
+            num_days = int(data['num_days'])
+
+            for name in ('years', 'log_growth', 'full_stats', 'downside_stats'):
+                setattr(state, name, data[name])
+
+        # 이후에 추가될 날짜를 위한 여유 공간을 두고 읽음
+        state._reserve(num_days + max(256, num_days // 8))
+
+        dates_path, growth_path = _series_paths(path)
+        _read_rows(dates_path, state._dates[:num_days].view(np.int64))
+        _read_rows(growth_path, state._growth[:num_days])
+        state.num_days = state._saved_days = num_days
+
+        return state
+
+def _series_paths(path: str) -> tuple[str, str]:
+    """
+    상태 파일의 누적 로그 수익률 series를 저장할 (날짜, 누적 로그 수익률) 파일 경로
+    """
+    base, _ = os.path.splitext(path)
+
+    return base + ".dates.bin", base + ".growth.bin"
+
+def _write_rows(path: str, values: np.ndarray, start: int):
+    """
+    values[start:]를 파일의 start번째 행 위치부터 씀 (이전 저장이 중간에 실패해 남은 행은 덮어씀)
+    """
+    row_bytes = values.itemsize * int(np.prod(values.shape[1:]))
+
+    with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+        f.seek(start * row_bytes)
+        f.write(np.ascontiguousarray(values[start:]).tobytes())
+        f.truncate()
+
+def _read_rows(path: str, out: np.ndarray):
+    """
+    파일의 앞부분을 out 크기만큼 읽음
+    """
+    with open(path, "rb") as f:
+        read_bytes = f.readinto(out)
+
+    if read_bytes != out.nbytes:
+        raise ValueError(f"{path}에 저장된 series가 상태 파일보다 짧습니다.")
+
+def _batch_stats(returns: np.ndarray, selected: np.ndarray, year_starts: np.ndarray) -> np.ndarray:
+    """
+    새로 추가된 수익률의 연도 별 (개수, 평균, M2)
+    """
+    counts = np.add.reduceat(selected.astype(np.int64), year_starts, axis=0)
+    sums = np.add.reduceat(np.where(selected, returns, 0.0), year_starts, axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = np.where(counts > 0, sums / counts, 0.0)
+
+    group_lengths = np.diff(np.r_[year_starts, len(returns)])
+    deviations = np.where(selected, returns - np.repeat(means, group_lengths, axis=0), 0.0)
+    m2 = np.add.reduceat(deviations ** 2, year_starts, axis=0)
+
+    return np.stack((counts, means, m2))
+
+def _merge_stats(current: np.ndarray, batch: np.ndarray) -> np.ndarray:
+    """
+    두 (개수, 평균, M2)를 합침 (Chan et al.의 병렬 Welford 분산)
+    """
+    count_a, mean_a, m2_a = current
+    count_b, mean_b, m2_b = batch
+    count = count_a + count_b
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = mean_b - mean_a
+        mean = np.where(count > 0, mean_a + delta * count_b / count, 0.0)
+        m2 = np.where(count > 0, m2_a + m2_b + delta ** 2 * count_a * count_b / count, 0.0)
+
+    return np.stack((count, mean, m2))
+
+def update_metrics_state(path: str, columns: list[str], read_returns: Callable[[pd.Timestamp], pd.DataFrame]) -> IncrementalMetrics:
+    """
+    저장된 상태를 불러와 새로운 날짜만 반영한 뒤 다시 저장.
+    마지막으로 반영된 날짜의 수익률이 달라졌거나 (과거 데이터가 다시 쓰임), 저장된 상태가 없거나 series 구성이 달라졌으면 처음부터 다시 계산
+
+    Args:
+        path (str): 상태 파일 경로
+        columns (list[str]): 각 수익률 series의 이름
+        read_returns (Callable[[pd.Timestamp], pd.DataFrame]): 주어진 날짜 다음 날부터의 일 별 수익률 (days x series)을 반환하는 함수.
+            None이 주어지면 전체 기간의 수익률을 반환
+    """
+    columns = [str(column) for column in columns]
+    state = _load_state(path, columns)
+    daily_returns = None
+
+    if state is not None and state.num_days >= 2:
+        # 마지막으로 반영된 날짜의 수익률부터 불러와서 반영된 값과 비교 (전체 기간을 다시 불러오지 않음)
+        daily_returns = read_returns(pd.Timestamp(state.dates[-2]))
+        if not state.overlaps(daily_returns):
+            daily_returns = None
+
+    if daily_returns is None:
+        state = IncrementalMetrics(columns)
+        daily_returns = read_returns(None)
+
+    if state.update(daily_returns) > 0:
+        state.save(path)
+
+    return state
+
+def _load_state(path: str, columns: list[str]) -> IncrementalMetrics:
+    """
+    저장된 상태를 불러옴. 없거나, 읽을 수 없거나, series 구성이 다르면 None 반환
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        state = IncrementalMetrics.load(path)
+    except (KeyError, ValueError, OSError):
+        # 이전 형식이거나 series 파일이 없으면 다시 계산
+        return None
+
+    return state if state.columns == columns else None
@@ -0,0 +1,9 @@
+# 분석 arguments의 선택지와 기본값.
+# main.py가 --help나 잘못된 argument를 처리할 때 numpy/pandas/matplotlib/yfinance를 불러오지 않도록 무거운 module과 분리
+
+DEFAULT_CACHE_DIR = "./cache"
+
+EXPORT_FORMATS = ["csv", "parquet"]
+
+REBALANCE_FREQUENCIES = ["daily", "monthly", "quarterly", "yearly", "none"]
+CONTRIBUTION_FREQUENCIES = ["none", "monthly", "quarterly", "yearly"]
@@ -0,0 +1,103 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Iterable, Iterator
+import numpy as np
+
+# worker process에서 attach한 shared memory 배열 (이름 -> np.ndarray)
+_SHARED_ARRAYS = {}
+_SHARED_MEMORIES = []
+
+_NO_TASK = object()
+
+class SharedArrays:
+    """
+    numpy 배열들을 shared memory에 올려, worker process들이 pickle 복사 없이 같은 메모리를 읽도록 함
+
+    Args:
+        arrays (dict[str, np.ndarray]): 공유할 배열 (이름 -> 배열)
+    """
+    def __init__(self, arrays: dict[str, np.ndarray]):
+        self.memories = []
+        self.specs = {}
+
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[...] = array
+
+            self.memories.append(memory)
+            self.specs[name] = (memory.name, array.shape, array.dtype.str)
+
+    def close(self):
+        for memory in self.memories:
+            memory.close()
+            memory.unlink()
+        self.memories = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _attach_shared_arrays(specs: dict[str, tuple]):
+    """
+    worker process 시작 시 shared memory에 올라간 배열들을 attach
+    """
+    for name, (memory_name, shape, dtype) in specs.items():
+        # worker는 부모 process의 resource tracker를 공유하므로, 메모리 해제는 부모 process의 SharedArrays.close()가 담당
+        memory = shared_memory.SharedMemory(name=memory_name)
+        _SHARED_MEMORIES.append(memory)
+        _SHARED_ARRAYS[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf)
+
+def _run_shared_task(func: Callable, task, seed: np.random.SeedSequence):
+    return func(task, _SHARED_ARRAYS, np.random.default_rng(seed))
+
+def imap_tasks(func: Callable, tasks: Iterable, arrays: dict[str, np.ndarray] = None, workers: int = 1, seed: int = None, max_pending: int = None) -> Iterator:
+    """
+    각 task에 대해 func(task, arrays, rng)를 process pool에서 실행하고, 결과를 task 순서대로 하나씩 반환.
+    task마다 seed에서 파생된 독립적인 난수 생성기를 사용하므로, worker 개수와 관계없이 결과가 같음
+
+    Args:
+        func (Callable): 실행할 함수 (pickle 가능한 module 최상위 함수)
+        tasks (Iterable): func에 전달할 task들 (생성기도 가능)
+        arrays (dict[str, np.ndarray]): 모든 task가 공유할 배열 (shared memory로 전달)
+        workers (int): worker process 개수. 1 이하면 현재 process에서 실행
+        seed (int): task별 난수 생성기를 만들 seed. None이면 매 실행마다 다른 결과
+        max_pending (int): 동시에 처리 중인 task의 최대 개수 (default: workers * 2)
+    """
+    arrays = arrays if arrays is not None else {}
+    seed_sequence = np.random.SeedSequence(seed)
+
+    if workers <= 1:
+        for task in tasks:
+            yield func(task, arrays, np.random.default_rng(seed_sequence.spawn(1)[0]))
+        return
+
+    max_pending = max_pending if max_pending is not None else workers * 2
+    tasks = iter(tasks)
+
+    with SharedArrays(arrays) as shared, ProcessPoolExecutor(
+        max_workers=workers, initializer=_attach_shared_arrays, initargs=(shared.specs,)
+    ) as executor:
+        def submit(task):
+            return executor.submit(_run_shared_task, func, task, seed_sequence.spawn(1)[0])
+
+        # task 전체를 만들지 않도록 동시에 처리 중인 task 개수를 제한
+        pending = deque(submit(task) for _, task in zip(range(max_pending), tasks))
+
+        while pending:
+            result = pending.popleft().result()
+
+            next_task = next(tasks, _NO_TASK)
+            if next_task is not _NO_TASK:
+                pending.append(submit(next_task))
+
+            yield result
+
+def run_tasks(func: Callable, tasks: Iterable, arrays: dict[str, np.ndarray] = None, workers: int = 1, seed: int = None) -> list:
+    """
+    imap_tasks()의 결과를 list로 반환
+    """
+    return list(imap_tasks(func, tasks, arrays, workers, seed))
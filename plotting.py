@@ -0,0 +1,126 @@
+import matplotlib
+matplotlib.use("Agg") # 화면 출력 없이 파일로만 저장하는 backend 사용
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+
+from profiling import stage
+
+def get_figure(name: str, figsize: tuple[float, float], nrows: int = 1) -> tuple[Figure, Axes | np.ndarray]:
+    """
+    새로운 figure와 axes 반환. 저장한 뒤에는 save_figure()에서 닫음
+    (이름으로 figure를 비운 뒤 재사용하는 것은 새로 만드는 것보다 느리므로 매번 새로 생성)
+
+    Args:
+        name (str): figure 이름 (분석 방법)
+        figsize (tuple[float, float]): figure 크기
+        nrows (int): 세로로 배치할 axes 개수
+    """
+    fig = plt.figure(figsize=figsize)
+    fig.set_label(name)
+    axes = fig.subplots(nrows=nrows)
+
+    return fig, axes
+
+def save_figure(fig: Figure, path: str, close: bool = True):
+    """
+    figure를 파일로 저장한 뒤 닫음 (batch 실행 중 figure가 쌓여 메모리가 늘어나지 않도록 함)
+
+    Args:
+        fig (Figure): 저장할 figure
+        path (str): 저장할 경로
+        close (bool): 저장 후 figure를 닫을지 여부
+    """
+    with stage("render.savefig"):
+        fig.savefig(path)
+
+    if close:
+        plt.close(fig)
+
+def scatter_points(ax: Axes, x: np.ndarray, y: np.ndarray, colors: list[str], labels: list[str] = None, size: float = 500,
+                   max_labels: int = 20):
+    """
+    점들을 색상 별로 묶어 색상마다 한 번의 scatter로 그림 (점마다 artist를 만들지 않음).
+    이름은 점마다 text artist가 하나씩 필요하므로, 점이 max_labels개보다 많으면 효율적 투자선 위의 점 중 최대 max_labels개에만 표시
+
+    Args:
+        ax (Axes): 그릴 axes
+        x (np.ndarray): 점들의 x 좌표
+        y (np.ndarray): 점들의 y 좌표
+        colors (list[str]): 점 별 색상
+        labels (list[str]): 점 위에 표시할 이름 (default: 표시하지 않음)
+        size (float): 점 크기
+        max_labels (int): 이름을 표시할 최대 점 개수
+    """
+    x, y = np.asarray(x), np.asarray(y)
+
+    groups = {}
+    for i, color in enumerate(colors):
+        groups.setdefault(color, []).append(i)
+
+    with stage("render.draw"):
+        for color, indices in groups.items():
+            ax.scatter(x[indices], y[indices], s=size, color=color, alpha=0.6, edgecolors='black')
+
+        if labels is not None:
+            labeled = np.arange(len(x)) if len(x) <= max_labels else frontier_indices(x, y)
+            if len(labeled) > max_labels:
+                labeled = labeled[np.linspace(0, len(labeled) - 1, max_labels).round().astype(np.int64)]
+
+            for i in labeled:
+                ax.text(x[i], y[i], labels[i], fontsize=8, ha='center', va='center', fontweight='bold')
+
+def frontier_indices(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    x(변동성)가 같거나 더 작으면서 y(수익률)가 더 큰 다른 점이 없는 점들 (효율적 투자선)의 위치를 x 오름차순으로 반환
+
+    Args:
+        x (np.ndarray): 점들의 x 좌표
+        y (np.ndarray): 점들의 y 좌표
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+
+    # x 오름차순 (같으면 y 내림차순)으로 보면서 지금까지의 최대 y보다 큰 점만 남김
+    order = np.lexsort((-y, x))
+    sorted_y = y[order]
+    previous_max = np.concatenate(([-np.inf], np.maximum.accumulate(sorted_y)[:-1]))
+
+    return order[sorted_y > previous_max]
+
+def minmax_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    긴 series (points x series)를 그릴 때 사용할 점의 위치 (kept x series) 반환.
+    전체를 (max_points - 2) / 2개의 구간으로 나눠 구간마다 최소값과 최대값만 남기므로 (min/max decimation),
+    점 개수가 max_points 이하로 줄어도 최고점/최저점과 급락 구간의 모양은 그대로 유지됨. 처음과 마지막 점은 항상 포함
+
+    Args:
+        values (np.ndarray): 그릴 값 (points x series)
+        max_points (int): series 별 최대 점 개수 (0이면 줄이지 않음)
+    """
+    values = np.asarray(values, dtype=float).reshape(len(values), -1)
+    num_points, num_series = values.shape
+
+    if max_points == 0 or num_points <= max_points:
+        return np.repeat(np.arange(num_points)[:, None], num_series, axis=1)
+
+    assert max_points >= 4, "max_points는 4 이상이어야 합니다."
+
+    num_buckets = (max_points - 2) // 2
+    bucket_size = -(-(num_points - 2) // num_buckets)
+    num_buckets = -(-(num_points - 2) // bucket_size) # 마지막 구간이 비지 않도록 조정
+
+    # 구간 크기를 맞추기 위해 남는 자리는 최소/최대로 선택되지 않는 값으로 채움
+    inner = values[1:-1]
+    padding = num_buckets * bucket_size - len(inner)
+    low = np.concatenate((inner, np.full((padding, num_series), np.inf))).reshape(num_buckets, bucket_size, num_series)
+    high = np.concatenate((inner, np.full((padding, num_series), -np.inf))).reshape(num_buckets, bucket_size, num_series)
+
+    starts = (np.arange(num_buckets) * bucket_size + 1)[:, None]
+    lows = np.nan_to_num(low, nan=np.inf).argmin(axis=1) + starts
+    highs = np.nan_to_num(high, nan=-np.inf).argmax(axis=1) + starts
+
+    indices = np.concatenate((np.zeros((1, num_series), dtype=np.int64), lows, highs, np.full((1, num_series), num_points - 1)))
+
+    return np.sort(indices, axis=0)
@@ -0,0 +1,187 @@
+import io
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Callable
+
+# 현재 활성화된 Profiler (None이면 계측하지 않으며, stage()/count()는 아무 일도 하지 않음)
+_ACTIVE = None
+
+class Profiler:
+    """
+    단계(stage) 별 실행 시간, 호출 횟수, 최대 메모리 사용량과 counter를 모으는 계측기.
+    단계는 중첩될 수 있으며, 바깥 단계의 시간과 메모리에는 안쪽 단계가 포함됨
+
+    Args:
+        cprofile (bool): cProfile로 함수 별 실행 시간도 함께 측정할지 여부
+        memory (bool): tracemalloc으로 단계 별 최대 메모리 사용량을 측정할지 여부
+    """
+    def __init__(self, cprofile: bool = False, memory: bool = False):
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self.memory = memory
+
+        self.stages = {}
+        self.counters = {}
+        self._stack = [] # 현재 실행 중인 단계들의 최대 메모리 사용량 (바깥 단계부터)
+        self._started_at = None
+        self._seconds = None
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+
+        self._started_at = time.perf_counter()
+
+    def stop(self):
+        self._seconds = time.perf_counter() - self._started_at
+
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        with 구문 안의 실행 시간과 최대 메모리 사용량을 name 단계에 누적
+
+        Args:
+            name (str): 단계 이름 (e.g. "fetch", "metrics.annual_volatility", "render")
+        """
+        tracing = self.memory and tracemalloc.is_tracing()
+        if tracing:
+            # 안쪽 단계에서 peak를 초기화해도 바깥 단계의 peak가 사라지지 않도록 먼저 반영
+            self._update_peaks()
+            tracemalloc.reset_peak()
+        self._stack.append(0)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if tracing:
+                self._update_peaks()
+            peak_memory = self._stack.pop()
+
+            stage = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "peak_memory_bytes": 0})
+            stage["calls"] += 1
+            stage["seconds"] += seconds
+            stage["peak_memory_bytes"] = max(stage["peak_memory_bytes"], peak_memory)
+
+    def _update_peaks(self):
+        _, peak = tracemalloc.get_traced_memory()
+        self._stack = [max(stack_peak, peak) for stack_peak in self._stack]
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self, top: int = 20) -> dict:
+        """
+        단계 별 계측 결과를 dict로 반환 (cProfile을 사용했으면 누적 시간 상위 top개 함수 포함)
+
+        Args:
+            top (int): 포함할 함수 개수
+        """
+        report = {
+            "total_seconds": self._seconds,
+            "stages": dict(sorted(self.stages.items(), key=lambda item: -item[1]["seconds"])),
+            "counters": self.counters,
+        }
+
+        if self.cprofile is not None:
+            stats = pstats.Stats(self.cprofile, stream=io.StringIO())
+            functions = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:top]
+
+            report["functions"] = [
+                {"function": f"{file}:{line}({name})", "calls": calls, "total_seconds": total, "cumulative_seconds": cumulative}
+                for (file, line, name), (_, calls, total, cumulative, _) in functions
+            ]
+
+        return report
+
+    def save(self, path: str):
+        """
+        계측 결과를 JSON으로 저장. cProfile을 사용했으면 pstats/snakeviz로 볼 수 있는 .prof 파일도 함께 저장
+
+        Args:
+            path (str): 저장할 JSON 경로
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(path.rsplit(".", 1)[0] + ".prof")
+
+def start_profiling(cprofile: bool = True, memory: bool = True) -> Profiler:
+    """
+    새로운 Profiler를 활성화하고 반환
+
+    Args:
+        cprofile (bool): cProfile로 함수 별 실행 시간도 함께 측정할지 여부
+        memory (bool): tracemalloc으로 단계 별 최대 메모리 사용량을 측정할지 여부
+    """
+    global _ACTIVE
+
+    _ACTIVE = Profiler(cprofile, memory)
+    _ACTIVE.start()
+
+    return _ACTIVE
+
+def stop_profiling() -> Profiler:
+    """
+    활성화된 Profiler를 멈추고 반환
+    """
+    global _ACTIVE
+
+    profiler, _ACTIVE = _ACTIVE, None
+    if profiler is not None:
+        profiler.stop()
+
+    return profiler
+
+def stage(name: str):
+    """
+    활성화된 Profiler의 name 단계로 계측 (Profiler가 없으면 아무 일도 하지 않음)
+
+    Args:
+        name (str): 단계 이름
+    """
+    return _ACTIVE.stage(name) if _ACTIVE is not None else nullcontext()
+
+def count(name: str, n: int = 1):
+    """
+    활성화된 Profiler의 name counter를 n만큼 증가
+
+    Args:
+        name (str): counter 이름
+        n (int): 증가시킬 값
+    """
+    if _ACTIVE is not None:
+        _ACTIVE.count(name, n)
+
+def timed(name: str) -> Callable:
+    """
+    함수 호출 전체를 name 단계로 계측하는 decorator
+
+    Args:
+        name (str): 단계 이름
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _ACTIVE is None:
+                return func(*args, **kwargs)
+
+            with _ACTIVE.stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
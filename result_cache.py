@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+def result_key(metric: str, tickers: list[str], weights: list[float], versions: list[str], date_range: tuple[str, str], **options) -> str:
+    """
+    포트폴리오 결과의 content-addressed key 반환. 같은 종목 구성과 비율, 같은 데이터(종목 별 수익률 digest와 기간), 같은 옵션이면 같은 key.
+    종목 순서와 비율 0인 종목은 key에 영향을 주지 않으므로 S8Q2와 Q2S8은 같은 key
+
+    Args:
+        metric (str): 지표 이름 (e.g. "annual_return", "annual_volatility")
+        tickers (list[str]): 종목 번호
+        weights (list[float]): 투자 비율 (소수점)
+        versions (list[str]): 종목 별 수익률 데이터 digest
+        date_range (tuple[str, str]): 데이터의 첫 날짜와 마지막 날짜
+        options: 결과에 영향을 주는 그 외 옵션 (e.g. downward_only=True)
+    """
+    # 부동소수점 오차로 key가 달라지지 않도록 비율은 반올림
+    assets = sorted((ticker, round(float(weight), 10), version) for ticker, weight, version in zip(tickers, weights, versions) if weight != 0)
+    payload = json.dumps({"metric": metric, "assets": assets, "dates": list(date_range), "options": options}, sort_keys=True)
+
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def data_digest(values: np.ndarray) -> str:
+    """
+    수익률 배열의 digest 반환 (가격 데이터가 갱신되거나 수정되면 바뀜)
+
+    Args:
+        values (np.ndarray): 일 별 수익률
+    """
+    return hashlib.sha1(np.ascontiguousarray(values, dtype=np.float64).tobytes()).hexdigest()[:16]
+
+class ResultCache:
+    """
+    key -> 결과 배열을 메모리(LRU)와 선택적으로 디스크(SQLite)에 보관하는 캐시.
+    key에 데이터 digest와 마지막 날짜가 포함되므로, 가격 캐시가 갱신되면 이전 결과는 더 이상 조회되지 않고 LRU 순서로 제거됨
+
+    Args:
+        max_entries (int): 메모리에 보관할 최대 결과 개수
+        cache_dir (str): 디스크에 결과를 저장할 디렉토리. None이면 메모리만 사용
+        max_disk_entries (int): 디스크에 보관할 최대 결과 개수
+    """
+    def __init__(self, max_entries: int = 100_000, cache_dir: str = None, max_disk_entries: int = 10_000_000):
+        assert max_entries > 0, "max_entries는 0보다 커야 합니다."
+
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._db = None
+        self._disk_entries = 0 # 디스크에 저장된 결과 개수의 상한 (교체된 결과도 더하므로 실제보다 클 수 있음)
+
+        if cache_dir is not None:
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+
+            self._db = sqlite3.connect(os.path.join(cache_dir, "results.sqlite"))
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB, accessed REAL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            self._disk_entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """
+        keys 중 캐시에 있는 결과만 dict로 반환 (메모리에 없으면 디스크에서 찾아 메모리에 올림)
+
+        Args:
+            keys (list[str]): 찾을 key
+        """
+        found = {}
+        missing = []
+
+        for key in keys:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                found[key] = self._entries[key]
+            else:
+                missing.append(key)
+
+        if self._db is not None and missing:
+            now = time.time()
+
+            # SQLite의 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for i in range(0, len(missing), 500):
+                batch = missing[i:i + 500]
+                rows = self._db.execute(f"SELECT key, value FROM results WHERE key IN ({','.join('?' * len(batch))})", batch).fetchall()
+
+                for key, value in rows:
+                    found[key] = np.frombuffer(value, dtype=np.float64)
+                    self._remember(key, found[key])
+
+                self._db.executemany("UPDATE results SET accessed = ? WHERE key = ?", [(now, key) for key, _ in rows])
+
+            self._db.commit()
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+
+        return found
+
+    def get(self, key: str) -> np.ndarray:
+        """
+        key의 결과 반환 (없으면 None)
+
+        Args:
+            key (str): 찾을 key
+        """
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: dict[str, np.ndarray]):
+        """
+        결과들을 메모리와 디스크에 저장
+
+        Args:
+            items (dict[str, np.ndarray]): key -> 결과 배열
+        """
+        items = {key: np.atleast_1d(np.asarray(value, dtype=np.float64)) for key, value in items.items()}
+
+        for key, value in items.items():
+            self._remember(key, value)
+
+        if self._db is not None and items:
+            now = time.time()
+            self._db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?)", [(key, value.tobytes(), now) for key, value in items.items()])
+            self._disk_entries += len(items)
+
+            if self._disk_entries > self.max_disk_entries:
+                self._evict_disk()
+            self._db.commit()
+
+    def put(self, key: str, value: np.ndarray):
+        """
+        결과 하나를 저장
+
+        Args:
+            key (str): 저장할 key
+            value (np.ndarray): 결과 배열
+        """
+        self.put_many({key: value})
+
+    def _remember(self, key: str, value: np.ndarray):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _evict_disk(self):
+        # 가장 오래 조회되지 않은 결과부터 삭제
+        self._disk_entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        excess = self._disk_entries - self.max_disk_entries
+
+        if excess > 0:
+            self._db.execute("DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed LIMIT ?)", (excess,))
+            self._disk_entries -= excess
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
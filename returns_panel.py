@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+class ReturnsPanel:
+    """
+    여러 종목의 수정 종가(Adj Close) 일 별 수익률을 공통 날짜 index와 함께 하나의 연속된 float64 배열 (days x tickers)로 보관.
+    select()와 trim_first_last_year()는 같은 배열을 공유하는 panel을 반환하므로, 포트폴리오를 복사 없이 구성할 수 있음
+
+    Args:
+        values (np.ndarray): 일 별 수익률 (days x tickers)
+        index (pd.DatetimeIndex): 날짜 index (오름차순)
+        tickers (list[str]): 각 열의 종목 번호
+    """
+    def __init__(self, values: np.ndarray, index: pd.DatetimeIndex, tickers: list[str]):
+        assert values.shape == (len(index), len(tickers)), "values의 크기는 (날짜 개수, 종목 개수)와 같아야 합니다."
+
+        self._values = np.ascontiguousarray(values, dtype=np.float64)
+        self.index = index
+        self.all_tickers = list(tickers)
+        self._columns = np.arange(len(tickers))
+
+    @classmethod
+    def from_stock_info(cls, stock_info: list[pd.DataFrame], tickers: list[str] = None) -> "ReturnsPanel":
+        """
+        종목 정보 (yf.download 형태)에서 공통 날짜의 수정 종가만 꺼내 panel 생성 (OHLCV 전체를 합치지 않음)
+
+        Args:
+            stock_info (list[pd.DataFrame]): 종목 정보
+            tickers (list[str]): 각 종목의 종목 번호 (default: 'Adj Close' 컬럼의 종목 번호)
+        """
+        if tickers is None:
+            tickers = [str(df['Adj Close'].columns[0]) if isinstance(df['Adj Close'], pd.DataFrame) else f"{i}" for i, df in enumerate(stock_info)]
+
+        # 가장 최근에 만들어진 종목에 맞춰서 데이터 사용
+        index = stock_info[0].index
+        for df in stock_info[1:]:
+            index = index.intersection(df.index)
+        index = index.sort_values()
+
+        prices = np.empty((len(index), len(stock_info)))
+        for col, df in enumerate(stock_info):
+            adj_close = np.asarray(df['Adj Close'], dtype=float).reshape(len(df), -1)[:, 0]
+            prices[:, col] = adj_close[df.index.get_indexer(index)]
+
+        return cls.from_prices(prices, index, tickers)
+
+    @classmethod
+    def from_prices(cls, prices: np.ndarray, index: pd.DatetimeIndex, tickers: list[str]) -> "ReturnsPanel":
+        """
+        가격 배열 (days x tickers)에서 일 별 수익률 panel 생성 (pct_change().dropna()와 동일)
+        """
+        returns = prices[1:] / prices[:-1] - 1
+        valid = ~np.isnan(returns).any(axis=1)
+
+        return cls(returns[valid], index[1:][valid], tickers)
+
+    @classmethod
+    def from_frame(cls, daily_returns: pd.DataFrame) -> "ReturnsPanel":
+        """
+        일 별 수익률 DataFrame (days x tickers)에서 panel 생성
+        """
+        daily_returns = daily_returns.sort_index()
+
+        return cls(daily_returns.to_numpy(dtype=float), daily_returns.index, [str(col) for col in daily_returns.columns])
+
+    @property
+    def tickers(self) -> list[str]:
+        return [self.all_tickers[col] for col in self._columns]
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.index), len(self._columns)
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        선택된 종목의 수익률 배열. 전체 종목이 선택돼 있으면 복사 없이 원본 배열 반환
+        """
+        if len(self._columns) == len(self.all_tickers) and np.array_equal(self._columns, np.arange(len(self.all_tickers))):
+            return self._values
+
+        return self._values[:, self._columns]
+
+    @property
+    def years(self) -> np.ndarray:
+        return self.index.year.to_numpy()
+
+    def _view(self, rows: slice, columns: np.ndarray) -> "ReturnsPanel":
+        panel = ReturnsPanel.__new__(ReturnsPanel)
+        panel._values = self._values[rows]
+        panel.index = self.index[rows]
+        panel.all_tickers = self.all_tickers
+        panel._columns = columns
+
+        return panel
+
+    def select(self, tickers: list[str]) -> "ReturnsPanel":
+        """
+        일부 종목만 선택한 panel 반환 (배열은 복사하지 않고 공유)
+
+        Args:
+            tickers (list[str]): 선택할 종목 번호
+        """
+        columns = np.array([self.all_tickers.index(ticker) for ticker in tickers], dtype=int)
+
+        return self._view(slice(None), columns)
+
+    def trim_first_last_year(self) -> "ReturnsPanel":
+        """
+        첫 연도와 마지막 연도를 제거한 panel 반환 (날짜가 정렬돼 있으므로 행 slice로 배열 공유)
+        """
+        years = self.years
+        start = np.searchsorted(years, years[0], side='right')
+        end = np.searchsorted(years, years[-1], side='left')
+
+        return self._view(slice(start, max(start, end)), self._columns)
+
+    def full_weights(self, weights: np.ndarray) -> np.ndarray:
+        """
+        선택된 종목 기준의 투자 비율 (selected x portfolios)을 전체 종목 기준 (all x portfolios)으로 확장 (나머지 종목은 0)
+
+        Args:
+            weights (np.ndarray): 선택된 종목 기준의 투자 비율
+        """
+        weights = np.asarray(weights, dtype=float)
+        assert weights.shape[0] == len(self._columns), "투자 비율의 개수는 선택된 종목 개수와 같아야 합니다."
+
+        full = np.zeros((len(self.all_tickers),) + weights.shape[1:])
+        np.add.at(full, self._columns, weights)
+
+        return full
+
+    def weighted_returns(self, weights: np.ndarray) -> np.ndarray:
+        """
+        투자 비율에 따른 포트폴리오 일 별 수익률 (days,) 혹은 (days x portfolios) 반환
+
+        Args:
+            weights (np.ndarray): 선택된 종목 기준의 투자 비율 (selected,) 혹은 (selected x portfolios)
+        """
+        return self._values @ self.full_weights(weights)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.values, index=self.index, columns=self.tickers)
@@ -0,0 +1,189 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+import numpy as np
+import pandas as pd
+
+from data_source import PriceCache, is_stale
+
+class ReturnsStore:
+    """
+    여러 종목의 수정 종가(Adj Close) 일 별 수익률을 디스크의 memory-mapped 배열 (days x tickers)로 보관.
+    모든 종목의 거래일을 합친 날짜 index를 사용하며, 종목에 데이터가 없는 날짜는 NaN으로 채우므로 각 종목은 자신의 전체 기간을 유지함.
+    배열은 열 우선(Fortran order)으로 저장되어 block_size개 종목 단위의 열 block이 디스크에서 연속되므로,
+    block 단위로 읽으면 종목 수와 관계없이 메모리 사용량이 (날짜 수 x block_size)로 제한됨
+
+    Args:
+        path (str): 저장된 디렉토리
+        mode (str): memory-map 모드 ("r": 읽기 전용, "r+": 수정 가능)
+    """
+    def __init__(self, path: str, mode: str = "r"):
+        self.path = path
+
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.tickers = meta["tickers"]
+        self.block_size = meta["block_size"]
+        self.source_mtimes = meta["source_mtimes"]
+
+        self.dates = pd.DatetimeIndex(np.load(os.path.join(path, "dates.npy")))
+        self.ranges = np.load(os.path.join(path, "ranges.npy")) # 종목 별 [첫 번째, 마지막 + 1) 날짜 위치 (tickers x 2)
+        self.returns = np.load(os.path.join(path, "returns.npy"), mmap_mode=mode)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.returns.shape
+
+    @property
+    def num_blocks(self) -> int:
+        return -(-len(self.tickers) // self.block_size)
+
+    def block(self, i: int) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """
+        i번째 열 block의 (종목 번호, 수익률 (days x block_size), 유효 구간 (block_size x 2)) 반환. 수익률은 메모리로 복사됨
+
+        Args:
+            i (int): block 위치
+        """
+        columns = slice(i * self.block_size, (i + 1) * self.block_size)
+
+        return self.tickers[columns], np.array(self.returns[:, columns]), self.ranges[columns]
+
+    def blocks(self) -> Iterator[tuple[list[str], np.ndarray, np.ndarray]]:
+        """
+        모든 열 block을 순서대로 하나씩 반환 (한 번에 하나의 block만 메모리에 올림)
+        """
+        for i in range(self.num_blocks):
+            yield self.block(i)
+
+    def column(self, ticker: str) -> pd.Series:
+        """
+        종목의 유효 구간 수익률 반환 (구간 안에서 거래되지 않은 날짜는 제외)
+
+        Args:
+            ticker (str): 종목 번호
+        """
+        col = self.tickers.index(ticker)
+        start, end = self.ranges[col]
+        returns = pd.Series(np.array(self.returns[start:end, col]), index=self.dates[start:end], name=ticker)
+
+        return returns.dropna()
+
+    def is_current(self, tickers: list[str], price_cache: PriceCache) -> bool:
+        """
+        같은 종목들로 만들어졌고, 이후 가격 캐시가 갱신되지 않았는지 확인.
+        마지막 날짜가 오래됐으면 가격 캐시를 먼저 갱신한 뒤 비교하므로, 휴일 등으로 새로운 거래일이 없으면 캐시가 바뀌지 않아 store를 그대로 사용
+
+        Args:
+            tickers (list[str]): 종목 번호
+            price_cache (PriceCache): 가격 데이터를 불러올 캐시
+        """
+        if list(tickers) != self.tickers:
+            return False
+        if price_cache.refresh and len(self.dates) > 0 and is_stale(self.dates[-1]):
+            with ThreadPoolExecutor(max_workers=max(1, price_cache.max_workers)) as executor:
+                list(executor.map(lambda ticker: _load_dates(price_cache, ticker), self.tickers))
+
+        return all(_cache_mtime(price_cache, ticker) <= mtime for ticker, mtime in zip(self.tickers, self.source_mtimes))
+
+    @classmethod
+    def build(cls, path: str, tickers: list[str], price_cache: PriceCache, block_size: int = 256) -> "ReturnsStore":
+        """
+        가격 캐시에서 block_size개 종목씩 불러와 memory-mapped 수익률 배열을 생성.
+        첫 번째 단계에서는 (필요하면 가격 데이터를 내려받으며) 모든 종목의 거래일을 합치고,
+        두 번째 단계에서는 디스크 캐시에서 다시 읽어 block 단위로 수익률을 기록하므로 한 번에 block_size개 종목만 메모리에 올림
+
+        Args:
+            path (str): 저장할 디렉토리
+            tickers (list[str]): 종목 번호
+            price_cache (PriceCache): 가격 데이터를 불러올 캐시
+            block_size (int): 한 번에 불러오고 계산할 종목 개수
+        """
+        assert block_size > 0, "block_size는 0보다 커야 합니다."
+        assert len(tickers) == len(set(tickers)), "각 종목은 한 번씩만 주어져야 합니다."
+
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        blocks = [tickers[i:i + block_size] for i in range(0, len(tickers), block_size)]
+
+        dates = np.empty(0, dtype='datetime64[ns]')
+        with ThreadPoolExecutor(max_workers=max(1, price_cache.max_workers)) as executor:
+            for block in blocks:
+                for index in executor.map(lambda ticker: _load_dates(price_cache, ticker), block):
+                    dates = np.union1d(dates, index[1:]) # 첫 날은 수익률이 없음
+
+        returns = np.lib.format.open_memmap(os.path.join(path, "returns.npy"), mode="w+", dtype=np.float64,
+                                            shape=(len(dates), len(tickers)), fortran_order=True)
+        ranges = np.zeros((len(tickers), 2), dtype=np.int64)
+        source_mtimes = []
+
+        for i, block in enumerate(blocks):
+            values = np.full((len(dates), len(block)), np.nan)
+
+            for col, ticker in enumerate(block):
+                df = price_cache.read(ticker)
+                source_mtimes.append(_cache_mtime(price_cache, ticker))
+
+                if df is None or len(df) < 2:
+                    continue
+
+                prices = np.asarray(df['Adj Close'], dtype=float).reshape(len(df), -1)[:, 0]
+                valid = ~np.isnan(prices)
+                prices, index = prices[valid], df.index[valid]
+
+                positions = np.searchsorted(dates, index[1:].to_numpy(dtype='datetime64[ns]'))
+                values[positions, col] = prices[1:] / prices[:-1] - 1
+                if len(positions) > 0:
+                    ranges[i * block_size + col] = positions[0], positions[-1] + 1
+
+            returns[:, i * block_size:i * block_size + len(block)] = values
+
+        returns.flush()
+        del returns
+
+        np.save(os.path.join(path, "dates.npy"), dates)
+        np.save(os.path.join(path, "ranges.npy"), ranges)
+
+        # meta.json을 마지막에 저장하므로, 중간에 실패하면 다음 실행에서 다시 생성
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"tickers": list(tickers), "block_size": block_size, "source_mtimes": source_mtimes}, f)
+
+        return cls(path)
+
+    @classmethod
+    def open_or_build(cls, path: str, tickers: list[str], price_cache: PriceCache, block_size: int = 256, rebuild: bool = False) -> "ReturnsStore":
+        """
+        path에 최신 store가 있으면 그대로 열고, 없거나 오래됐으면 새로 생성
+
+        Args:
+            path (str): 저장된 (저장할) 디렉토리
+            tickers (list[str]): 종목 번호
+            price_cache (PriceCache): 가격 데이터를 불러올 캐시
+            block_size (int): 한 번에 불러오고 계산할 종목 개수
+            rebuild (bool): 최신이어도 새로 생성할지 여부
+        """
+        if not rebuild and os.path.exists(os.path.join(path, "meta.json")):
+            store = cls(path)
+            if store.block_size == block_size and store.is_current(tickers, price_cache):
+                return store
+
+            del store # 기존 memory-map을 닫은 뒤 덮어씀
+            os.remove(os.path.join(path, "meta.json"))
+
+        return cls.build(path, tickers, price_cache, block_size)
+
+def _load_dates(price_cache: PriceCache, ticker: str) -> np.ndarray:
+    # 상장 폐지 등으로 불러올 수 없는 종목은 전체 screening을 멈추지 않고 데이터가 없는 종목으로 처리
+    try:
+        return price_cache.load(ticker).index.to_numpy(dtype='datetime64[ns]')
+    except Exception as e:
+        print(f"{ticker}의 가격 데이터를 불러오지 못했습니다: {e}")
+        return np.empty(0, dtype='datetime64[ns]')
+
+def _cache_mtime(price_cache: PriceCache, ticker: str) -> float:
+    path = price_cache.path(ticker)
+
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
@@ -0,0 +1,348 @@
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import tempfile
+import traceback
+import urllib.parse
+from collections import OrderedDict
+from contextlib import redirect_stderr
+from concurrent.futures import ProcessPoolExecutor
+
+from main import build_parser, build_price_cache, build_result_cache, run_analysis
+from commands import AVAIL_ANALYSIS, get_runner
+from batch import job_to_argv
+
+# 요청마다 바꿀 수 없는 (서버 실행 시에만 정할 수 있는) arguments
+# (workers, chunk_size: 요청마다 worker process 안에서 다시 process pool을 만들지 않도록 고정)
+SERVER_OPTIONS = {"save_path", "cache_dir", "offline_dir", "no_refresh", "fetch_workers", "retries", "rate_limit",
+                  "metrics_dir", "result_cache_dir", "profile", "export", "no_plot", "workers", "chunk_size"}
+
+RESPONSE_FORMATS = {"json": "application/json", "png": "image/png"}
+
+# 잘못된 요청 (날짜 형식, 없는 종목, 데이터보다 긴 기간 등)으로 분석 중에 발생하는 예외와 응답 메시지. 500 대신 400으로 응답.
+# numpy/pandas의 내부 메시지는 노출하지 않고, 분석 코드에서 사용자에게 보여주기 위해 작성한 메시지 (assert, PriceDataError)만 그대로 사용
+BAD_REQUEST_ERRORS = (AssertionError, ValueError, KeyError, FileNotFoundError)
+BAD_REQUEST_MESSAGES = [
+    (FileNotFoundError, "요청한 종목의 가격 데이터 파일이 없습니다."),
+    (KeyError, "요청한 종목 혹은 날짜에 해당하는 데이터가 없습니다."),
+    (ValueError, "요청한 값으로 분석할 수 없습니다. 종목, 날짜, 기간 등을 확인해주세요."),
+]
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+# worker process에 유지되는 (세대, AnalysisContext). 가격 데이터와 수익률 panel, 포트폴리오 지표를 요청 간에 메모리에 보관
+_WORKER_CONTEXT = None
+
+class RequestError(Exception):
+    """
+    HTTP 상태 코드와 함께 요청을 거절할 때 사용하는 예외
+
+    Args:
+        status (int): HTTP 상태 코드
+        message (str): 응답에 포함할 메시지
+    """
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def bad_request_message(error: Exception) -> str:
+    """
+    잘못된 요청으로 발생한 예외를 응답에 포함할 짧은 메시지로 변환
+
+    Args:
+        error (Exception): BAD_REQUEST_ERRORS 중 하나의 예외
+    """
+    from data_source import PriceDataError # 서버 process에서는 pandas를 불러오지 않도록 필요할 때만 불러옴
+
+    if isinstance(error, (AssertionError, PriceDataError)):
+        return str(error)
+
+    return next(message for error_type, message in BAD_REQUEST_MESSAGES if isinstance(error, error_type))
+
+def _init_worker():
+    # 첫 요청이 module을 불러오는 시간을 기다리지 않도록 모든 분석 module과 matplotlib을 미리 불러옴
+    for analysis in AVAIL_ANALYSIS:
+        get_runner(analysis)
+    import plotting # noqa: F401
+
+def _run_request(args: argparse.Namespace, response_format: str, generation: int) -> bytes:
+    """
+    worker process에서 분석을 수행하고 응답 본문 반환. 결과는 요청마다 임시 디렉토리에 저장한 뒤 읽어서 삭제
+
+    Args:
+        args (argparse.Namespace): 분석 arguments
+        response_format (str): "json" (그래프에 사용된 값) 혹은 "png" (이미지)
+        generation (int): 서버의 데이터 세대 (/reload 이후 요청이면 context를 새로 생성)
+    """
+    global _WORKER_CONTEXT
+
+    from context import AnalysisContext
+
+    if _WORKER_CONTEXT is None or _WORKER_CONTEXT[0] != generation:
+        if _WORKER_CONTEXT is not None:
+            _WORKER_CONTEXT[1].result_cache.close()
+        _WORKER_CONTEXT = generation, AnalysisContext(build_price_cache(args), args.metrics_dir, build_result_cache(args))
+
+    with tempfile.TemporaryDirectory() as save_dir:
+        args.workers = 1 # 이미 worker process 안이므로 분석에서 다시 process pool을 만들지 않음
+        args.save_path = save_dir
+        args.export = "csv" if response_format == "json" else None
+        args.no_plot = response_format == "json"
+
+        file_path = run_analysis(args, _WORKER_CONTEXT[1])
+
+        if response_format == "png":
+            with open(f"{file_path}.png", "rb") as f:
+                return f.read()
+
+        import pandas as pd
+
+        points = pd.read_csv(f"{file_path}.csv", index_col=0)
+        name = json.dumps(os.path.basename(os.path.normpath(file_path)))
+
+        return f'{{"analysis": "{args.analysis}", "name": {name}, "points": {points.to_json(orient="split")}}}'.encode("utf-8")
+
+def request_key(args: argparse.Namespace, response_format: str, generation: int) -> str:
+    """
+    같은 결과를 내는 요청을 하나로 묶기 위한 key (arguments 순서나 생략된 기본값과 관계없이 같은 요청이면 같은 key)
+
+    Args:
+        args (argparse.Namespace): 분석 arguments
+        response_format (str): 응답 형식
+        generation (int): 서버의 데이터 세대
+    """
+    options = {key: value for key, value in sorted(vars(args).items()) if key not in SERVER_OPTIONS}
+    payload = json.dumps({"options": options, "format": response_format, "generation": generation}, sort_keys=True, default=str)
+
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+class AnalysisServer:
+    """
+    분석을 HTTP/JSON API로 제공하는 asyncio 서버.
+    - worker process pool (pool_size개)이 각자 AnalysisContext를 유지하여 가격 데이터, 수익률 panel, 포트폴리오 지표를 요청 간에 재사용
+    - 동시에 들어온 같은 요청은 한 번만 계산하여 결과를 나눠 가짐 (request coalescing)
+    - 계산이 끝난 응답은 max_responses개까지 LRU로 보관하여 같은 요청에는 계산 없이 응답
+    - 계산 중인 요청이 max_pending개 이상이면 새로운 요청은 503으로 거절
+
+    Args:
+        base_argv (list[str]): 모든 요청에 공통으로 적용할 main.py arguments (e.g. ["--cache_dir", "./cache"])
+        pool_size (int): 분석을 수행할 worker process 개수
+        max_pending (int): 동시에 계산할 수 있는 최대 요청 개수
+        max_responses (int): 메모리에 보관할 최대 응답 개수
+    """
+    def __init__(self, base_argv: list[str] = None, pool_size: int = 2, max_pending: int = 64, max_responses: int = 1024):
+        assert pool_size > 0, "pool_size는 0보다 커야 합니다."
+        assert max_pending > 0, "max_pending은 0보다 커야 합니다."
+
+        self.base_argv = list(base_argv or [])
+        self.max_pending = max_pending
+        self.max_responses = max_responses
+        self.generation = 0
+
+        self._pool = ProcessPoolExecutor(max_workers=pool_size, initializer=_init_worker)
+        self._inflight = {}
+        self._responses = OrderedDict()
+
+    def parse_request(self, analysis: str, job: dict) -> argparse.Namespace:
+        """
+        요청의 arguments를 main.py와 같은 parser로 검증하여 반환
+
+        Args:
+            analysis (str): 분석 방법
+            job (dict): 요청 arguments (e.g. {"tickers": "QQQ5IEF5", "start_year": 2012})
+        """
+        fixed = sorted(SERVER_OPTIONS & set(job))
+        if fixed:
+            raise RequestError(400, f"{', '.join(fixed)}은 서버 실행 시에만 설정할 수 있습니다.")
+        tickers = job.get("tickers", [])
+        if any(str(ticker).startswith("@") for ticker in (tickers if isinstance(tickers, list) else str(tickers).split())):
+            raise RequestError(400, "요청에서는 종목 목록 파일(@)을 사용할 수 없습니다.")
+
+        stderr = io.StringIO()
+        try:
+            with redirect_stderr(stderr):
+                return build_parser().parse_args(self.base_argv + job_to_argv({**job, "analysis": analysis}))
+        except SystemExit:
+            raise RequestError(400, stderr.getvalue().strip().splitlines()[-1])
+
+    async def analysis_response(self, args: argparse.Namespace, response_format: str) -> bytes:
+        """
+        분석 결과 반환. 보관된 응답이 있으면 그대로 반환하고, 같은 요청이 계산 중이면 그 결과를 기다림
+
+        Args:
+            args (argparse.Namespace): 분석 arguments
+            response_format (str): 응답 형식
+        """
+        generation = self.generation
+        key = request_key(args, response_format, generation)
+
+        if key in self._responses:
+            self._responses.move_to_end(key)
+            return self._responses[key]
+
+        if key not in self._inflight:
+            if len(self._inflight) >= self.max_pending:
+                raise RequestError(503, "계산 중인 요청이 너무 많습니다. 잠시 후 다시 시도해주세요.")
+
+            future = asyncio.get_running_loop().run_in_executor(self._pool, _run_request, args, response_format, generation)
+            future.add_done_callback(lambda done: self._finish(key, done, generation))
+            self._inflight[key] = future
+
+        # 기다리던 요청 하나가 연결을 끊어도 같은 요청을 기다리는 다른 요청의 계산은 취소되지 않도록 함
+        return await asyncio.shield(self._inflight[key])
+
+    def _finish(self, key: str, future: asyncio.Future, generation: int):
+        self._inflight.pop(key, None)
+
+        if future.cancelled() or future.exception() is not None or generation != self.generation:
+            return
+
+        self._responses[key] = future.result()
+        while len(self._responses) > self.max_responses:
+            self._responses.popitem(last=False)
+
+    def reload(self):
+        """
+        보관된 응답을 비우고 세대를 올려, 이후 요청부터는 worker가 가격 데이터를 새로 불러오도록 함
+        """
+        self.generation += 1
+        self._responses.clear()
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> tuple[int, str, bytes]:
+        """
+        요청 경로에 맞는 (상태 코드, content type, 본문) 반환
+        - GET /health: 서버 상태
+        - POST /reload: 가격 데이터와 보관된 응답을 새로 불러오도록 함
+        - GET /{analysis}?tickers=...&format=json|png: query string을 arguments로 사용 (flag는 true)
+        - POST /{analysis}: JSON 본문을 arguments로 사용 (batch.py의 작업과 같은 형식)
+
+        Args:
+            method (str): HTTP method
+            target (str): 요청 경로와 query string
+            body (bytes): 요청 본문
+        """
+        url = urllib.parse.urlsplit(target)
+        path = url.path.strip("/")
+
+        if path in ("", "health"):
+            status = {"status": "ok", "analyses": AVAIL_ANALYSIS, "generation": self.generation,
+                      "pending": len(self._inflight), "cached_responses": len(self._responses)}
+            return 200, RESPONSE_FORMATS["json"], json.dumps(status).encode("utf-8")
+
+        if path == "reload":
+            if method != "POST":
+                raise RequestError(405, "/reload는 POST로 요청해야 합니다.")
+            self.reload()
+            return 200, RESPONSE_FORMATS["json"], json.dumps({"generation": self.generation}).encode("utf-8")
+
+        if path not in AVAIL_ANALYSIS:
+            raise RequestError(404, f"{path}은 가능한 분석 목록에 없습니다.")
+
+        if method == "GET":
+            job = {key: {"true": True, "false": False}.get(values[-1].lower(), values[-1])
+                   for key, values in urllib.parse.parse_qs(url.query, keep_blank_values=True).items()}
+        elif method == "POST":
+            try:
+                job = json.loads(body or b"{}")
+            except json.JSONDecodeError as e:
+                raise RequestError(400, f"요청 본문이 올바른 JSON이 아닙니다: {e}")
+            if not isinstance(job, dict):
+                raise RequestError(400, "요청 본문은 JSON object여야 합니다.")
+        else:
+            raise RequestError(405, f"{method}은 지원하지 않는 method입니다.")
+
+        response_format = job.pop("format", "json")
+        if response_format not in RESPONSE_FORMATS:
+            raise RequestError(400, f"format은 {', '.join(RESPONSE_FORMATS)} 중 하나여야 합니다.")
+
+        args = self.parse_request(path, job)
+
+        try:
+            body = await self.analysis_response(args, response_format)
+        except BAD_REQUEST_ERRORS as e:
+            print(f"{type(e).__name__}: {e}")
+            raise RequestError(400, bad_request_message(e))
+
+        return 200, RESPONSE_FORMATS[response_format], body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        하나의 연결에서 HTTP/1.1 요청들을 순서대로 처리 (keep-alive 지원)
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+
+                method, target, version = request_line.decode("latin-1").split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                start = time.perf_counter()
+                try:
+                    status, content_type, payload = await self.dispatch(method, target, body)
+                except RequestError as e:
+                    status, content_type, payload = e.status, RESPONSE_FORMATS["json"], json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8")
+                except Exception:
+                    # 내부 정보가 응답에 노출되지 않도록 자세한 내용은 서버 로그에만 남김
+                    traceback.print_exc()
+                    status, content_type, payload = 500, RESPONSE_FORMATS["json"], json.dumps({"error": "서버 내부 오류가 발생했습니다."}, ensure_ascii=False).encode("utf-8")
+                print(f"{method} {target} {status} {(time.perf_counter() - start) * 1000:.1f}ms")
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass # 연결이 끊기거나 잘못된 형식의 요청이면 연결을 닫음
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving {', '.join(AVAIL_ANALYSIS)} on http://{host}:{port}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve ETF analyses as an HTTP/JSON API",
+                                     epilog="Other arguments (e.g. --cache_dir, --offline_dir, --result_cache_dir) are passed to main.py for every request")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--pool_size", type=int, default=2, help="Number of worker processes running analyses (default: 2)")
+    parser.add_argument("--max_pending", type=int, default=64, help="Maximum number of requests computed at once (default: 64)")
+    parser.add_argument("--max_responses", type=int, default=1024, help="Maximum number of responses kept in memory (default: 1024)")
+
+    args, base_argv = parser.parse_known_args()
+    server = AnalysisServer(base_argv, args.pool_size, args.max_pending, args.max_responses)
+
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,286 @@
+import numpy as np
+import pandas as pd
+
+from options import REBALANCE_FREQUENCIES, CONTRIBUTION_FREQUENCIES
+
+def period_starts(dates: pd.DatetimeIndex, frequency: str) -> np.ndarray:
+    """
+    각 기간(월/분기/연)이 시작되는 첫 거래일의 위치 반환 (첫 번째 날짜는 제외)
+
+    Args:
+        dates (pd.DatetimeIndex): 거래일 (오름차순)
+        frequency (str): "daily", "monthly", "quarterly", "yearly" 혹은 "none"
+    """
+    assert frequency in REBALANCE_FREQUENCIES, f"frequency는 {', '.join(REBALANCE_FREQUENCIES)} 중 하나여야 합니다."
+
+    if frequency == "none":
+        return np.empty(0, dtype=np.int64)
+    if frequency == "daily":
+        return np.arange(1, len(dates))
+
+    years, months = dates.year.to_numpy(), dates.month.to_numpy()
+    periods = {
+        "monthly": years * 12 + months,
+        "quarterly": years * 4 + (months - 1) // 3,
+        "yearly": years,
+    }[frequency]
+
+    return np.flatnonzero(periods[1:] != periods[:-1]) + 1
+
+def _log_prices(asset_returns: np.ndarray) -> np.ndarray:
+    # log_prices[i] = 0 ~ i-1번째 날까지의 누적 로그 수익률 => [a, b) 구간의 성장률 = exp(log_prices[b] - log_prices[a])
+    return np.concatenate((np.zeros((1,) + asset_returns.shape[1:]), np.cumsum(np.log1p(asset_returns), axis=0)))
+
+def rebalanced_returns(asset_returns: np.ndarray, weights: np.ndarray, dates: pd.DatetimeIndex, rebalance: str = "monthly",
+                       drift_band: float = None) -> np.ndarray:
+    """
+    첫 날 투자 비율대로 투자한 뒤 rebalance 주기마다 투자 비율을 되돌렸을 때의 포트폴리오 일 별 수익률 (days x portfolios) 반환.
+    rebalance 시점 사이에는 종목 별로 가격이 움직이므로, 기간마다 (기간 일 수 x 종목) @ (종목 x 포트폴리오) 한 번으로 계산
+
+    Args:
+        asset_returns (np.ndarray): 종목 별 일 별 수익률 (days x assets)
+        weights (np.ndarray): 투자 비율 (assets x portfolios)
+        dates (pd.DatetimeIndex): 거래일
+        rebalance (str): rebalance 주기 ("daily", "monthly", "quarterly", "yearly", "none")
+        drift_band (float): 어떤 종목의 비율이든 목표 비율에서 이 값 이상 벗어났을 때만 rebalance (default: 항상 rebalance)
+    """
+    # drift_band는 날짜마다 반복해야 하므로 매일 rebalance와 함께 쓸 수 없음 (사용자 입력은 main.AnalysisArgumentParser에서 확인)
+    assert rebalance != "daily" or drift_band is None, "매일 rebalance할 때는 drift_band를 사용할 수 없습니다."
+
+    weights = np.asarray(weights, dtype=float).reshape(asset_returns.shape[1], -1)
+
+    # 매일 rebalance하면 일 별 수익률의 가중 합과 같음
+    if rebalance == "daily":
+        return asset_returns @ weights
+
+    log_prices = _log_prices(asset_returns)
+    bounds = np.concatenate(([0], period_starts(dates, rebalance), [len(asset_returns)]))
+
+    values = np.empty((len(asset_returns), weights.shape[1]))
+    holdings = weights.copy()
+
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if start > 0:
+            holdings = _rebalance(holdings, weights, drift_band)
+
+        growth = np.exp(log_prices[start + 1:end + 1] - log_prices[start]) # (기간 일 수 x 종목)
+        values[start:end] = growth @ holdings
+        holdings = holdings * growth[-1][:, None]
+
+    previous_values = np.concatenate((np.ones((1, weights.shape[1])), values[:-1]))
+
+    return values / previous_values - 1
+
+def _rebalance(holdings: np.ndarray, weights: np.ndarray, drift_band: float = None) -> np.ndarray:
+    """
+    보유 금액 (assets x ...)을 목표 비율로 되돌림. drift_band가 주어지면 비율이 drift_band 이상 벗어난 포트폴리오만 되돌림
+    """
+    values = holdings.sum(axis=0)
+
+    if drift_band is None:
+        return weights * values
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drift = np.abs(holdings / values - weights).max(axis=0)
+
+    return np.where(drift >= drift_band, weights * values, holdings)
+
+def simulate_windows(asset_returns: np.ndarray, weights: np.ndarray, dates: pd.DatetimeIndex, start_idx: np.ndarray, end_idx: np.ndarray,
+                     rebalance: str = "monthly", drift_band: float = None, contribution: str = "none", invest_year: float = None) -> np.ndarray:
+    """
+    여러 투자 구간 [start, end]과 여러 포트폴리오에 대해, 주기적 rebalance와 정기 적립을 반영한 연 평균 수익률(소수점)을 한 번에 계산.
+    drift_band가 없으면 rebalance 사이 기간의 누적합으로 계산하므로 비용은 (날짜 + 구간 + 적립 시점) x 종목 x 포트폴리오에 비례하고,
+    drift_band가 있으면 rebalance 여부가 경로에 따라 달라지므로 사건(구간 시작/종료, rebalance, 적립) 시점마다 모든 구간을 갱신함
+    (--all_windows처럼 매일 시작하는 구간이 있으면 사건이 매일 생기므로 날짜 x 구간 x 포트폴리오에 비례).
+    적립이 없으면 (최종 금액) ^ (1 / 투자 연수) - 1, 적립이 있으면 금액 가중 수익률(IRR)을 반환
+
+    Args:
+        asset_returns (np.ndarray): 종목 별 일 별 수익률 (days x assets)
+        weights (np.ndarray): 투자 비율 (assets x portfolios)
+        dates (pd.DatetimeIndex): 거래일
+        start_idx (np.ndarray): 투자 구간의 시작 위치 (windows,)
+        end_idx (np.ndarray): 투자 구간의 마지막 위치 (windows,)
+        rebalance (str): rebalance 주기 ("daily", "monthly", "quarterly", "yearly", "none")
+        drift_band (float): 어떤 종목의 비율이든 목표 비율에서 이 값 이상 벗어났을 때만 rebalance (default: 항상 rebalance)
+        contribution (str): 같은 금액을 추가로 투자할 주기 ("none", "monthly", "quarterly", "yearly")
+        invest_year (float): 적립이 없을 때 연 환산에 사용할 투자 연수 (default: 구간의 실제 날짜 차이)
+    """
+    assert contribution in CONTRIBUTION_FREQUENCIES, f"contribution은 {', '.join(CONTRIBUTION_FREQUENCIES)} 중 하나여야 합니다."
+    # 사용자 입력은 main.AnalysisArgumentParser에서 확인
+    assert rebalance != "daily" or drift_band is None, "매일 rebalance할 때는 drift_band를 사용할 수 없습니다."
+
+    weights = np.asarray(weights, dtype=float).reshape(asset_returns.shape[1], -1)
+    start_idx, end_idx = np.asarray(start_idx), np.asarray(end_idx)
+
+    if rebalance == "daily":
+        # 매일 rebalance하면 포트폴리오 자체를 하나의 종목처럼 다룰 수 있으므로, 날짜 단위 rebalance 없이 (1 x portfolios)로 계산
+        log_prices = _log_prices(asset_returns @ weights)[:, None, :]
+        weights = np.ones((1, weights.shape[1]))
+        rebalance_points = np.empty(0, dtype=np.int64)
+    else:
+        log_prices = _log_prices(asset_returns)[:, :, None]
+        rebalance_points = period_starts(dates, rebalance)
+
+    contribution_points = period_starts(dates, contribution) if contribution != "none" else np.empty(0, dtype=np.int64)
+
+    # 각 적립 시점에 적립하는 구간 (contributions x windows). 구간 시작일 다음 날부터 마지막 날까지 적립
+    contributing = (contribution_points[:, None] > start_idx) & (contribution_points[:, None] <= end_idx)
+    contribution_points, contributing = contribution_points[contributing.any(axis=1)], contributing[contributing.any(axis=1)]
+
+    if drift_band is None:
+        final_values = _linear_values(log_prices, weights, rebalance_points, contribution_points, start_idx, end_idx)
+    else:
+        final_values = _event_values(log_prices, weights, rebalance_points, contribution_points, start_idx, end_idx, drift_band)
+
+    invest_years = (dates[end_idx] - dates[start_idx]).days.to_numpy() / 365.25
+
+    if len(contribution_points) == 0:
+        years = invest_year if invest_year is not None else invest_years[:, None]
+        return final_values ** (1 / years) - 1
+
+    # 적립 시점과 금액 (flows x windows). 첫 번째 투자는 구간 시작 시점
+    contribution_years = (dates[end_idx].to_numpy() - dates[contribution_points].to_numpy()[:, None]) / np.timedelta64(1, 'D') / 365.25
+    flow_years = np.vstack((invest_years, np.where(contributing, contribution_years, 0.0)))
+    flow_amounts = np.vstack((np.ones(len(start_idx)), contributing.astype(float)))
+
+    return money_weighted_return(flow_amounts, flow_years, final_values)
+
+def _hold_values(log_prices: np.ndarray, weights: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    starts 시점에 1을 목표 비율로 투자한 뒤 rebalance 없이 ends 시점까지 보유했을 때의 금액 (n x portfolios)
+    """
+    return (np.exp(log_prices[ends] - log_prices[starts]) * weights).sum(axis=1)
+
+def _linear_values(log_prices: np.ndarray, weights: np.ndarray, rebalance_points: np.ndarray, contribution_points: np.ndarray,
+                   start_idx: np.ndarray, end_idx: np.ndarray) -> np.ndarray:
+    """
+    항상 목표 비율로 rebalance할 때 각 구간의 최종 금액 (windows x portfolios).
+    보유 금액은 rebalance와 적립에 대해 선형이므로, 최종 금액 = Σ 투자 금액 x (투자 시점 -> 다음 rebalance) x (rebalance 사이 기간들) x (마지막 rebalance -> 종료)이고,
+    rebalance 사이 기간의 로그 성장률과 적립 시점의 값을 누적합으로 미리 계산해 구간 마다 상수 번의 연산으로 계산
+    """
+    ends = end_idx + 1
+    points = rebalance_points
+    num_points = len(points)
+
+    # segment_growth[k] = points[0] -> points[k]까지 rebalance하며 보유했을 때의 로그 성장률 (points x portfolios)
+    segment_growth = np.log(_hold_values(log_prices, weights, points[:-1], points[1:])) if num_points > 1 else np.empty((0, weights.shape[1]))
+    segment_growth = np.vstack((np.zeros((1, weights.shape[1])), np.cumsum(segment_growth, axis=0)))
+
+    # 각 구간의 시작 이후 첫 rebalance와 종료 전 마지막 rebalance 위치
+    first = np.searchsorted(points, start_idx, side='right')
+    last = np.searchsorted(points, ends, side='left') - 1
+    rebalanced = first <= last
+
+    final_values = _hold_values(log_prices, weights, start_idx, ends)
+
+    if rebalanced.any():
+        # 마지막 rebalance 시점부터 종료 시점까지 보유한 금액
+        tail = _hold_values(log_prices, weights, points[last[rebalanced]], ends[rebalanced]) * np.exp(segment_growth[last[rebalanced]])
+        head = _hold_values(log_prices, weights, start_idx[rebalanced], points[first[rebalanced]]) * np.exp(-segment_growth[first[rebalanced]])
+        final_values[rebalanced] = head * tail
+
+    if len(contribution_points) == 0:
+        return final_values
+
+    # 마지막 rebalance 이전의 적립: 적립 시점 -> 다음 rebalance 금액을 누적합으로 더한 뒤 한 번에 마지막 rebalance 이후까지 성장
+    following = np.searchsorted(points, contribution_points, side='right')
+    has_next = following < num_points
+    before = np.zeros((len(contribution_points), weights.shape[1]))
+    before[has_next] = (_hold_values(log_prices, weights, contribution_points[has_next], points[following[has_next]])
+                        * np.exp(-segment_growth[following[has_next]]))
+    before = np.vstack((np.zeros((1, weights.shape[1])), np.cumsum(before, axis=0)))
+
+    # 마지막 rebalance 이후의 적립: rebalance 없이 보유하므로 종목 별 exp(-log_prices)의 누적합으로 계산
+    after = np.exp(-log_prices[contribution_points])
+    after = np.concatenate((np.zeros((1,) + after.shape[1:]), np.cumsum(after, axis=0)))
+
+    # 이 시점 이후의 적립은 종료 전에 다시 rebalance되지 않음
+    boundary = start_idx.copy()
+    boundary[rebalanced] = points[last[rebalanced]]
+    first_contribution = np.searchsorted(contribution_points, start_idx, side='right')
+    boundary_contribution = np.maximum(np.searchsorted(contribution_points, boundary, side='left'), first_contribution)
+    last_contribution = np.searchsorted(contribution_points, ends, side='left')
+
+    final_values += ((after[last_contribution] - after[boundary_contribution]) * np.exp(log_prices[ends]) * weights).sum(axis=1)
+
+    if rebalanced.any():
+        final_values[rebalanced] += (before[boundary_contribution[rebalanced]] - before[first_contribution[rebalanced]]) * tail
+
+    return final_values
+
+def _event_values(log_prices: np.ndarray, weights: np.ndarray, rebalance_points: np.ndarray, contribution_points: np.ndarray,
+                  start_idx: np.ndarray, end_idx: np.ndarray, drift_band: float) -> np.ndarray:
+    """
+    drift_band를 넘은 포트폴리오만 rebalance할 때 각 구간의 최종 금액 (windows x portfolios).
+    날짜가 아닌 사건 시점 단위로 반복하며, 각 시점에서는 모든 (구간 x 포트폴리오)를 배열 연산으로 처리
+    """
+    num_days = len(log_prices) - 1
+
+    # 보유 금액 (assets x windows x portfolios). 구간 밖에서는 0
+    holdings = np.zeros((weights.shape[0], len(start_idx), weights.shape[1]))
+    final_values = np.zeros((len(start_idx), weights.shape[1]))
+    target = weights[:, None, :]
+
+    is_rebalance = np.isin(np.arange(num_days + 1), rebalance_points)
+    is_contribution = np.isin(np.arange(num_days + 1), contribution_points)
+
+    events = np.unique(np.concatenate((start_idx, end_idx + 1, rebalance_points, contribution_points, [num_days])))
+    events = events[events <= num_days]
+    previous = events[0]
+
+    for event in events:
+        # 이전 사건 이후 (event - 1번째 날까지) 종목 별 가격 변화 반영
+        holdings *= np.exp(log_prices[event] - log_prices[previous])[:, None, :]
+        previous = event
+
+        ending = end_idx + 1 == event
+        if ending.any():
+            final_values[ending] = holdings[:, ending].sum(axis=0)
+            holdings[:, ending] = 0.0
+
+        if event == num_days:
+            break
+
+        active = (start_idx < event) & (end_idx >= event)
+
+        if is_rebalance[event] and active.any():
+            holdings[:, active] = _rebalance(holdings[:, active], target, drift_band)
+
+        starting = start_idx == event
+        holdings[:, starting] = target
+
+        if is_contribution[event] and active.any():
+            holdings[:, active] += target
+
+    return final_values
+
+def money_weighted_return(flow_amounts: np.ndarray, flow_years: np.ndarray, final_values: np.ndarray, iterations: int = 50) -> np.ndarray:
+    """
+    투자 금액과 시점이 주어졌을 때, Σ 금액 x (1 + r) ^ (종료 시점까지 남은 연수) = 최종 금액을 만족하는 연 수익률 r (IRR)을 Newton 방법으로 계산
+
+    Args:
+        flow_amounts (np.ndarray): 투자 금액 (flows x windows)
+        flow_years (np.ndarray): 투자 시점부터 종료 시점까지 남은 연수 (flows x windows)
+        final_values (np.ndarray): 최종 금액 (windows x portfolios)
+        iterations (int): 최대 반복 횟수
+    """
+    amounts = flow_amounts[:, :, None]
+    years = flow_years[:, :, None]
+
+    # 초기값: 총 투자 금액 대비 최종 금액을 평균 투자 기간으로 연 환산
+    invested = amounts.sum(axis=0)
+    mean_years = (amounts * years).sum(axis=0) / invested
+    rate = (final_values / invested) ** (1 / np.maximum(mean_years, 1e-9)) - 1
+
+    for _ in range(iterations):
+        growth = (1 + rate) ** years
+        value = (amounts * growth).sum(axis=0) - final_values
+        slope = (amounts * years * growth).sum(axis=0) / (1 + rate)
+
+        step = value / slope
+        rate = np.maximum(rate - step, -0.99)
+
+        if np.all(np.abs(step) < 1e-10):
+            break
+
+    return rate
@@ -0,0 +1,30 @@
+import numpy as np
+
+from analysis import get_mixed_data, long_term_returns, simulated_long_term_returns
+from data_source import synthetic_price_frame
+from returns_panel import ReturnsPanel
+
+def short_panel() -> ReturnsPanel:
+    # 약 2년의 데이터 => 1년 투자 구간은 약 250개뿐
+    stock_info = [synthetic_price_frame(ticker, 504, rng=np.random.default_rng(i)) for i, ticker in enumerate(["AAA", "BBB"])]
+
+    return ReturnsPanel.from_stock_info(stock_info, ["AAA", "BBB"])
+
+def test_sample_num_larger_than_windows_uses_all_windows(capsys):
+    panel = short_panel()
+    daily_return, _ = get_mixed_data(panel, [0.5, 0.5])
+
+    sampled, = long_term_returns(daily_return, [1], sample_num=100000, seed=0)
+    every, = long_term_returns(daily_return, [1], sample_num=None)
+
+    np.testing.assert_allclose(np.sort(sampled), np.sort(every))
+    assert "모든 구간을 사용합니다" in capsys.readouterr().out
+
+def test_simulation_sample_num_larger_than_windows(capsys):
+    panel = short_panel()
+
+    sampled, = simulated_long_term_returns(panel, [0.5, 0.5], [1], sample_num=100000, seed=0, rebalance="monthly")
+    every, = simulated_long_term_returns(panel, [0.5, 0.5], [1], sample_num=None, rebalance="monthly")
+
+    np.testing.assert_allclose(np.sort(sampled), np.sort(every))
+    assert "모든 구간을 사용합니다" in capsys.readouterr().out
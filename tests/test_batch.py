@@ -0,0 +1,24 @@
+import argparse
+import numpy as np
+
+from batch import build_job_graph
+from context import AnalysisContext
+from data_source import FixtureDataSource, PriceCache, synthetic_price_frame
+
+def test_same_tickers_in_different_order_share_panel(tmp_path):
+    jobs = [argparse.Namespace(analysis="avg_return_volatility", tickers=tickers) for tickers in (["QQQ", "IEF"], ["IEF", "QQQ"])]
+
+    graph = build_job_graph(jobs)
+
+    assert graph[("job", 0)] == graph[("job", 1)]
+    assert len([node for node in graph if node[0] == "panel"]) == 1
+
+    frames = {ticker: synthetic_price_frame(ticker, 300, rng=np.random.default_rng(i)) for i, ticker in enumerate(["QQQ", "IEF"])}
+    context = AnalysisContext(PriceCache(FixtureDataSource(frames=frames), cache_dir=str(tmp_path), refresh=False))
+
+    panel = context.panel(["QQQ", "IEF"])
+    reordered = context.panel(["IEF", "QQQ"])
+
+    assert len(context._panels) == 1
+    assert reordered.tickers == ["IEF", "QQQ"]
+    np.testing.assert_array_equal(reordered.values, panel.values[:, ::-1])
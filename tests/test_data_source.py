@@ -0,0 +1,88 @@
+import sys
+import types
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_source import DataSource, PriceCache, YahooDataSource, synthetic_price_frame
+
+class FlakySource(DataSource):
+    """
+    처음 failures번은 빈 DataFrame을 반환한 뒤 가격 데이터를 반환하는 데이터 소스
+    """
+    def __init__(self, failures: int, empty: pd.DataFrame = None):
+        self.failures = failures
+        self.empty = empty if empty is not None else pd.DataFrame()
+        self.calls = 0
+
+    def fetch(self, ticker: str, start: pd.Timestamp = None) -> pd.DataFrame:
+        self.calls += 1
+        if self.calls <= self.failures:
+            return self.empty
+
+        return synthetic_price_frame(ticker, 300, rng=np.random.default_rng(0))
+
+def test_empty_result_is_retried_and_not_cached(tmp_path):
+    source = FlakySource(failures=2)
+    cache = PriceCache(source, cache_dir=str(tmp_path), retries=3, backoff=0)
+
+    df = cache.load("AAA")
+
+    assert source.calls == 3
+    assert len(df) == 300
+    pd.testing.assert_frame_equal(cache.read("AAA"), df, check_freq=False)
+
+def test_all_nan_result_raises_after_retries(tmp_path):
+    frame = synthetic_price_frame("AAA", 10, rng=np.random.default_rng(0))
+    source = FlakySource(failures=10, empty=frame * np.nan)
+    cache = PriceCache(source, cache_dir=str(tmp_path), retries=2, backoff=0)
+
+    with pytest.raises(ValueError):
+        cache.load("AAA")
+
+    assert source.calls == 3
+    assert cache.read("AAA") is None
+
+def test_yahoo_empty_download_raises(monkeypatch):
+    yfinance = types.ModuleType("yfinance")
+    yfinance.download = lambda *args, **kwargs: pd.DataFrame()
+    monkeypatch.setitem(sys.modules, "yfinance", yfinance)
+
+    with pytest.raises(ValueError):
+        YahooDataSource().fetch("AAA")
+
+class CountingSource(DataSource):
+    """
+    고정된 가격 데이터에서 start 이후의 데이터만 반환하고 호출 횟수를 세는 데이터 소스
+    """
+    def __init__(self, frames: dict[str, pd.DataFrame]):
+        self.frames = frames
+        self.calls = 0
+
+    def fetch(self, ticker: str, start: pd.Timestamp = None) -> pd.DataFrame:
+        self.calls += 1
+        df = self.frames[ticker]
+
+        return df if start is None else df[df.index >= start]
+
+def test_returns_store_is_kept_without_new_bars(tmp_path):
+    from returns_store import ReturnsStore
+
+    # 마지막 날짜가 오래됐지만 데이터 소스에 새로운 거래일이 없는 경우 (휴일, 거래 정지 등)
+    frames = {ticker: synthetic_price_frame(ticker, 300, end="2020-12-31", rng=np.random.default_rng(i))
+              for i, ticker in enumerate(["AAA", "BBB"])}
+    source = CountingSource(frames)
+    cache = PriceCache(source, cache_dir=str(tmp_path / "prices"), backoff=0)
+    store_dir = str(tmp_path / "store")
+
+    ReturnsStore.open_or_build(store_dir, ["AAA", "BBB"], cache, block_size=1)
+    built_at = (tmp_path / "store" / "meta.json").stat().st_mtime_ns
+
+    ReturnsStore.open_or_build(store_dir, ["AAA", "BBB"], cache, block_size=1)
+    assert (tmp_path / "store" / "meta.json").stat().st_mtime_ns == built_at
+    assert source.calls == 4 # 처음 전체 기간 2번 + 갱신 확인 2번
+
+    # 새로운 거래일이 추가되면 다시 생성
+    frames["AAA"] = synthetic_price_frame("AAA", 301, end="2021-01-01", rng=np.random.default_rng(0))
+    store = ReturnsStore.open_or_build(store_dir, ["AAA", "BBB"], cache, block_size=1)
+    assert store.dates[-1] == pd.Timestamp("2021-01-01")
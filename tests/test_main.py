@@ -0,0 +1,13 @@
+import pytest
+
+from main import build_parser
+
+def test_drift_band_requires_periodic_rebalance():
+    parser = build_parser()
+
+    with pytest.raises(SystemExit) as e:
+        parser.parse_args(["--analysis", "long_term_investment", "--tickers", "QQQ5IEF5", "--drift_band", "0.05"])
+    assert e.value.code == 2
+
+    args = parser.parse_args(["--analysis", "long_term_investment", "--tickers", "QQQ5IEF5", "--rebalance", "monthly", "--drift_band", "0.05"])
+    assert args.drift_band == 0.05
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from context import AnalysisContext
+from data_source import FixtureDataSource, PriceCache, synthetic_price_frame
+from metrics_state import IncrementalMetrics
+
+TICKERS = ["AAA", "BBB"]
+
+def price_frames(num_days: int = 1500) -> dict[str, pd.DataFrame]:
+    return {ticker: synthetic_price_frame(ticker, num_days, rng=np.random.default_rng(i)) for i, ticker in enumerate(TICKERS)}
+
+def make_context(tmp_path, frames: dict[str, pd.DataFrame], run: int) -> AnalysisContext:
+    # 실행마다 새로운 가격 캐시를 사용하여 주어진 가격을 그대로 불러옴
+    price_cache = PriceCache(FixtureDataSource(frames=frames), cache_dir=str(tmp_path / f"prices-{run}"), refresh=False)
+
+    return AnalysisContext(price_cache, metrics_dir=str(tmp_path / "metrics"))
+
+def full_state(tmp_path, frames: dict[str, pd.DataFrame]) -> IncrementalMetrics:
+    context = AnalysisContext(PriceCache(FixtureDataSource(frames=frames), cache_dir=str(tmp_path / "prices-full"), refresh=False))
+    state = IncrementalMetrics(TICKERS)
+    state.update(context.panel(TICKERS).to_frame())
+
+    return state
+
+def assert_same_state(state: IncrementalMetrics, expected: IncrementalMetrics):
+    assert state.num_days == expected.num_days
+    np.testing.assert_array_equal(state.dates, expected.dates)
+    np.testing.assert_allclose(state.cumulative_growth, expected.cumulative_growth, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(state.annual_return(), expected.annual_return(), rtol=1e-10)
+    np.testing.assert_allclose(state.annual_volatility(True), expected.annual_volatility(True), rtol=1e-10)
+    np.testing.assert_allclose(state.annual_volatility(False), expected.annual_volatility(False), rtol=1e-10)
+
+def test_incremental_update_matches_full_rebuild(tmp_path):
+    frames = price_frames()
+    first = {ticker: df.iloc[:1000] for ticker, df in frames.items()}
+
+    make_context(tmp_path, first, 0).metrics(TICKERS)
+    state = make_context(tmp_path, frames, 1).metrics(TICKERS)
+
+    assert_same_state(state, full_state(tmp_path, frames))
+
+    # 저장된 상태를 다시 불러와도 같아야 함
+    assert_same_state(IncrementalMetrics.load(str(tmp_path / "metrics" / "AAA-BBB.npz")), state)
+
+def test_rewritten_history_rebuilds_state(tmp_path):
+    frames = price_frames()
+    first = {ticker: df.iloc[:1000] for ticker, df in frames.items()}
+    make_context(tmp_path, first, 0).metrics(TICKERS)
+
+    # 배당 수정처럼 과거의 수정 종가가 일정하지 않은 비율로 다시 쓰임
+    rewritten = {}
+    for ticker, df in frames.items():
+        df = df.copy()
+        df[("Adj Close", ticker)] *= np.linspace(0.8, 1.0, len(df))
+        rewritten[ticker] = df
+
+    state = make_context(tmp_path, rewritten, 1).metrics(TICKERS)
+
+    assert_same_state(state, full_state(tmp_path, rewritten))
+
+def test_stale_series_file_rebuilds_state(tmp_path):
+    frames = price_frames()
+    make_context(tmp_path, frames, 0).metrics(TICKERS)
+
+    # series 파일이 상태 파일보다 짧으면 (저장 중 실패 등) 다시 계산
+    with open(tmp_path / "metrics" / "AAA-BBB.growth.bin", "r+b") as f:
+        f.truncate(16)
+
+    state = make_context(tmp_path, frames, 1).metrics(TICKERS)
+
+    assert_same_state(state, full_state(tmp_path, frames))
@@ -0,0 +1,21 @@
+import numpy as np
+
+from plotting import get_figure, save_figure, scatter_points, frontier_indices
+
+def test_frontier_indices_matches_brute_force():
+    rng = np.random.default_rng(0)
+    x, y = rng.random(500), rng.random(500)
+
+    expected = [i for i in range(len(x)) if not ((x <= x[i]) & (y > y[i])).any()]
+
+    assert sorted(frontier_indices(x, y).tolist()) == sorted(expected)
+
+def test_scatter_points_limits_labels(tmp_path):
+    x = np.linspace(0, 1, 1000)
+    y = np.sqrt(x)
+
+    fig, ax = get_figure("test", (4, 3))
+    scatter_points(ax, x, y, ["red"] * len(x), [f"P{i}" for i in range(len(x))], max_labels=10)
+
+    assert len(ax.texts) == 10
+    save_figure(fig, str(tmp_path / "points.png"))
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulation import simulate_windows
+
+def random_inputs(num_days: int = 1500, num_windows: int = 60, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2010-01-01", periods=num_days)
+    asset_returns = rng.normal(0.0004, 0.01, (num_days, 3))
+    weights = rng.dirichlet(np.ones(3), 4).T
+
+    start_idx = rng.integers(0, num_days - 10, num_windows)
+    end_idx = np.minimum(start_idx + rng.integers(1, num_days, num_windows), num_days - 1)
+
+    return asset_returns, weights, dates, start_idx, end_idx
+
+@pytest.mark.parametrize("rebalance", ["monthly", "quarterly", "yearly", "none"])
+@pytest.mark.parametrize("contribution", ["none", "monthly", "yearly"])
+def test_closed_form_matches_event_loop(rebalance, contribution):
+    asset_returns, weights, dates, start_idx, end_idx = random_inputs()
+
+    # drift_band=0이면 매 rebalance 시점마다 항상 되돌리므로, 사건 단위 반복으로 계산한 결과와 같아야 함
+    expected = simulate_windows(asset_returns, weights, dates, start_idx, end_idx, rebalance, 0.0, contribution)
+    actual = simulate_windows(asset_returns, weights, dates, start_idx, end_idx, rebalance, None, contribution)
+
+    np.testing.assert_allclose(actual, expected, rtol=1e-10, atol=1e-12)
+
+def test_daily_rebalance_matches_compounded_returns():
+    asset_returns, weights, dates, start_idx, end_idx = random_inputs()
+
+    growth = np.cumprod(1 + asset_returns @ weights, axis=0)
+    growth = np.vstack((np.ones((1, weights.shape[1])), growth))
+    years = ((dates[end_idx] - dates[start_idx]).days.to_numpy() / 365.25)[:, None]
+    expected = (growth[end_idx + 1] / growth[start_idx]) ** (1 / years) - 1
+
+    actual = simulate_windows(asset_returns, weights, dates, start_idx, end_idx, "daily")
+
+    np.testing.assert_allclose(actual, expected, rtol=1e-10)
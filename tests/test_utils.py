@@ -0,0 +1,19 @@
+import pytest
+
+from utils import get_combined_ticker, get_ratio_scale, portfolio_candidates
+
+@pytest.mark.parametrize("step, scale", [(0.1, 10), (0.2, 10), (0.5, 10), (0.05, 100), (0.25, 100), (0.01, 100), (0.005, 1000)])
+def test_ratio_scale(step, scale):
+    assert get_ratio_scale(step) == scale
+
+@pytest.mark.parametrize("step", [0.1, 0.05, 0.01, 0.005])
+def test_combined_tickers_are_unique(step):
+    abbrs = ["S", "Q", "T"]
+    scale = get_ratio_scale(step)
+
+    names = [get_combined_ticker([abbrs[i] for i in index_comb], ratio, scale) for index_comb, ratio in portfolio_candidates(abbrs, 2, step)]
+
+    assert len(names) == len(set(names))
+
+def test_combined_ticker_with_half_percent_step():
+    assert get_combined_ticker(["S", "Q"], (0.005, 0.995), get_ratio_scale(0.005)) == "S5Q995"
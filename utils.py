@@ -1,12 +1,18 @@
+import os
 import itertools
+import numpy as np
 import pandas as pd
 import re
+from decimal import Decimal
+from typing import Iterator
+
+from options import EXPORT_FORMATS
 
 COLORS = ["red", "blue", "green", "yellow", "purple", "orange", "cyan", "magenta", "brown", "pink"]
 
-def stock_combination(stock_info: list[pd.DataFrame], abbrs: list[str], r: int = 2, must_include: list[str] = None) -> tuple[list, list]:
+def stock_combination(stock_info: list[pd.DataFrame], abbrs: list[str], r: int = 2, must_include: list[str] = None) -> Iterator[tuple[tuple, tuple]]:
     """
-    주어진 주식 정보와 이에 상응하는 약자에 대해서 r개의 원소로 이루어지는 조합을 생성
+    주어진 주식 정보와 이에 상응하는 약자에 대해서 r개의 원소로 이루어지는 조합을 하나씩 생성
     
     Args:
         stock_info (list[pd.DataFrame]): 조합을 만들 주식 정보
@@ -14,17 +20,96 @@ def stock_combination(stock_info: list[pd.DataFrame], abbrs: list[str], r: int =
         r (int): 선택할 원소의 개수
         must_include (list[str]) 반드시 포함돼야 하는 주식의 대표 알파벳
     """
+    for combination in itertools.combinations(range(len(abbrs)), r):
+        abbr_comb = tuple(abbrs[i] for i in combination)
+        
+        if must_include is not None and not set(must_include) & set(abbr_comb):
+            continue
+        
+        yield tuple(stock_info[i] for i in combination), abbr_comb
+
+def simplex_weights(r: int, step: float = 0.1) -> Iterator[tuple[float, ...]]:
+    """
+    r개의 종목이 모두 포함되도록 (비율 > 0), step 간격으로 합이 1인 투자 비율을 하나씩 생성
+    (e.g. r=3, step=0.1 -> (0.1, 0.1, 0.8), (0.1, 0.2, 0.7), ...)
     
-    combinations = list(itertools.combinations(range(len(abbrs)), r))
-    paired_stock_info = [(stock_info[i], stock_info[j]) for i, j in combinations]
-    paired_abbrs = [(abbrs[i], abbrs[j]) for i, j in combinations]
+    Args:
+        r (int): 종목의 개수
+        step (float): 투자 비율 간격
+    """
+    units = round(1 / step)
+    assert abs(units * step - 1) < 1e-9, "1은 step으로 나누어 떨어져야 합니다."
     
-    if must_include is not None:
-        filtered_pairs = [(s, a) for s, a in zip(paired_stock_info, paired_abbrs) if set(must_include) & set(a)]
+    # units개의 칸을 r개의 구간으로 나누는 경계(r-1개)를 선택
+    for cuts in itertools.combinations(range(1, units), r - 1):
+        bounds = (0,) + cuts + (units,)
+        yield tuple((end - start) / units for start, end in zip(bounds[:-1], bounds[1:]))
 
-        paired_stock_info, paired_abbrs = zip(*filtered_pairs) if filtered_pairs else ([], [])
+def allowed_combinations(allowed: np.ndarray, r: int = 2) -> Iterator[tuple[int, ...]]:
+    """
+    모든 종목 쌍이 허용되는 r개 종목 조합만 itertools.combinations()와 같은 순서로 하나씩 생성.
+    조합을 하나씩 확인하지 않고, 앞에서 고른 종목들과 모두 허용되는 종목만 이어서 고르므로 허용되지 않는 조합은 만들지 않음
+    
+    Args:
+        allowed (np.ndarray): 종목 index 쌍 별 허용 여부 (assets x assets, bool)
+        r (int): 선택할 종목의 개수
+    """
+    def extend(prefix: tuple[int, ...], candidates: np.ndarray, remaining: int) -> Iterator[tuple[int, ...]]:
+        if remaining == 0:
+            yield prefix
+            return
+        
+        for k, i in enumerate(candidates[:len(candidates) - remaining + 1]):
+            rest = candidates[k + 1:]
+            yield from extend(prefix + (int(i),), rest[allowed[i, rest]], remaining - 1)
+            
+    yield from extend((), np.arange(len(allowed)), r)
+
+def portfolio_candidates(abbrs: list[str], r: int = 2, step: float = 0.1, must_include: list[str] = None,
+                         allowed: np.ndarray = None) -> Iterator[tuple[tuple[int, ...], tuple[float, ...]]]:
+    """
+    r개 종목 조합과 각 조합의 투자 비율을 (종목 index, 투자 비율) 형태로 하나씩 생성
+    
+    Args:
+        abbrs (list[str]): 주식 별 대표 알파벳
+        r (int): 선택할 종목의 개수
+        step (float): 투자 비율 간격
+        must_include (list[str]) 반드시 포함돼야 하는 주식의 대표 알파벳
+        allowed (np.ndarray): 종목 index 쌍 별 허용 여부 (assets x assets). 주어지면 모든 쌍이 허용되는 조합만 생성 (default: 모든 조합)
+    """
+    if allowed is None:
+        combinations = (index_comb for index_comb, _ in stock_combination(list(range(len(abbrs))), abbrs, r, must_include))
+    else:
+        combinations = (index_comb for index_comb in allowed_combinations(allowed, r)
+                        if must_include is None or set(must_include) & set(abbrs[i] for i in index_comb))
+        
+    for index_comb in combinations:
+        for ratio in simplex_weights(r, step):
+            yield index_comb, ratio
+
+def get_combined_ticker(abbrs: list[str], ratio: list[float], scale: int = 10) -> str:
+    """
+    각 종목의 약자와 투자 비율을 받아 합친 종목 코드 생성 (e.g. S8Q2, scale=100이면 S80Q20)
+    
+    Args:
+        abbrs (list[str]): 각 종목을 대표할 알파벳 1개
+        ratio (list[float]): 투자 비율 (소수점)
+        scale (int): 투자 비율에 곱할 값 (10이면 10% 단위, 100이면 1% 단위)
+    """
+    rounded_ratios = [round(r * scale) for r in ratio]
+    
+    return "".join(f"{abbr}{r}" for abbr, r in zip(abbrs, rounded_ratios))
 
-    return list(paired_stock_info), list(paired_abbrs)
+def get_ratio_scale(step: float) -> int:
+    """
+    투자 비율 간격의 소수점 자릿수에 맞춰 get_combined_ticker()에 사용할 scale 반환 (e.g. 0.1 -> 10, 0.05 -> 100, 0.005 -> 1000)
+    
+    Args:
+        step (float): 투자 비율 간격
+    """
+    decimals = -Decimal(str(step)).normalize().as_tuple().exponent
+    
+    return 10 ** max(1, decimals)
 
 def simplify_ticker(ticker: str) -> str:
     """
@@ -69,6 +154,35 @@ def parse_string_digit_pairs(s: str):
     
     return parsed_result
 
+def parse_portfolios(portfolio_strs: list[str]) -> tuple[list[str], list[str], np.ndarray]:
+    """
+    포트폴리오 문자열들(e.g. ["QQQ5IEF5", "SPY"])을 받아 (포트폴리오 이름, 구성 종목, 투자 비율 행렬 (종목 x 포트폴리오)) 반환.
+    구성 종목은 입력 순서대로 중복 없이 모으므로 한 번의 행렬 곱으로 모든 포트폴리오의 수익률을 계산할 수 있음
+    
+    Args:
+        portfolio_strs (list[str]): {종목}{비율}... 형태의 포트폴리오 문자열 (비율이 없으면 단일 종목)
+    """
+    portfolios = [parse_string_digit_pairs(portfolio_str) for portfolio_str in portfolio_strs]
+    assert all(portfolio is not None for portfolio in portfolios), "포트폴리오는 {종목}{비율}... 형태로 입력해야 합니다."
+    
+    tickers = list(dict.fromkeys(ticker for portfolio in portfolios for ticker, _ in portfolio))
+    weights = np.zeros((len(tickers), len(portfolios)))
+    names = []
+    
+    for col, portfolio in enumerate(portfolios):
+        if len(portfolio) == 1:
+            weights[tickers.index(portfolio[0][0]), col] = 1.0
+            names.append(portfolio[0][0])
+            continue
+        
+        assert abs(sum(ratio for _, ratio in portfolio) - 1) < 1e-6, "Ratio의 합은 1이어야 합니다."
+        
+        for ticker, ratio in portfolio:
+            weights[tickers.index(ticker), col] += ratio
+        names.append("-".join(f"{ticker}{round(ratio * 10)}" for ticker, ratio in portfolio))
+    
+    return names, tickers, weights
+
 def remove_first_last_year(df: pd.DataFrame) -> pd.DataFrame:
     """
     주어진 DataFrame에서 첫 연도와 마지막 연도를 제거
@@ -86,3 +200,23 @@ def remove_first_last_year(df: pd.DataFrame) -> pd.DataFrame:
     filtered_returns = df[(df.index.year != first_year) & (df.index.year != last_year)]
 
     return filtered_returns
+
+def export_points(points: pd.DataFrame, path: str, export_format: str) -> str:
+    """
+    그래프에 사용된 값을 CSV 혹은 Parquet 파일로 저장하고 저장된 경로 반환
+
+    Args:
+        points (pd.DataFrame): 저장할 값
+        path (str): 저장할 경로 (확장자 제외)
+        export_format (str): 저장 형식 ("csv" 혹은 "parquet")
+    """
+    assert export_format in EXPORT_FORMATS, f"export_format은 {', '.join(EXPORT_FORMATS)} 중 하나여야 합니다."
+
+    path = f"{os.path.normpath(path)}.{export_format}"
+
+    if export_format == "csv":
+        points.to_csv(path)
+    else:
+        points.to_parquet(path)
+
+    return path